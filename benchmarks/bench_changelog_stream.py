@@ -0,0 +1,76 @@
+"""Measure peak memory of ChangelogBuilder.build with and without streaming.
+
+Feeds synthetic commits with bodies and diffs from a generator, so the only
+commits alive are the ones the builder holds on to::
+
+    python benchmarks/bench_changelog_stream.py --commits 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from helixcommit.changelog import ChangelogBuilder
+from helixcommit.models import CommitInfo
+from helixcommit.summarizer import NoOpSummarizer
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def synthetic_commits(count: int, diff_size: int) -> Iterator[CommitInfo]:
+    for index in range(count):
+        yield CommitInfo(
+            sha=f"{index:040x}",
+            subject=f"feat(core): change number {index}",
+            body=f"Synthetic body for commit {index}.",
+            author_name="Bench",
+            author_email="bench@example.com",
+            authored_date=NOW,
+            committed_date=NOW,
+            diff=f"+{index}" + "x" * diff_size,
+        )
+
+
+def measure(count: int, diff_size: int, batch_size: Optional[int]) -> None:
+    builder = ChangelogBuilder(summarizer=NoOpSummarizer())
+    commits = synthetic_commits(count, diff_size)
+    if batch_size is None:
+        commits = list(commits)
+    tracemalloc.start()
+    started = time.perf_counter()
+    changelog = builder.build(
+        version=None, release_date=NOW, commits=commits, batch_size=batch_size
+    )
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    items = sum(len(section.items) for section in changelog.sections)
+    label = f"batch {batch_size}" if batch_size else "materialized"
+    print(
+        f"  {label:<14} {items:>8} items  peak {peak / 2**20:8.1f} MiB"
+        f"  ({peak / items:7.0f} B/item)  {elapsed:6.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=500_000)
+    parser.add_argument("--diff-size", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--materialized", action="store_true", help="Also measure a fully materialized build."
+    )
+    args = parser.parse_args()
+
+    print(f"{args.commits} commits with {args.diff_size}-byte diffs")
+    measure(args.commits, args.diff_size, args.batch_size)
+    if args.materialized:
+        measure(args.commits, args.diff_size, None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare commit scanning speed of the GitRepository backends.
+
+Builds a synthetic linear repository with ``git fast-import`` and times a full
+``iter_commits`` scan with each backend, before and after ``git gc``::
+
+    python benchmarks/bench_git_backends.py --commits 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from helixcommit.git_client import BACKENDS, CommitRange, GitRepository
+
+
+def build_repository(path: Path, commits: int) -> None:
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    lines = []
+    for index in range(commits):
+        message = f"feat: change number {index}\n\nSynthetic body for commit {index}.\n".encode()
+        content = f"value = {index}\n".encode()
+        lines.append(b"commit refs/heads/main\n")
+        lines.append(f"mark :{index + 1}\n".encode())
+        when = 1_600_000_000 + index * 60
+        lines.append(f"author Bench <bench@example.com> {when} +0000\n".encode())
+        lines.append(f"committer Bench <bench@example.com> {when} +0000\n".encode())
+        lines.append(f"data {len(message)}\n".encode() + message)
+        if index:
+            lines.append(f"from :{index}\n".encode())
+        lines.append(f"M 644 inline file{index % 100}.txt\ndata {len(content)}\n".encode())
+        lines.append(content + b"\n")
+    subprocess.run(
+        ["git", "fast-import", "--quiet"], cwd=path, input=b"".join(lines), check=True
+    )
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+
+
+def time_backend(path: Path, backend: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        with GitRepository(path, backend=backend) as repo:
+            count = sum(1 for _ in repo.iter_commits(CommitRange()))
+        best = min(best, time.perf_counter() - started)
+    print(f"  {backend:<10} {count:>8} commits  {best:8.3f}s")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--path", type=Path, help="Reuse or create the repository here.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.path or Path(scratch) / "repo"
+        if not (path / ".git").exists():
+            print(f"Building {args.commits} commits in {path}...")
+            build_repository(path, args.commits)
+        for label, prepare in (("fast-import pack", None), ("after git gc", ["gc", "-q"])):
+            if prepare:
+                subprocess.run(["git", *prepare], cwd=path, check=True)
+            print(label)
+            for backend in BACKENDS:
+                time_backend(path, backend, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Time commit message parsing on messages with long trailer blocks.
+
+Squash merges from bots can carry hundreds of ``Co-authored-by:`` and
+``Signed-off-by:`` trailers. Each size should take roughly proportional time;
+a quadratic footer scan shows up as a per-trailer cost that grows with size::
+
+    python benchmarks/bench_parser_footers.py --trailers 100 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from helixcommit.parser import parse_commit_message
+
+CASES = {
+    "contiguous trailers": (False, False),
+    "blank-separated trailers": (True, False),
+    "blank-separated trailers + prose": (True, True),
+}
+
+
+def build_message(trailers: int, *, interleaved: bool, trailing_prose: bool) -> str:
+    lines = ["feat(ci): squash merge of many branches", "", "Combined changes.", ""]
+    for index in range(trailers):
+        lines.append(f"Co-authored-by: Dev {index} <dev{index}@example.com>")
+        if interleaved:
+            # A blank line before every trailer makes each one a candidate
+            # footer start that has to be checked.
+            lines.append("")
+    lines.append("Signed-off-by: Bot <bot@example.com>")
+    if trailing_prose:
+        # Ends the message with a body line, so no candidate is a footer block.
+        lines.extend(["", "Generated by the merge queue."])
+    return "\n".join(lines)
+
+
+def time_parse(message: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_commit_message(message)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trailers", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, (interleaved, trailing_prose) in CASES.items():
+        print(label)
+        for trailers in args.trailers:
+            message = build_message(
+                trailers, interleaved=interleaved, trailing_prose=trailing_prose
+            )
+            elapsed = time_parse(message, args.repeat)
+            per_trailer = elapsed / trailers * 1e6
+            print(f"  {trailers:>6} trailers  {elapsed * 1000:9.2f}ms  {per_trailer:7.2f}us/trailer")
+
+
+if __name__ == "__main__":
+    main()
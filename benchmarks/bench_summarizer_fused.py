@@ -0,0 +1,98 @@
+"""Compare the multi-call and fused prompt-engineered pipelines on real commits.
+
+Summarizes the latest commits of a repository with each mode and reports
+chat calls, prompt tokens and wall time per entry. The summaries are printed
+side by side so their quality can be judged by eye. Needs network access and
+an API key (``OPENROUTER_API_KEY``, or ``OPENAI_API_KEY`` with ``--openai``)::
+
+    python benchmarks/bench_summarizer_fused.py --repo . --commits 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from helixcommit.git_client import CommitRange, GitRepository
+from helixcommit.llm_scheduler import estimate_tokens
+from helixcommit.summarizer import PromptEngineeredSummarizer, SummaryRequest
+
+
+def load_requests(repo: Path, commits: int, include_diffs: bool) -> List[SummaryRequest]:
+    with GitRepository(repo) as git:
+        return [
+            SummaryRequest(
+                identifier=commit.sha,
+                title=commit.subject,
+                body=commit.body or None,
+                diff=commit.diff or None,
+            )
+            for commit in git.iter_commits(
+                CommitRange(max_count=commits), include_diffs=include_diffs
+            )
+        ]
+
+
+def run_mode(
+    requests: List[SummaryRequest], *, fused: bool, **kwargs: object
+) -> Tuple[Dict[str, str], int, int, float]:
+    # No cache path: every run starts cold.
+    summarizer = PromptEngineeredSummarizer(fused=fused, max_workers=1, **kwargs)  # type: ignore[arg-type]
+    create = summarizer.client.chat.completions.create
+    calls = 0
+    tokens = 0
+
+    def counted(**call_kwargs: object) -> object:
+        nonlocal calls, tokens
+        calls += 1
+        tokens += estimate_tokens(call_kwargs["messages"])  # type: ignore[arg-type]
+        return create(**call_kwargs)
+
+    summarizer.client.chat.completions.create = counted  # type: ignore[method-assign]
+    started = time.perf_counter()
+    results = {result.identifier: result.summary for result in summarizer.summarize(requests)}
+    return results, calls, tokens, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repo", type=Path, default=Path("."))
+    parser.add_argument("--commits", type=int, default=20)
+    parser.add_argument("--diffs", action="store_true", help="Send commit diffs as context.")
+    parser.add_argument("--openai", action="store_true", help="Use OpenAI instead of OpenRouter.")
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args()
+
+    if args.openai:
+        kwargs = {"api_key": os.environ["OPENAI_API_KEY"], "model": args.model or "gpt-4o-mini"}
+    else:
+        kwargs = {
+            "api_key": os.environ["OPENROUTER_API_KEY"],
+            "model": args.model or "meta-llama/llama-3.3-70b-instruct:free",
+            "base_url": "https://openrouter.ai/api/v1",
+        }
+    requests = load_requests(args.repo, args.commits, args.diffs)
+    if not requests:
+        raise SystemExit("No commits found.")
+
+    outputs = {}
+    for label, fused in (("multi-call", False), ("fused", True)):
+        results, calls, tokens, elapsed = run_mode(requests, fused=fused, **kwargs)
+        outputs[label] = results
+        count = len(requests)
+        print(
+            f"  {label:<10} {count:>4} entries  {calls / count:5.2f} calls/entry"
+            f"  {tokens / count:8.0f} prompt tokens/entry  {elapsed / count:6.2f}s/entry"
+        )
+
+    for req in requests:
+        print(f"\n{req.identifier[:12]}  {req.title}")
+        for label, results in outputs.items():
+            print(f"  {label:<10} {results[req.identifier]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,25 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from fnmatch import fnmatch
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+from .dedupe import TemplateCluster, template_clusters
 from .grouper import DEFAULT_ORDER, group_items
 from .models import ChangeItem, Changelog, CommitInfo, PullRequestInfo
-from .parser import ParsedCommitMessage, classify_change_type, parse_commit_message
-from .summarizer import BaseSummarizer, SummaryRequest
+from .parser import DEFAULT_CLASSIFIER, ChangeTypeClassifier, ParsedCommitMessage
+from .summarizer import BaseSummarizer, SummaryRequest, SummaryResult
+from .tiers import TIER_FULL, TIER_LIGHT, TierPolicy
 
-MAX_SUMMARY_BODY_CHARS = 1600
+# Memory guards only; summarizers fit body and diff to the model's token
+# budget (see ``tokens.ContextBudget``).
+MAX_SUMMARY_BODY_CHARS = 8000
+MAX_SUMMARY_DIFF_CHARS = 16000
 
 
 def filter_commits(
@@ -24,6 +31,8 @@ def filter_commits(
     author_filter: Optional[str] = None,
     include_paths: Optional[Sequence[str]] = None,
     exclude_paths: Optional[Sequence[str]] = None,
+    classify: Optional[Callable[[CommitInfo], Tuple[str, Optional[str]]]] = None,
+    classifier: Optional[ChangeTypeClassifier] = None,
 ) -> List[CommitInfo]:
     """Filter commits based on type, scope, and author criteria.
 
@@ -32,20 +41,47 @@ def filter_commits(
         include_types: If provided, only include commits with these types (e.g., ["feat", "fix"]).
         exclude_scopes: If provided, exclude commits with these scopes (e.g., ["deps", "ci"]).
         author_filter: Regex pattern to match against author name or email.
+        classify: Returns ``(type, scope)`` for a commit, e.g. from the commit
+            index; defaults to parsing the commit message.
+        classifier: Change-type taxonomy used when ``classify`` is not given.
 
     Returns:
         Filtered list of commits.
     """
-    result: List[CommitInfo] = []
+    return list(
+        iter_filtered_commits(
+            commits,
+            include_types=include_types,
+            exclude_scopes=exclude_scopes,
+            author_filter=author_filter,
+            include_paths=include_paths,
+            exclude_paths=exclude_paths,
+            classify=classify,
+            classifier=classifier,
+        )
+    )
+
+
+def iter_filtered_commits(
+    commits: Iterable[CommitInfo],
+    *,
+    include_types: Optional[Sequence[str]] = None,
+    exclude_scopes: Optional[Sequence[str]] = None,
+    author_filter: Optional[str] = None,
+    include_paths: Optional[Sequence[str]] = None,
+    exclude_paths: Optional[Sequence[str]] = None,
+    classify: Optional[Callable[[CommitInfo], Tuple[str, Optional[str]]]] = None,
+    classifier: Optional[ChangeTypeClassifier] = None,
+) -> Iterator[CommitInfo]:
+    """Lazily yield the commits :func:`filter_commits` would keep."""
     author_pattern = re.compile(author_filter, re.IGNORECASE) if author_filter else None
     include_path_patterns = _prepare_path_patterns(include_paths)
     exclude_path_patterns = _prepare_path_patterns(exclude_paths)
 
+    classify = classify or partial(_classify_commit, classifier=classifier or DEFAULT_CLASSIFIER)
+
     for commit in commits:
-        # Parse commit to extract type and scope
-        parsed = parse_commit_message(commit.message)
-        commit_type = parsed.type or classify_change_type(commit.message)
-        commit_scope = parsed.scope
+        commit_type, commit_scope = classify(commit)
 
         # Filter by include_types
         if include_types:
@@ -74,9 +110,13 @@ def filter_commits(
             if _paths_match_patterns(commit.files, exclude_path_patterns):
                 continue
 
-        result.append(commit)
+        yield commit
 
-    return result
+
+def _classify_commit(
+    commit: CommitInfo, classifier: ChangeTypeClassifier
+) -> Tuple[str, Optional[str]]:
+    return classifier.classify(commit.message), commit.parsed.scope
 
 
 @dataclass
@@ -109,12 +149,27 @@ class ChangelogBuilder:
         dedupe_prs: bool = True,
         include_scopes: bool = True,
         summary_body_limit: int = MAX_SUMMARY_BODY_CHARS,
+        classifier: Optional[ChangeTypeClassifier] = None,
+        dedupe_templates: bool = True,
+        tier_policy: Optional[TierPolicy] = None,
+        light_summarizer: Optional[BaseSummarizer] = None,
+        patch_ids: Optional[Callable[[Sequence[str]], Dict[str, str]]] = None,
     ) -> None:
         self.summarizer = summarizer
         self.section_order = section_order or DEFAULT_ORDER
         self.dedupe_prs = dedupe_prs
         self.include_scopes = include_scopes
         self.summary_body_limit = summary_body_limit
+        self.classifier = classifier or DEFAULT_CLASSIFIER
+        # Summarize one entry per templated title (e.g. dependency bumps).
+        self.dedupe_templates = dedupe_templates
+        # Without a policy every entry takes the full summarizer; the light
+        # tier falls back to it when no light summarizer is given.
+        self.tier_policy = tier_policy
+        # Looks up ``git patch-id`` for commits, so summaries are cached by
+        # patch content and survive rebases and cherry-picks.
+        self.patch_ids = patch_ids
+        self.light_summarizer = light_summarizer
 
     # ------------------------------------------------------------------
     # Public API
@@ -124,84 +179,195 @@ class ChangelogBuilder:
         *,
         version: Optional[str],
         release_date: Optional[datetime],
-        commits: Sequence[CommitInfo],
+        commits: Iterable[CommitInfo],
         commit_prs: Optional[Dict[str, List[PullRequestInfo]]] = None,
         pr_index: Optional[Dict[int, PullRequestInfo]] = None,
+        batch_size: Optional[int] = None,
     ) -> Changelog:
+        """Build a changelog from ``commits``.
+
+        By default all buckets are summarized together once every commit has
+        been read. With ``batch_size``, ``commits`` may be a lazy iterator such
+        as ``GitRepository.iter_commits``. Buckets are then summarized and
+        turned into change items ``batch_size`` at a time, and their commits
+        are released. Only the change items and the most recent buckets stay
+        in memory. A commit for a pull request whose bucket was already
+        written is added to that entry without summarizing it again.
+        """
         commit_prs = commit_prs or {}
         pr_index = pr_index or {}
-        buckets = self._build_buckets(commits, commit_prs, pr_index)
-        summary_map = self._generate_summaries(buckets)
-        change_items = [
-            self._bucket_to_change_item(bucket, summary_map.get(bucket.identifier))
-            for bucket in buckets
-        ]
-        dedupe_key = "pr_number" if self.dedupe_prs else None
-        sections = group_items(change_items, order=self.section_order, dedupe_by=dedupe_key)
-        return Changelog(version=version, date=release_date, sections=sections)
+        change_items: List[Optional[ChangeItem]] = []
+        slots: Dict[str, int] = {}
+        # Buckets still accepting commits, oldest first.
+        open_buckets: Dict[str, ChangeBucket] = {}
 
-    # ------------------------------------------------------------------
-    # Internal helpers
-    # ------------------------------------------------------------------
-    def _build_buckets(
-        self,
-        commits: Sequence[CommitInfo],
-        commit_prs: Dict[str, List[PullRequestInfo]],
-        pr_index: Dict[int, PullRequestInfo],
-    ) -> List[ChangeBucket]:
-        buckets: List[ChangeBucket] = []
-        bucket_index: Dict[str, ChangeBucket] = {}
         for commit in commits:
-            parsed = parse_commit_message(commit.message)
-            change_type, type_source = self._determine_change_type(parsed, commit)
-            entry = CommitEntry(
-                commit=commit, parsed=parsed, change_type=change_type, type_source=type_source
-            )
+            entry = self._commit_entry(commit)
             pull_request = self._resolve_pull_request(commit, commit_prs, pr_index)
             identifier = self._bucket_identifier(entry, pull_request)
-            bucket = bucket_index.get(identifier)
+            bucket = open_buckets.get(identifier)
             if bucket is None:
+                if identifier in slots:
+                    written = change_items[slots[identifier]]
+                    assert written is not None  # closed buckets are always written
+                    _add_late_entry(written, entry)
+                    continue
                 bucket = ChangeBucket(identifier=identifier, pull_request=pull_request)
-                bucket_index[identifier] = bucket
-                buckets.append(bucket)
+                open_buckets[identifier] = bucket
+                slots[identifier] = len(change_items)
+                change_items.append(None)
             if pull_request and bucket.pull_request is None:
                 bucket.pull_request = pull_request
             bucket.commits.append(entry)
-        return buckets
+            # Keep the newest batch open so nearby commits of one pull request
+            # still share a bucket.
+            if batch_size and len(open_buckets) >= 2 * batch_size:
+                ready = list(open_buckets.values())[:batch_size]
+                self._write_buckets(ready, open_buckets, change_items, slots)
+        self._write_buckets(list(open_buckets.values()), open_buckets, change_items, slots)
+
+        dedupe_key = "pr_number" if self.dedupe_prs else None
+        sections = group_items(
+            [item for item in change_items if item is not None],
+            order=self.section_order,
+            dedupe_by=dedupe_key,
+        )
+        return Changelog(version=version, date=release_date, sections=sections)
 
-    def _generate_summaries(self, buckets: Sequence[ChangeBucket]) -> Dict[str, str]:
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _commit_entry(self, commit: CommitInfo) -> CommitEntry:
+        change_type, type_source = self._determine_change_type(commit)
+        return CommitEntry(
+            commit=commit, parsed=commit.parsed, change_type=change_type, type_source=type_source
+        )
+
+    def _write_buckets(
+        self,
+        buckets: Sequence[ChangeBucket],
+        open_buckets: Dict[str, ChangeBucket],
+        change_items: List[Optional[ChangeItem]],
+        slots: Dict[str, int],
+    ) -> None:
+        """Summarize ``buckets`` into their change item slots and close them."""
+        if not buckets:
+            return
+        tiers = {bucket.identifier: self._summary_tier(bucket) for bucket in buckets}
+        results = self._generate_summaries(buckets, tiers)
+        for bucket in buckets:
+            change_items[slots[bucket.identifier]] = self._bucket_to_change_item(
+                bucket, results.get(bucket.identifier), tiers[bucket.identifier]
+            )
+            del open_buckets[bucket.identifier]
+            if bucket.pull_request is None:
+                # Only pull request buckets can receive more commits.
+                del slots[bucket.identifier]
+
+    def _generate_summaries(
+        self, buckets: Sequence[ChangeBucket], tiers: Dict[str, str]
+    ) -> Dict[str, SummaryResult]:
         if not self.summarizer:
             return {}
-        requests: List[SummaryRequest] = []
-        for bucket in buckets:
-            requests.append(self._build_summary_request(bucket))
-        results_map: Dict[str, str] = {}
-        for result in self.summarizer.summarize(requests):
-            results_map[result.identifier] = result.summary
+        routed: Dict[str, List[SummaryRequest]] = {TIER_FULL: [], TIER_LIGHT: []}
+        summarized = [bucket for bucket in buckets if tiers[bucket.identifier] in routed]
+        patch_ids: Dict[str, str] = {}
+        if self.patch_ids is not None:
+            patch_ids = self.patch_ids(
+                [bucket.primary.commit.sha for bucket in summarized if bucket.pull_request is None]
+            )
+        for bucket in summarized:
+            routed[tiers[bucket.identifier]].append(
+                self._build_summary_request(bucket, patch_ids.get(bucket.primary.commit.sha))
+            )
+        touched = {bucket.identifier: _touched_files(bucket) for bucket in summarized}
+        results_map: Dict[str, SummaryResult] = {}
+        results_map.update(self._summarize_requests(self.summarizer, routed[TIER_FULL], touched))
+        results_map.update(
+            self._summarize_requests(
+                self.light_summarizer or self.summarizer, routed[TIER_LIGHT], touched
+            )
+        )
         return results_map
 
-    def _bucket_to_change_item(self, bucket: ChangeBucket, summary: Optional[str]) -> ChangeItem:
+    def _summarize_requests(
+        self,
+        summarizer: BaseSummarizer,
+        requests: Sequence[SummaryRequest],
+        touched: Dict[str, str],
+    ) -> Dict[str, SummaryResult]:
+        if not requests:
+            return {}
+        clusters = template_clusters([req.title for req in requests]) if self.dedupe_templates else []
+        # Followers share their leader's summary only when they touch the same
+        # files. Bodies are release notes copied from upstream and differ for
+        # every bump, so they are not compared.
+        followers: Dict[int, Tuple[TemplateCluster, int]] = {}
+        for cluster in clusters:
+            source = cluster.members[0]
+            leader = touched.get(requests[source].identifier)
+            for target in cluster.members[1:]:
+                member = touched.get(requests[target].identifier)
+                if cluster.same_context(leader, member, source, target):
+                    followers[target] = (cluster, source)
+        results_map: Dict[str, SummaryResult] = {}
+        representatives = [req for index, req in enumerate(requests) if index not in followers]
+        for summarized in summarizer.summarize(representatives):
+            results_map[summarized.identifier] = summarized
+        for target, (cluster, source) in followers.items():
+            result = results_map.get(requests[source].identifier)
+            if result is None or not result.summary:
+                continue
+            # Members the template cannot be filled for keep their own title.
+            filled = cluster.fill(result.summary, source, target)
+            if filled:
+                identifier = requests[target].identifier
+                results_map[identifier] = SummaryResult(identifier, filled)
+        return results_map
+
+    def _summary_tier(self, bucket: ChangeBucket) -> str:
+        if self.tier_policy is None:
+            return TIER_FULL
+        has_body = bool(bucket.pull_request and (bucket.pull_request.body or "").strip())
+        has_body = has_body or any(entry.parsed.body for entry in bucket.commits)
+        sizes = [_changed_lines(entry.commit) for entry in bucket.commits]
+        known = [size for size in sizes if size is not None]
+        return self.tier_policy.choose(
+            [entry.change_type for entry in bucket.commits],
+            breaking=self._detect_breaking(bucket)[0],
+            has_body=has_body,
+            changed_lines=sum(known) if len(known) == len(sizes) else None,
+        )
+
+    def _bucket_to_change_item(
+        self, bucket: ChangeBucket, result: Optional[SummaryResult], tier: str = TIER_FULL
+    ) -> ChangeItem:
         primary = bucket.primary
         fallback_title = self._default_title(bucket)
-        title = summary or fallback_title
+        title = (result.summary if result else None) or fallback_title
         scope = primary.parsed.scope if (self.include_scopes and primary.parsed.scope) else None
         breaking, breaking_notes = self._detect_breaking(bucket)
         references: Dict[str, str] = {}
+        authors = sorted(
+            {entry.commit.author_name for entry in bucket.commits if entry.commit.author_name}
+        )
         metadata: Dict[str, object] = {
             "commit_shas": [entry.commit.sha for entry in bucket.commits],
-            "authors": sorted(
-                {entry.commit.author_name for entry in bucket.commits if entry.commit.author_name}
-            ),
+            "authors": authors,
             "type_source": primary.type_source,
         }
         if bucket.pull_request:
             references["pr"] = bucket.pull_request.url
             metadata["pr_number"] = str(bucket.pull_request.number)
             if bucket.pull_request.author:
-                metadata.setdefault("authors", []).append(bucket.pull_request.author)
+                authors.append(bucket.pull_request.author)
         references["commit"] = primary.commit.sha
         metadata["commit_count"] = len(bucket.commits)
         metadata.setdefault("type", primary.change_type)
+        if self.summarizer:
+            metadata["summary_tier"] = tier
+        if result is not None and result.skipped_steps:
+            metadata["summary_skipped_steps"] = list(result.skipped_steps)
         return ChangeItem(
             title=title,
             type=primary.change_type,
@@ -264,13 +430,15 @@ class ChangelogBuilder:
             return pr
         return None
 
-    def _determine_change_type(self, parsed: ParsedCommitMessage, commit: CommitInfo) -> Tuple[str, str]:
-        if parsed.type:
-            return parsed.type, "conventional"
-        inferred = classify_change_type(commit.message)
-        return inferred, "heuristic"
+    def _determine_change_type(self, commit: CommitInfo) -> Tuple[str, str]:
+        declared = self.classifier.header_type(commit.message)
+        if declared:
+            return declared, "conventional"
+        return self.classifier.classify(commit.message), "heuristic"
 
-    def _build_summary_request(self, bucket: ChangeBucket) -> SummaryRequest:
+    def _build_summary_request(
+        self, bucket: ChangeBucket, patch_id: Optional[str] = None
+    ) -> SummaryRequest:
         title = self._default_title(bucket)
         body_parts: List[str] = []
         diff_parts: List[str] = []
@@ -288,14 +456,29 @@ class ChangelogBuilder:
         body_text = _truncate(body_text, self.summary_body_limit)
         
         diff_text = "\n\n".join(diff_parts)
-        # Truncate total diff text to avoid massive context
-        diff_text = _truncate(diff_text, 4000)
-        
+        diff_text = _truncate(diff_text, MAX_SUMMARY_DIFF_CHARS)
+
+        # Keyed by content rather than sha or PR number, so rebased,
+        # cherry-picked and backported changes reuse cached summaries.
+        if bucket.pull_request is None and patch_id:
+            # The raw subject: a "[1.x] " prefix stops conventional parsing.
+            subject = bucket.primary.commit.subject
+            key_parts = ["patch", patch_id, _normalize_text(subject), _normalize_text(body_text)]
+        else:
+            key_parts = [
+                "content",
+                _normalize_text(title),
+                _normalize_text(body_text),
+                *(_normalize_diff(entry.commit.diff or "") for entry in bucket.commits),
+            ]
+        content_key = hashlib.sha256("\x00".join(key_parts).encode("utf-8")).hexdigest()
+
         return SummaryRequest(
-            identifier=bucket.identifier, 
-            title=title, 
+            identifier=bucket.identifier,
+            title=title,
             body=body_text or None,
-            diff=diff_text or None
+            diff=diff_text or None,
+            content_key=content_key,
         )
 
     def _bucket_identifier(
@@ -306,12 +489,76 @@ class ChangelogBuilder:
         return f"commit-{entry.commit.sha}"
 
 
+def _add_late_entry(item: ChangeItem, entry: CommitEntry) -> None:
+    """Fold a commit into a change item that was already built for its bucket."""
+    metadata = item.metadata
+    metadata["commit_shas"].append(entry.commit.sha)
+    metadata["commit_count"] += 1
+    author = entry.commit.author_name
+    if author and author not in metadata["authors"]:
+        metadata["authors"].append(author)
+    if entry.parsed.breaking:
+        item.breaking = True
+        item.notes.extend(entry.parsed.breaking_descriptions)
+    if entry.parsed.body:
+        details = "\n\n".join(part for part in (item.details, entry.parsed.body) if part)
+        item.details = _truncate(details, 4000)
+
+
+def _changed_lines(commit: CommitInfo) -> Optional[int]:
+    """Return a commit's inserted plus deleted lines, or ``None`` if unknown."""
+    if commit.file_changes:
+        return commit.insertions + commit.deletions
+    if commit.diff is None:
+        return None
+    return sum(
+        1
+        for line in commit.diff.splitlines()
+        if line.startswith(("+", "-")) and not line.startswith(("+++", "---"))
+    )
+
+
+def _touched_files(bucket: ChangeBucket) -> str:
+    """Return the sorted paths a bucket's commits touch, one per line."""
+    paths: Set[str] = set()
+    for entry in bucket.commits:
+        commit = entry.commit
+        paths.update(commit.files)
+        paths.update(change.path for change in commit.file_changes)
+        paths.update(_DIFF_PATH_RE.findall(commit.diff or ""))
+    return "\n".join(sorted(paths))
+
+
 def _truncate(value: str, limit: int) -> str:
     if limit <= 0 or len(value) <= limit:
         return value
     return value[: limit - 3] + "..."
 
 
+# Old and new paths in unified diff file headers.
+_DIFF_PATH_RE = re.compile(r"^(?:\+\+\+ b|--- a)/(.+?)\s*$", re.MULTILINE)
+
+# Notes that differ between a change and its cherry-pick or backport.
+_CHERRY_PICK_RE = re.compile(r"^\s*\(cherry picked from commit [0-9a-f]+\)\s*$", re.MULTILINE)
+_BACKPORT_PREFIX_RE = re.compile(r"^(?:\[[^\]]*\]\s*)+")
+_HUNK_HEADER_RE = re.compile(r"^@@ .*$", re.MULTILINE)
+_INDEX_LINE_RE = re.compile(r"^index [0-9a-f]+\.\.[0-9a-f]+.*$", re.MULTILINE)
+
+
+def _normalize_text(value: str) -> str:
+    """Drop cherry-pick notes and branch tags like ``[1.x]``; collapse whitespace."""
+    value = _CHERRY_PICK_RE.sub("", value)
+    value = _BACKPORT_PREFIX_RE.sub("", value.strip())
+    return " ".join(value.split()).lower()
+
+
+def _normalize_diff(diff: str) -> str:
+    """Drop blob ids and hunk headers, which change when a patch is moved."""
+    diff = _INDEX_LINE_RE.sub("", diff)
+    diff = _HUNK_HEADER_RE.sub("@@", diff)
+    return "\n".join(line.rstrip() for line in diff.splitlines() if line.strip())
+
+
 def _unique_list(values: List[str]) -> List[str]:
     seen = set()
     unique: List[str] = []
@@ -359,4 +606,10 @@ def _normalize_path(value: str) -> str:
     return normalized
 
 
-__all__ = ["ChangeBucket", "ChangelogBuilder", "CommitEntry", "filter_commits"]
+__all__ = [
+    "ChangeBucket",
+    "ChangelogBuilder",
+    "CommitEntry",
+    "filter_commits",
+    "iter_filtered_commits",
+]
@@ -3,19 +3,22 @@
 from __future__ import annotations
 
 import re
+import subprocess
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from enum import Enum
+from itertools import chain
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import typer
 
 from . import __version__
-from .changelog import ChangelogBuilder, filter_commits
+from .changelog import ChangelogBuilder
 from .commit_generator import CommitGenerator
-from .config import load_config
+from .commit_index import DEFAULT_COMMIT_INDEX, CommitIndex
+from .config import FileConfig, load_config
 from .formatters import html as html_formatter
 from .formatters import json as json_formatter
 from .formatters import markdown as markdown_formatter
@@ -24,17 +27,27 @@ from .formatters import yaml as yaml_formatter
 from .grouper import SECTION_ALIASES, SECTION_TITLES
 from .template import TemplateEngine, detect_format_from_template
 from .bitbucket_client import BitbucketClient, BitbucketSettings
-from .git_client import CommitRange, GitRepository, TagInfo
+from .git_client import CommitRange, GitRepository, TagIndex, TagInfo
 from .github_client import GitHubClient, GitHubSettings
 from .gitlab_client import GitLabClient, GitLabSettings
 from .models import Changelog, CommitInfo, PullRequestInfo
-from .summarizer import BaseSummarizer, PromptEngineeredSummarizer, SummaryRequest
+from .parser import DEFAULT_CLASSIFIER, ChangeTypeClassifier
+from .query import plan_commit_query
+from .summarizer import (
+    BaseSummarizer,
+    OpenAISummarizer,
+    OpenRouterSummarizer,
+    PromptEngineeredSummarizer,
+    SummaryRequest,
+)
 from .ui import get_console, set_theme
 from .ui.panels import error_panel, success_panel, info_panel
 from .ui.spinners import ai_spinner, TaskProgress
 
 APP_NAME = "HelixCommit"
-DEFAULT_SUMMARY_CACHE = Path(".helixcommit-cache/summaries.json")
+DEFAULT_SUMMARY_CACHE = Path(".helixcommit-cache/summaries.sqlite3")
+# Buckets summarized per step when generate streams commits into the builder.
+GENERATE_BATCH_SIZE = 256
 PR_NUMBER_PATTERN = re.compile(
     r"(?:\(#(?P<num_paren>\d+)\))|(?:pull request #(?P<num_pr>\d+))|(?:pr #(?P<num_alt>\d+))",
     re.IGNORECASE,
@@ -340,7 +353,7 @@ def generate(
     ),
     rag_backend: Optional[RagBackend] = typer.Option(
         None,
-        help="RAG backend: 'simple' (keyword) or 'chroma' (best-effort, optional dependency).",
+        help="RAG backend: 'simple' (local BM25) or 'chroma' (embeddings, optional dependency; one collection per run).",
     ),
     template: Optional[Path] = typer.Option(
         None,
@@ -435,7 +448,8 @@ def generate(
         author_filter = file_config.generate.author_filter
 
     console = get_console()
-    git_repo = GitRepository(repo)
+    classifier = _change_type_classifier(file_config)
+    git_repo = _open_repository(repo, classifier)
 
     commit_range, context = _resolve_commit_range(
         git_repo,
@@ -461,54 +475,72 @@ def generate(
         ))
         raise typer.Exit(code=1)
 
-    collect_files = bool(include_paths or exclude_paths)
-    
-    # Collect commits with progress indicator
-    with console.status("[progress.spinner]Scanning commits...[/]", spinner="dots"):
-        commits = list(
-            git_repo.iter_commits(
-                commit_range,
-                include_diffs=include_diffs,
-                include_files=collect_files,
-            )
+    if include_paths and not git_repo.commit_graph().changed_paths:
+        console.print(
+            "[muted]Tip: run[/] [accent]helixcommit index[/] [muted]to let git skip "
+            "unrelated commits with changed-path Bloom filters.[/]"
         )
 
-    # Apply filtering
-    commits = filter_commits(
-        commits,
+    collect_files = bool(include_paths or exclude_paths)
+    
+    # Let git evaluate what it can; the rest is filtered below
+    plan = plan_commit_query(
+        commit_range,
         include_types=include_types,
         exclude_scopes=exclude_scopes,
         author_filter=author_filter,
         include_paths=include_paths,
         exclude_paths=exclude_paths,
+        classifier=classifier,
     )
 
-    if not commits:
-        message = "No commits found for the selected range."
-        if fail_on_empty:
-            console.print(error_panel(message, title="No Commits"))
-            raise typer.Exit(code=1)
-        console.print(info_panel(message, title="No Commits"))
-        return
-    
-    console.print(f"[muted]Found[/] [primary]{len(commits)}[/] [muted]commits to process[/]")
-
-    # Detect platform and attach PR/MR numbers
+    # Detect platform for PR/MR numbers
     github_slug = git_repo.get_github_slug()
     gitlab_slug = git_repo.get_gitlab_slug()
     bitbucket_slug = git_repo.get_bitbucket_slug()
     platform: Optional[str] = None
+    attach_numbers = _attach_pr_numbers
     if github_slug:
         platform = "github"
-        _attach_pr_numbers(commits)
     elif gitlab_slug:
         platform = "gitlab"
-        _attach_mr_numbers(commits)
+        attach_numbers = _attach_mr_numbers
     elif bitbucket_slug:
         platform = "bitbucket"
-        _attach_bb_pr_numbers(commits)
+        attach_numbers = _attach_bb_pr_numbers
+
+    # Pull request lookups need every commit up front. Without them commits
+    # stream into the builder and are released batch by batch.
+    streaming = no_prs or platform is None
+    with console.status("[progress.spinner]Scanning commits...[/]", spinner="dots"):
+        commit_stream = plan.stream(
+            git_repo.iter_commits(
+                plan.commit_range,
+                include_diffs=include_diffs,
+                include_files=collect_files,
+            ),
+            classify=git_repo.commit_index.classify if git_repo.commit_index else None,
+        )
+        if streaming:
+            first = next(commit_stream, None)
+            commits = [] if first is None else [first]
+        else:
+            commits = list(commit_stream)
+
+    if not commits:
+        message = "No commits found for the selected range."
+        if fail_on_empty:
+            console.print(error_panel(message, title="No Commits"))
+            raise typer.Exit(code=1)
+        console.print(info_panel(message, title="No Commits"))
+        return
+
+    source: Iterable[CommitInfo] = commits
+    if streaming:
+        source = _with_pr_numbers(chain(commits, commit_stream), attach_numbers)
     else:
-        _attach_pr_numbers(commits)
+        console.print(f"[muted]Found[/] [primary]{len(commits)}[/] [muted]commits to process[/]")
+        attach_numbers(commits)
 
     pr_index: Dict[int, PullRequestInfo] = {}
     commit_prs: Dict[str, List[PullRequestInfo]] = {}
@@ -516,7 +548,7 @@ def generate(
     gitlab_client: Optional[GitLabClient] = None
     bitbucket_client: Optional[BitbucketClient] = None
     try:
-        if not no_prs:
+        if not streaming:
             with console.status("[progress.spinner]Fetching pull request information...[/]", spinner="dots"):
                 if platform == "github" and github_slug:
                     settings = GitHubSettings(
@@ -543,6 +575,7 @@ def generate(
             bitbucket_client.close()
 
     summarizer: Optional[BaseSummarizer] = None
+    light_summarizer: Optional[BaseSummarizer] = None
     if use_llm:
         # Validate API key before attempting to use LLM
         try:
@@ -559,25 +592,42 @@ def generate(
             raise typer.Exit(code=1) from None
 
         cache_path = summary_cache or (repo / DEFAULT_SUMMARY_CACHE)
-        rag_backend_value = rag_backend.value
-        summarizer_kwargs = {
-            "cache_path": cache_path,
-            "domain_scope": domain_scope,
-            "expert_roles": expert_role,
-            "rag_backend": rag_backend_value,
-        }
+        ai = file_config.ai
         if llm_provider.lower() == "openrouter":
-            summarizer = PromptEngineeredSummarizer(
-                api_key=validated_key,
-                model=openrouter_model,
-                base_url="https://openrouter.ai/api/v1",
-                **summarizer_kwargs,
-            )
+            model = openrouter_model
+            base_url: Optional[str] = "https://openrouter.ai/api/v1"
         else:
-            summarizer = PromptEngineeredSummarizer(
+            model = openai_model
+            base_url = None
+        summarizer = PromptEngineeredSummarizer(
+            api_key=validated_key,
+            model=model,
+            base_url=base_url,
+            cache_path=cache_path,
+            domain_scope=domain_scope,
+            expert_roles=expert_role,
+            rag_backend=rag_backend.value,
+            max_workers=ai.max_workers,
+            max_batch_size=ai.max_batch_size,
+            fused=ai.fused,
+            early_exit=ai.early_exit,
+            early_exit_threshold=ai.early_exit_threshold,
+            stop_on_agreement=ai.stop_on_agreement,
+            requests_per_minute=ai.requests_per_minute,
+            tokens_per_minute=ai.tokens_per_minute,
+        )
+        # With tiers enabled, trivial entries take one batched call instead
+        # of the full pipeline.
+        if file_config.tiers.enabled:
+            light_summarizer_class = (
+                OpenRouterSummarizer if llm_provider.lower() == "openrouter" else OpenAISummarizer
+            )
+            light_summarizer = light_summarizer_class(
                 api_key=validated_key,
-                model=openai_model,
-                **summarizer_kwargs,
+                model=model,
+                cache_path=cache_path,
+                requests_per_minute=ai.requests_per_minute,
+                tokens_per_minute=ai.tokens_per_minute,
             )
         console.print(f"[muted]Using AI provider:[/] [primary]{llm_provider}[/]")
 
@@ -586,29 +636,36 @@ def generate(
         summarizer=summarizer,
         include_scopes=include_scopes,
         section_order=normalized_section_order,
+        classifier=classifier,
+        tier_policy=file_config.tiers.build_policy(),
+        light_summarizer=light_summarizer,
+        patch_ids=git_repo.patch_ids if use_llm else None,
     )
 
     version_name = context.until_tag.name if context.until_tag else "Unreleased"
     tag_date = getattr(context.until_tag, "date", None) if context.until_tag else None
     release_date = tag_date if tag_date else datetime.now(timezone.utc)
 
+    batch_size = GENERATE_BATCH_SIZE if streaming else None
     # Build changelog with AI spinner if using LLM
     if use_llm:
         with console.status("[progress.spinner]Generating AI summaries...[/]", spinner="dots"):
             changelog = builder.build(
                 version=version_name,
                 release_date=release_date,
-                commits=commits,
+                commits=source,
                 commit_prs=commit_prs,
                 pr_index=pr_index,
+                batch_size=batch_size,
             )
     else:
         changelog = builder.build(
             version=version_name,
             release_date=release_date,
-            commits=commits,
+            commits=source,
             commit_prs=commit_prs,
             pr_index=pr_index,
+            batch_size=batch_size,
         )
 
     compare_url = _compute_compare_url(github_slug, gitlab_slug, bitbucket_slug, context)
@@ -804,7 +861,13 @@ def generate_commit(
     base_url = "https://openrouter.ai/api/v1" if llm_provider == "openrouter" else None
 
     try:
-        generator = CommitGenerator(api_key=api_key, model=model, base_url=base_url)
+        generator = CommitGenerator(
+            api_key=api_key,
+            model=model,
+            base_url=base_url,
+            requests_per_minute=file_config.ai.requests_per_minute,
+            tokens_per_minute=file_config.ai.tokens_per_minute,
+        )
     except ImportError as e:
         console.print(error_panel(str(e), title="Import Error"))
         raise typer.Exit(1) from None
@@ -899,6 +962,51 @@ def generate_commit(
                 response = generator.chat(user_feedback)
 
 
+@app.command()
+def index(
+    repo: Path = typer.Option(
+        Path.cwd(),
+        "--repo",
+        exists=True,
+        file_okay=False,
+        resolve_path=True,
+        help="Repository path.",
+    ),
+    changed_paths: bool = typer.Option(
+        True,
+        "--changed-paths/--no-changed-paths",
+        help="Also write changed-path Bloom filters.",
+    ),
+) -> None:
+    """Write a commit-graph and the commit index so history scans run faster.
+
+    Runs ``git commit-graph write --reachable --changed-paths``. git then
+    reads commits from the graph and answers path-limited walks with Bloom
+    filter probes instead of diffing every commit. Commit metadata reachable
+    from HEAD is also stored in the commit index, which later commands keep
+    up to date and use to answer repeated queries.
+    """
+    console = get_console()
+    classifier = _change_type_classifier(load_config(repo))
+    commit_index = CommitIndex(repo / DEFAULT_COMMIT_INDEX, classifier)
+    try:
+        with GitRepository(repo, commit_index=commit_index) as git_repo:
+            with console.status("[progress.spinner]Writing commit-graph...[/]", spinner="dots"):
+                graph = git_repo.write_commit_graph(changed_paths=changed_paths)
+                indexed = git_repo.index_commits()
+    except subprocess.CalledProcessError as exc:
+        console.print(error_panel(exc.stderr or str(exc), title="Index Failed"))
+        raise typer.Exit(code=1) from None
+    finally:
+        commit_index.close()
+    bloom = "with" if graph.changed_paths else "without"
+    console.print(success_panel(
+        f"Indexed {graph.commits} commits {bloom} changed-path Bloom filters.\n"
+        f"Commit index holds {indexed} commits.",
+        title="Commit-Graph Written",
+    ))
+
+
 @app.command()
 def preview(
     repo: Path = typer.Option(
@@ -929,7 +1037,8 @@ def preview(
     
     console = get_console()
     repo = repo.resolve()
-    git_repo = GitRepository(repo)
+    classifier = _change_type_classifier(load_config(repo))
+    git_repo = _open_repository(repo, classifier)
 
     commit_range, context = _resolve_commit_range(
         git_repo,
@@ -959,7 +1068,7 @@ def preview(
     console.print()
 
     # Build a simple changelog preview
-    builder = ChangelogBuilder(summarizer=None, include_scopes=True)
+    builder = ChangelogBuilder(summarizer=None, include_scopes=True, classifier=classifier)
     version_name = context.until_tag.name if context.until_tag else "Unreleased"
     release_date = datetime.now(timezone.utc)
 
@@ -1016,7 +1125,8 @@ def browse(
     
     console = get_console()
     repo = repo.resolve()
-    git_repo = GitRepository(repo)
+    classifier = _change_type_classifier(load_config(repo))
+    git_repo = _open_repository(repo, classifier)
 
     commit_range, context = _resolve_commit_range(
         git_repo,
@@ -1110,7 +1220,8 @@ def search(
     
     console = get_console()
     repo = repo.resolve()
-    git_repo = GitRepository(repo)
+    classifier = _change_type_classifier(load_config(repo))
+    git_repo = _open_repository(repo, classifier)
 
     commit_range, context = _resolve_commit_range(
         git_repo,
@@ -1126,7 +1237,8 @@ def search(
     )
 
     with console.status(f"[progress.spinner]Searching for '{query}'...[/]", spinner="dots"):
-        all_commits = list(git_repo.iter_commits(commit_range))
+        # Consume commits as git produces them so the walk stops at max_results
+        commit_stream = git_repo.iter_commits(commit_range)
         
         # Build search pattern
         flags = 0 if case_sensitive else regex_module.IGNORECASE
@@ -1138,7 +1250,7 @@ def search(
         
         # Filter commits
         results = []
-        for commit in all_commits:
+        for commit in commit_stream:
             # Check query against subject, body, author
             searchable = f"{commit.subject} {commit.body} {commit.author_name} {commit.author_email}"
             if not pattern.search(searchable):
@@ -1159,6 +1271,7 @@ def search(
             results.append(commit)
             if len(results) >= max_results:
                 break
+        commit_stream.close()
 
     console.print()
     console.print(Rule(f"[primary]Search Results[/] [muted]for '{query}'[/]", style="primary"))
@@ -1194,6 +1307,29 @@ def _extract_commit_type_from_subject(subject: str) -> Optional[str]:
     return None
 
 
+def _open_repository(
+    repo: Path, classifier: ChangeTypeClassifier = DEFAULT_CLASSIFIER
+) -> GitRepository:
+    """Open ``repo`` for history scans, using the commit index if one was built.
+
+    The index is opt-in: ``helixcommit index`` creates it. Without it every
+    scan is answered by git.
+    """
+    index_path = repo / DEFAULT_COMMIT_INDEX
+    if not index_path.exists():
+        return GitRepository(repo)
+    return GitRepository(repo, commit_index=CommitIndex(index_path, classifier))
+
+
+def _change_type_classifier(file_config: FileConfig) -> ChangeTypeClassifier:
+    """Build the classifier for the ``[types]`` config, exiting on invalid settings."""
+    try:
+        return file_config.types.build_classifier()
+    except ValueError as exc:
+        get_console().print(error_panel(str(exc), title="Invalid Configuration"))
+        raise typer.Exit(code=1) from None
+
+
 def _resolve_commit_range(
     repo: GitRepository,
     *,
@@ -1207,7 +1343,7 @@ def _resolve_commit_range(
     include_merges: bool,
     max_items: Optional[int],
 ) -> Tuple[CommitRange, RangeContext]:
-    tags = repo.list_tags()
+    tags = repo.tag_index()
 
     resolved_since_tag = _find_tag(tags, since_tag) if since_tag else None
     resolved_until_tag = _find_tag(tags, until_tag) if until_tag else None
@@ -1216,7 +1352,7 @@ def _resolve_commit_range(
     until_ref = resolved_until_tag.name if resolved_until_tag else until or "HEAD"
 
     if unreleased and not since_ref:
-        latest_tag = resolved_since_tag or (tags[0] if tags else None)
+        latest_tag = resolved_since_tag or tags.latest()
         if latest_tag:
             since_ref = latest_tag.name
             resolved_since_tag = latest_tag
@@ -1243,13 +1379,10 @@ def _resolve_commit_range(
     return commit_range, context
 
 
-def _find_tag(tags: Sequence[TagInfo], name: Optional[str]) -> Optional[TagInfo]:
+def _find_tag(tags: TagIndex, name: Optional[str]) -> Optional[TagInfo]:
     if not name:
         return None
-    for tag in tags:
-        if tag.name == name:
-            return tag
-    return None
+    return tags.get(name)
 
 
 def _attach_pr_numbers(commits: Iterable[CommitInfo]) -> None:
@@ -1264,6 +1397,15 @@ def _attach_pr_numbers(commits: Iterable[CommitInfo]) -> None:
             commit.pr_number = pr_number
 
 
+def _with_pr_numbers(
+    commits: Iterable[CommitInfo], attach: Callable[[Iterable[CommitInfo]], None]
+) -> Iterator[CommitInfo]:
+    """Attach PR/MR numbers to commits as they stream past."""
+    for commit in commits:
+        attach((commit,))
+        yield commit
+
+
 def _attach_mr_numbers(commits: Iterable[CommitInfo]) -> None:
     """Attach GitLab MR numbers to commits."""
     for commit in commits:
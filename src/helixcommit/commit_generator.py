@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import re
-import time
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
+from .llm_scheduler import estimate_tokens, get_scheduler, is_rate_limited
+
 try:  # pragma: no cover - optional dependency guard
     from openai import OpenAI, RateLimitError
 except ImportError:  # pragma: no cover - optional dependency guard
@@ -27,6 +28,8 @@ class CommitGenerator:
         api_key: str,
         model: str,
         base_url: Optional[str] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
     ) -> None:
         """Initialize the generator."""
         if OpenAI is None:
@@ -35,7 +38,14 @@ class CommitGenerator:
                 "Install it with 'pip install openai'."
             )
 
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        # Retries go through the scheduler, which needs to see every 429.
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self.scheduler = get_scheduler(
+            base_url,
+            model,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
         self.model = model
         # Use the official OpenAI message param type so type checkers match the SDK
         self.history: List[ChatCompletionMessageParam] = []
@@ -175,62 +185,70 @@ class CommitGenerator:
         self.history.append({"role": "user", "content": user_input})
         return self._call_llm()
 
-    def _call_llm(self, max_retries: int = 3, stream: bool = False) -> str:
-        """Call the LLM and update history with exponential backoff retry logic."""
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                if stream:
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=self.history,
-                        stream=True,
-                    )
-                    content = ""
+    def _call_llm(self, stream: bool = False) -> str:
+        """Call the LLM through the rate-limit scheduler and update history."""
+
+        def request() -> str:
+            if stream:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self.history,
+                    stream=True,
+                )
+                content = ""
+                try:
                     for chunk in response:
                         delta = chunk.choices[0].delta.content or ""
                         content += delta
                         # Yield partial content for streaming
                         if hasattr(self, '_stream_callback') and self._stream_callback:
                             self._stream_callback(delta)
-                    self.history.append({"role": "assistant", "content": content})
-                    return content
-                else:
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=self.history,
-                        stream=False,
-                    )
-                    content = response.choices[0].message.content or ""
-                    self.history.append({"role": "assistant", "content": content})
-                    return content
-            except RateLimitError as e:
-                last_error = e
-                if attempt < max_retries - 1:
-                    # Calculate exponential backoff: 2^attempt seconds
-                    wait_time = 2 ** attempt
-                    print(
-                        f"\n⚠️  Rate limit exceeded. Retrying in {wait_time} seconds "
-                        f"(attempt {attempt + 1}/{max_retries})..."
-                    )
-                    time.sleep(wait_time)
-                else:
-                    # Last attempt failed
-                    error_msg = str(e)
-                    if "free-models-per-day" in error_msg:
-                        raise RuntimeError(
-                            "Rate limit exceeded on free-tier model. "
-                            "You have exhausted your daily free requests. "
-                            "Options:\n"
-                            "1. Add credits to your OpenRouter account\n"
-                            "2. Use a different LLM provider (OpenAI, Anthropic, etc.)\n"
-                            "3. Try again tomorrow"
-                        ) from e
-                    raise
-            except Exception as e:
-                # Other errors should fail immediately
-                raise
-        
-        # Should not reach here if max_retries > 0
-        raise RuntimeError("Failed to call LLM after all retries")
+                except Exception as exc:
+                    if not content:
+                        raise
+                    # A retry would send the callback the same prefix again.
+                    raise RuntimeError(
+                        "The response stream was interrupted after partial output. "
+                        "Please try again."
+                    ) from exc
+                return content
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self.history,
+                stream=False,
+            )
+            return response.choices[0].message.content or ""
+
+        def announce_retry(attempt: int, delay: float, error: BaseException) -> None:
+            print(
+                f"\n⚠️  {_retry_reason(error)}. Retrying in {delay:.0f} seconds "
+                f"(attempt {attempt}/{self.scheduler.max_retries})..."
+            )
+
+        try:
+            content = self.scheduler.call(
+                request, tokens=estimate_tokens(self.history), on_retry=announce_retry
+            )
+        except RateLimitError as e:
+            if "free-models-per-day" in str(e):
+                raise RuntimeError(
+                    "Rate limit exceeded on free-tier model. "
+                    "You have exhausted your daily free requests. "
+                    "Options:\n"
+                    "1. Add credits to your OpenRouter account\n"
+                    "2. Use a different LLM provider (OpenAI, Anthropic, etc.)\n"
+                    "3. Try again tomorrow"
+                ) from e
+            raise
+        self.history.append({"role": "assistant", "content": content})
+        return content
+
+
+def _retry_reason(error: BaseException) -> str:
+    """Describe an error the scheduler retries: a 429, a 5xx or a connection failure."""
+    if is_rate_limited(error):
+        return "Rate limit exceeded"
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return f"Provider error (HTTP {status})"
+    return "Connection failed or timed out"
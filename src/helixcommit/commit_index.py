@@ -0,0 +1,305 @@
+"""On-disk index of commit metadata shared across HelixCommit runs.
+
+Commits are immutable, so an entry keyed by sha never goes stale. The index
+only has to learn about new commits, which :class:`CommitIndex` does by
+walking from the requested tips and stopping at the heads it already holds.
+Every indexed commit has all of its ancestors indexed too.
+
+The index is opt-in: ``helixcommit index`` creates it, and later commands
+use it only when it exists.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from dateutil import tz
+
+from .models import CommitInfo, FileChange
+from .packfile import walk_commits
+from .parser import DEFAULT_CLASSIFIER, ChangeTypeClassifier
+
+INDEX_VERSION = 2
+DEFAULT_COMMIT_INDEX = Path(".helixcommit-cache/commits.sqlite3")
+
+UTC = tz.UTC
+
+
+@dataclass(slots=True)
+class IndexedCommit:
+    """Commit metadata plus its parsed Conventional Commit fields."""
+
+    sha: str
+    parents: List[str]
+    author_name: str
+    author_email: str
+    authored_timestamp: int
+    committed_timestamp: int
+    subject: str
+    body: str
+    change_type: str
+    scope: Optional[str] = None
+    breaking: bool = False
+    # None until a run that needed file lists has recorded them.
+    file_changes: Optional[List[FileChange]] = None
+
+    @classmethod
+    def from_commit(
+        cls,
+        commit: CommitInfo,
+        parents: Sequence[str],
+        classifier: ChangeTypeClassifier = DEFAULT_CLASSIFIER,
+    ) -> IndexedCommit:
+        parsed = commit.parsed
+        return cls(
+            sha=commit.sha,
+            parents=list(parents),
+            author_name=commit.author_name,
+            author_email=commit.author_email,
+            authored_timestamp=int(commit.authored_date.timestamp()),
+            committed_timestamp=int(commit.committed_date.timestamp()),
+            subject=commit.subject,
+            body=commit.body,
+            change_type=classifier.classify(commit.message),
+            scope=parsed.scope,
+            breaking=parsed.breaking,
+        )
+
+    def to_commit(self) -> CommitInfo:
+        file_changes = list(self.file_changes or [])
+        return CommitInfo(
+            sha=self.sha,
+            subject=self.subject,
+            body=self.body,
+            author_name=self.author_name,
+            author_email=self.author_email,
+            authored_date=datetime.fromtimestamp(self.authored_timestamp, tz=UTC),
+            committed_date=datetime.fromtimestamp(self.committed_timestamp, tz=UTC),
+            is_merge=len(self.parents) > 1,
+            files=[change.path for change in file_changes],
+            file_changes=file_changes,
+        )
+
+
+class CommitIndex:
+    """SQLite-backed commit index, read per commit and written incrementally.
+
+    Lookups decode only the commits a walk touches. New commits are inserted
+    as they are learned and committed on :meth:`save`. The heads of indexed
+    history have their own table, so a warm run never scans the whole index.
+    The database runs in WAL mode, so concurrent runs can share it. Stored
+    change types depend on the classifier, so an index built with other
+    ``[types]`` settings is cleared when opened.
+    """
+
+    def __init__(
+        self, path: Optional[Path], classifier: ChangeTypeClassifier = DEFAULT_CLASSIFIER
+    ) -> None:
+        self.path = path
+        self.classifier = classifier
+        self._lock = threading.Lock()
+        self._decoded: Dict[str, IndexedCommit] = {}
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(path) if path else ":memory:", timeout=30, check_same_thread=False
+        )
+        if path:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        for statement in (
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS commits (sha TEXT PRIMARY KEY, record TEXT NOT NULL)",
+            "CREATE TABLE IF NOT EXISTS parents (sha TEXT NOT NULL, parent TEXT NOT NULL)",
+            "CREATE INDEX IF NOT EXISTS parents_parent ON parents (parent)",
+            "CREATE TABLE IF NOT EXISTS heads (sha TEXT PRIMARY KEY)",
+        ):
+            self._connection.execute(statement)
+        self._connection.commit()
+        self._check_format()
+
+    def get(self, sha: str) -> Optional[IndexedCommit]:
+        entry = self._decoded.get(sha)
+        if entry is None:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT record FROM commits WHERE sha = ?", (sha,)
+                ).fetchone()
+            if row is None:
+                return None
+            entry = self._decoded[sha] = _decode(json.loads(row[0]))
+        return entry
+
+    def __contains__(self, sha: object) -> bool:
+        if sha in self._decoded:
+            return True
+        with self._lock:
+            return (
+                self._connection.execute(
+                    "SELECT 1 FROM commits WHERE sha = ?", (sha,)
+                ).fetchone()
+                is not None
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM commits").fetchone()[0]
+
+    def add(self, commit: CommitInfo, parents: Sequence[str]) -> IndexedCommit:
+        entry = IndexedCommit.from_commit(commit, parents, self.classifier)
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO commits (sha, record) VALUES (?, ?)",
+                (entry.sha, _dumps(entry)),
+            )
+            if cursor.rowcount:
+                self._connection.executemany(
+                    "INSERT INTO parents (sha, parent) VALUES (?, ?)",
+                    [(entry.sha, parent) for parent in entry.parents],
+                )
+                self._connection.executemany(
+                    "DELETE FROM heads WHERE sha = ?", [(parent,) for parent in entry.parents]
+                )
+                # git log lists children first, so an indexed child may exist.
+                if not self._connection.execute(
+                    "SELECT 1 FROM parents WHERE parent = ? LIMIT 1", (entry.sha,)
+                ).fetchone():
+                    self._connection.execute(
+                        "INSERT OR IGNORE INTO heads (sha) VALUES (?)", (entry.sha,)
+                    )
+        self._decoded[entry.sha] = entry
+        return entry
+
+    def set_file_changes(self, sha: str, file_changes: Sequence[FileChange]) -> None:
+        entry = self.get(sha)
+        if entry is not None:
+            entry.file_changes = list(file_changes)
+            with self._lock:
+                self._connection.execute(
+                    "UPDATE commits SET record = ? WHERE sha = ?", (_dumps(entry), sha)
+                )
+
+    def heads(self) -> List[str]:
+        """Return indexed commits that are not a parent of any indexed commit."""
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT sha FROM heads")]
+
+    def walk(
+        self,
+        include: Sequence[str],
+        exclude: Sequence[str] = (),
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[IndexedCommit]:
+        """Walk indexed history in ``git log`` order; all tips must be indexed."""
+        return walk_commits(self._lookup, include, exclude, since=since, until=until)
+
+    def classify(self, commit: CommitInfo) -> Tuple[str, Optional[str]]:
+        """Return ``(type, scope)`` for a commit, parsing only if it is unindexed."""
+        entry = self.get(commit.sha)
+        if entry is not None:
+            return entry.change_type, entry.scope
+        return self.classifier.classify(commit.message), commit.parsed.scope
+
+    def save(self) -> None:
+        """Commit the commits and file lists added since the last save."""
+        with self._lock:
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def _check_format(self) -> None:
+        expected = {"version": str(INDEX_VERSION), "taxonomy": self.classifier.fingerprint}
+        with self._lock, self._connection:
+            stored = dict(self._connection.execute("SELECT key, value FROM meta").fetchall())
+            if stored == expected:
+                return
+            # Another format, or change types from different type settings.
+            for table in ("commits", "parents", "heads", "meta"):
+                self._connection.execute(f"DELETE FROM {table}")
+            self._connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)", list(expected.items())
+            )
+
+    def _lookup(self, sha: str) -> IndexedCommit:
+        entry = self.get(sha)
+        if entry is None:
+            raise KeyError(f"Commit {sha} is not indexed")
+        return entry
+
+
+def _dumps(entry: IndexedCommit) -> str:
+    return json.dumps(_encode(entry), separators=(",", ":"))
+
+
+def _encode(entry: IndexedCommit) -> list:
+    files = None
+    if entry.file_changes is not None:
+        files = [
+            [change.path, change.insertions, change.deletions, int(change.binary)]
+            for change in entry.file_changes
+        ]
+    return [
+        entry.sha,
+        entry.parents,
+        entry.author_name,
+        entry.author_email,
+        entry.authored_timestamp,
+        entry.committed_timestamp,
+        entry.subject,
+        entry.body,
+        entry.change_type,
+        entry.scope,
+        int(entry.breaking),
+        files,
+    ]
+
+
+def _decode(record: Iterable) -> IndexedCommit:
+    (
+        sha,
+        parents,
+        author_name,
+        author_email,
+        authored_timestamp,
+        committed_timestamp,
+        subject,
+        body,
+        change_type,
+        scope,
+        breaking,
+        files,
+    ) = record
+    file_changes = None
+    if files is not None:
+        file_changes = [
+            FileChange(path=path, insertions=added, deletions=removed, binary=bool(binary))
+            for path, added, removed, binary in files
+        ]
+    return IndexedCommit(
+        sha=sha,
+        parents=list(parents),
+        author_name=author_name,
+        author_email=author_email,
+        authored_timestamp=int(authored_timestamp),
+        committed_timestamp=int(committed_timestamp),
+        subject=subject,
+        body=body,
+        change_type=change_type,
+        scope=scope,
+        breaking=bool(breaking),
+        file_changes=file_changes,
+    )
+
+
+__all__ = ["DEFAULT_COMMIT_INDEX", "CommitIndex", "IndexedCommit"]
@@ -11,6 +11,19 @@ from typing import Any, Dict, List, Optional, Sequence, Union
 
 import yaml
 
+from .parser import ChangeTypeClassifier
+from .summarizer import (
+    DEFAULT_EARLY_EXIT_THRESHOLD,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PIPELINE_BATCH_SIZE,
+)
+from .tiers import (
+    DEFAULT_LIGHT_MAX_LINES,
+    DEFAULT_TITLE_MAX_LINES,
+    DEFAULT_TRIVIAL_TYPES,
+    TierPolicy,
+)
+
 if sys.version_info >= (3, 11):
     import tomllib
 else:
@@ -100,6 +113,17 @@ class AIConfig:
     domain_scope: Optional[str] = None
     expert_roles: List[str] = field(default_factory=list)
     rag_backend: str = "simple"
+    max_workers: int = DEFAULT_MAX_WORKERS
+    max_batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE
+    # One structured call per entry instead of separate expert/merge/critique calls.
+    fused: bool = False
+    # Opt-in: skip synthesis/critique when the pipeline's output is already settled.
+    early_exit: bool = False
+    early_exit_threshold: float = DEFAULT_EARLY_EXIT_THRESHOLD
+    stop_on_agreement: bool = False
+    # Provider quotas; unset leaves the scheduler defaults (env vars, free-model caps).
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
 
 
 @dataclass
@@ -124,6 +148,50 @@ class TemplateConfig:
         return getattr(self, format_name, None)
 
 
+@dataclass
+class TypesConfig:
+    """Custom change types layered on top of the built-in taxonomy."""
+
+    custom: List[str] = field(default_factory=list)
+    aliases: Dict[str, str] = field(default_factory=dict)
+    patterns: Dict[str, str] = field(default_factory=dict)
+    keywords: Dict[str, List[str]] = field(default_factory=dict)
+
+    def build_classifier(self) -> ChangeTypeClassifier:
+        """Build the change-type classifier for these settings.
+
+        Raises:
+            ValueError: If an alias or pattern targets an unknown type, or a
+                pattern is not a valid regular expression.
+        """
+        return ChangeTypeClassifier.extended(
+            types=self.custom,
+            aliases=self.aliases,
+            patterns=self.patterns,
+            keywords=self.keywords,
+        )
+
+
+@dataclass
+class TiersConfig:
+    """Routing of change entries to cheaper summarization tiers (opt-in)."""
+
+    enabled: bool = False
+    trivial_types: List[str] = field(default_factory=lambda: sorted(DEFAULT_TRIVIAL_TYPES))
+    title_max_lines: int = DEFAULT_TITLE_MAX_LINES
+    light_max_lines: int = DEFAULT_LIGHT_MAX_LINES
+
+    def build_policy(self) -> Optional[TierPolicy]:
+        """Build the tier policy, or ``None`` when every entry should take the full pipeline."""
+        if not self.enabled:
+            return None
+        return TierPolicy(
+            trivial_types=frozenset(name.strip().lower() for name in self.trivial_types),
+            title_max_lines=self.title_max_lines,
+            light_max_lines=self.light_max_lines,
+        )
+
+
 @dataclass
 class FileConfig:
     """Parsed configuration from a config file."""
@@ -131,6 +199,8 @@ class FileConfig:
     generate: GenerateConfig = field(default_factory=GenerateConfig)
     ai: AIConfig = field(default_factory=AIConfig)
     templates: TemplateConfig = field(default_factory=TemplateConfig)
+    types: TypesConfig = field(default_factory=TypesConfig)
+    tiers: TiersConfig = field(default_factory=TiersConfig)
     _source_path: Optional[Path] = None
 
     @property
@@ -249,6 +319,8 @@ class ConfigLoader:
         generate_data = data.get("generate", {})
         ai_data = data.get("ai", {})
         templates_data = data.get("templates", {})
+        types_data = data.get("types", {})
+        tiers_data = data.get("tiers", {})
 
         generate_config = GenerateConfig(
             format=generate_data.get("format", "markdown"),
@@ -275,14 +347,40 @@ class ConfigLoader:
             domain_scope=ai_data.get("domain_scope"),
             expert_roles=ai_data.get("expert_roles", []),
             rag_backend=ai_data.get("rag_backend", "simple"),
+            max_workers=ai_data.get("max_workers", DEFAULT_MAX_WORKERS),
+            max_batch_size=ai_data.get("max_batch_size", DEFAULT_PIPELINE_BATCH_SIZE),
+            fused=ai_data.get("fused", False),
+            early_exit=ai_data.get("early_exit", False),
+            early_exit_threshold=ai_data.get(
+                "early_exit_threshold", DEFAULT_EARLY_EXIT_THRESHOLD
+            ),
+            stop_on_agreement=ai_data.get("stop_on_agreement", False),
+            requests_per_minute=ai_data.get("requests_per_minute"),
+            tokens_per_minute=ai_data.get("tokens_per_minute"),
         )
 
         template_config = self._parse_templates(templates_data, source_path)
 
+        types_config = TypesConfig(
+            custom=types_data.get("custom", []),
+            aliases=types_data.get("aliases", {}),
+            patterns=types_data.get("patterns", {}),
+            keywords=types_data.get("keywords", {}),
+        )
+
+        tiers_config = TiersConfig(
+            enabled=tiers_data.get("enabled", False),
+            trivial_types=tiers_data.get("trivial_types", sorted(DEFAULT_TRIVIAL_TYPES)),
+            title_max_lines=tiers_data.get("title_max_lines", DEFAULT_TITLE_MAX_LINES),
+            light_max_lines=tiers_data.get("light_max_lines", DEFAULT_LIGHT_MAX_LINES),
+        )
+
         return FileConfig(
             generate=generate_config,
             ai=ai_config,
             templates=template_config,
+            types=types_config,
+            tiers=tiers_config,
             _source_path=source_path,
         )
 
@@ -335,6 +433,8 @@ __all__ = [
     "GenerateConfig",
     "AIConfig",
     "TemplateConfig",
+    "TypesConfig",
+    "TiersConfig",
     "FileConfig",
     "ConfigLoader",
     "load_config",
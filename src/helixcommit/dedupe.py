@@ -0,0 +1,174 @@
+"""Detect templated change titles so only one per template is summarized.
+
+Dependency bots write one entry per bump ("bump lodash from 4.17.20 to
+4.17.21"). Titles are tokenized and version-like tokens become placeholders.
+In dependency templates ("bump", "update dependency", ...) titles may also
+differ in exactly one other token, the package. Any other word difference
+("fix crash" vs. "fix hang") keeps titles apart. One representative per
+template is summarized, and the other summaries are filled in by swapping
+the representative's values for each member's own.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+VERSION_PLACEHOLDER = "<version>"
+NAME_PLACEHOLDER = "<name>"
+
+_TOKEN_RE = re.compile(r"[^\s,;:()\[\]'\"`]+")
+# Dotted or v-prefixed versions and commit hashes; bare numbers ("part 2") are words.
+_VERSION_RE = re.compile(
+    r"(?:v\d+(?:\.\d+)*|\d+(?:\.\d+)+)(?:[-+][0-9A-Za-z][0-9A-Za-z.+-]*)?"
+    r"|(?=[0-9a-f]*\d)[0-9a-f]{7,40}"
+)
+
+# A title word may only vary in templates containing one of these words,
+# where it names the package being changed.
+PACKAGE_CONTEXT_WORDS = frozenset(
+    {
+        "bump", "bumps", "bumped", "update", "updates", "updated", "upgrade",
+        "upgrades", "upgraded", "pin", "pins", "pinned", "dependency",
+        "dependencies", "deps", "package", "crate", "module",
+    }
+)  # fmt: skip
+
+TemplateKey = Tuple[str, ...]
+
+
+@dataclass(slots=True)
+class TemplateCluster:
+    """Titles sharing one template; ``values`` hold each member's slot values."""
+
+    key: TemplateKey
+    members: List[int]
+    values: List[Tuple[str, ...]]
+    name_slots: Tuple[int, ...]
+
+    def fill(self, summary: str, source: int, target: int) -> Optional[str]:
+        """Rewrite ``summary`` of member ``source`` for member ``target``.
+
+        Returns ``None`` when the summary does not mention the values that set
+        the two titles apart, since the rewrite would then describe the wrong
+        change.
+        """
+        swap = self._replacements(source, target)
+        if swap is None:
+            return None
+        replacements, required = swap
+        if not replacements:
+            return summary
+        filled, found = _substitute(summary, replacements)
+        if not found or not required <= found:
+            return None
+        return filled
+
+    def same_context(
+        self, source_text: Optional[str], target_text: Optional[str], source: int, target: int
+    ) -> bool:
+        """Whether ``target_text`` is ``source_text`` with the title values swapped.
+
+        The builder compares the files two members touch this way before a
+        summary is shared, so a member that changes something else is
+        summarized on its own. Two empty texts match.
+        """
+        source_text = (source_text or "").strip()
+        target_text = (target_text or "").strip()
+        if source_text == target_text:
+            return True
+        swap = self._replacements(source, target)
+        if swap is None or not swap[0]:
+            return False
+        return _substitute(source_text, swap[0])[0] == target_text
+
+    def _replacements(self, source: int, target: int) -> Optional[Tuple[Dict[str, str], Set[str]]]:
+        source_values = self.values[self.members.index(source)]
+        target_values = self.values[self.members.index(target)]
+        replacements: Dict[str, str] = {}
+        required = set()
+        for slot, (old, new) in enumerate(zip(source_values, target_values)):
+            if old == new:
+                continue
+            if replacements.setdefault(old, new) != new:
+                return None
+            if slot in self.name_slots:
+                required.add(old)
+        return replacements, required
+
+
+def _substitute(text: str, replacements: Dict[str, str]) -> Tuple[str, Set[str]]:
+    """Replace whole-token occurrences of the keys; return the text and the keys found."""
+    pattern = re.compile(
+        "|".join(
+            rf"(?<![\w.]){re.escape(old)}(?!\.?\w)"
+            for old in sorted(replacements, key=len, reverse=True)
+        )
+    )
+    found: Set[str] = set()
+
+    def substitute(match: re.Match[str]) -> str:
+        found.add(match.group(0))
+        return replacements[match.group(0)]
+
+    return pattern.sub(substitute, text), found
+
+
+def _tokenize(title: str) -> List[Tuple[str, bool]]:
+    tokens = []
+    for match in _TOKEN_RE.finditer(title):
+        token = match.group(0).rstrip(".")
+        if token:
+            tokens.append((token, _VERSION_RE.fullmatch(token) is not None))
+    return tokens
+
+
+def template_clusters(titles: Sequence[str]) -> List[TemplateCluster]:
+    """Group ``titles`` by template, returning clusters with two or more members.
+
+    A template needs at least one version placeholder, and a word may only
+    differ in dependency templates, so ordinary titles that differ by one word
+    are never merged, even when they mention the same version.
+    """
+    candidates: List[List[Tuple[TemplateKey, Tuple[str, ...], Tuple[int, ...]]]] = []
+    counts: Counter[TemplateKey] = Counter()
+    for title in titles:
+        tokens = _tokenize(title)
+        versions = [index for index, (_, is_version) in enumerate(tokens) if is_version]
+        options: List[Tuple[TemplateKey, Tuple[str, ...], Tuple[int, ...]]] = []
+        if versions:
+            shape = [
+                VERSION_PLACEHOLDER if is_version else token.lower()
+                for token, is_version in tokens
+            ]
+            version_values = tuple(tokens[index][0] for index in versions)
+            options.append((tuple(shape), version_values, ()))
+            words = {token.lower() for token, is_version in tokens if not is_version}
+            package_template = not words.isdisjoint(PACKAGE_CONTEXT_WORDS)
+            for position, (token, is_version) in enumerate(tokens):
+                if is_version or not package_template or token.lower() in PACKAGE_CONTEXT_WORDS:
+                    continue
+                masked = list(shape)
+                masked[position] = NAME_PLACEHOLDER
+                options.append((tuple(masked), (token, *version_values), (0,)))
+        candidates.append(options)
+        counts.update(key for key, _, _ in options)
+
+    clusters: Dict[TemplateKey, TemplateCluster] = {}
+    for index, options in enumerate(candidates):
+        if not options:
+            continue
+        # The template shared with the most titles wins; max() keeps the
+        # first on ties, which prefers the unmasked shape.
+        key, values, name_slots = max(options, key=lambda option: counts[option[0]])
+        if counts[key] < 2:
+            continue
+        cluster = clusters.setdefault(key, TemplateCluster(key, [], [], name_slots))
+        cluster.members.append(index)
+        cluster.values.append(values)
+    return [cluster for cluster in clusters.values() if len(cluster.members) > 1]
+
+
+__all__ = ["TemplateCluster", "template_clusters"]
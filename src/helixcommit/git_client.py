@@ -2,16 +2,43 @@
 
 from __future__ import annotations
 
+import os
 import re
 import subprocess
+import threading
+import weakref
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Generator,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 from dateutil import tz
 
-from .models import CommitInfo
+from .commit_index import CommitIndex
+from .models import CommitInfo, FileChange
+from .packfile import (
+    CommitGraphInfo,
+    CommitHeader,
+    PackRepository,
+    find_common_dir,
+    find_git_dir,
+    read_commit_graph_info,
+)
 
 try:  # pragma: no cover - import fallback
     import git  # type: ignore[import]
@@ -21,6 +48,28 @@ except Exception:  # pragma: no cover
 
 UTC = tz.UTC
 
+# Marks the start of every commit record in streamed ``git log`` output.
+RECORD_SEPARATOR = b"\x1e"
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_DIFF_CHARS = 4000
+# Requests written to a coprocess before its responses are read back; small
+# enough that the request bytes always fit in the stdin pipe buffer.
+PIPELINE_WINDOW = 256
+BINARY_PATCH_MARKERS = (b"Binary files ", b"GIT binary patch")
+
+T = TypeVar("T")
+
+# Shared options for streamed patches: first-parent diffs for merges (as
+# GitPython's ``parents[0].diff`` produced) and no user colour/diff drivers.
+PATCH_ARGS = (
+    "--format=%x1e%H",
+    "--diff-merges=first-parent",
+    "--no-color",
+    "--no-ext-diff",
+)
+
+BACKENDS = ("gitpython", "cli", "pack")
+
 
 @dataclass(slots=True)
 class CommitRange:
@@ -33,6 +82,12 @@ class CommitRange:
     include_merges: bool = True
     max_count: Optional[int] = None
     paths: Sequence[str] = ()
+    # Filters evaluated by git (see ``helixcommit.query``): case-insensitive
+    # fixed strings, any of which must occur in the author ("Name <email>")
+    # or in the message, and paths whose changes do not count.
+    authors: Sequence[str] = ()
+    grep: Sequence[str] = ()
+    exclude_paths: Sequence[str] = ()
 
     def rev_spec(self) -> str:
         """Return a revision spec usable by git."""
@@ -44,6 +99,21 @@ class CommitRange:
             return f"{since}..HEAD"
         return until or "HEAD"
 
+    def is_path_limited(self) -> bool:
+        return bool(self.paths or self.exclude_paths)
+
+    def matches(self, author_name: str, author_email: str, message: str) -> bool:
+        """Apply ``authors`` and ``grep`` the way ``git log -F -i`` does."""
+        if self.authors:
+            author = f"{author_name} <{author_email}>".lower()
+            if not any(pattern.lower() in author for pattern in self.authors):
+                return False
+        if self.grep:
+            lowered = message.lower()
+            if not any(pattern.lower() in lowered for pattern in self.grep):
+                return False
+        return True
+
 
 @dataclass(slots=True)
 class TagInfo:
@@ -56,22 +126,99 @@ class TagInfo:
     is_annotated: bool = False
 
 
+@dataclass(slots=True)
+class GitObject:
+    """Raw object returned by ``git cat-file --batch``."""
+
+    sha: str
+    type: str
+    size: int
+    data: bytes = b""
+
+
+class TagIndex:
+    """Tags keyed by name and ordered newest first.
+
+    Lookups by name are dictionary hits; ``filter`` keeps the date order.
+    """
+
+    def __init__(self, tags: Iterable[TagInfo]) -> None:
+        # Newest first; for equal dates the later ref in name order wins.
+        indexed_tags = list(enumerate(tags))
+        indexed_tags.sort(
+            key=lambda item: (item[1].tagged_date or datetime.min.replace(tzinfo=UTC), item[0]),
+            reverse=True,
+        )
+        self._ordered = [tag for _, tag in indexed_tags]
+        self._by_name = {tag.name: tag for tag in self._ordered}
+
+    def get(self, name: str) -> Optional[TagInfo]:
+        return self._by_name.get(name)
+
+    def latest(self) -> Optional[TagInfo]:
+        return self._ordered[0] if self._ordered else None
+
+    def filter(self, pattern: Optional[str] = None) -> List[TagInfo]:
+        """Return tags whose name matches the regex ``pattern``, newest first."""
+        if not pattern:
+            return list(self._ordered)
+        regex = re.compile(pattern)
+        return [tag for tag in self._ordered if regex.search(tag.name)]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[TagInfo]:
+        return iter(self._ordered)
+
+    def __len__(self) -> int:
+        return len(self._ordered)
+
+
 class GitRepository:
-    """Wrapper around GitPython with a subprocess fallback."""
+    """Wrapper around GitPython with a subprocess fallback.
 
-    def __init__(self, path: Path, *, prefer_gitpython: bool = True) -> None:
+    ``backend`` selects how commits are scanned: ``"gitpython"``, ``"cli"``
+    or ``"pack"``, which reads pack and loose objects directly from ``.git``
+    without GitPython or a subprocess. Other operations use git itself.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        prefer_gitpython: bool = True,
+        backend: Optional[str] = None,
+        commit_index: Optional[CommitIndex] = None,
+    ) -> None:
+        if backend is None:
+            backend = "gitpython" if prefer_gitpython else "cli"
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown git backend {backend!r}; expected one of {BACKENDS}.")
         self.path = path
         self._repo = None
         self._use_gitpython = False
-        if prefer_gitpython and git is not None:
+        self._objects: Optional[CatFileBatch] = None
+        self._diff_server: Optional[_DiffTreeServer] = None
+        self._git_dir = find_git_dir(path)
+        self._pack: Optional[PackRepository] = None
+        self.commit_index = commit_index
+        self._tag_indexes: Dict[Optional[str], Tuple[Optional[Tuple[int, ...]], TagIndex]] = {}
+        if backend == "gitpython" and git is not None:
             try:
                 self._repo = git.Repo(path)
             except Exception:  # pragma: no cover - fall back to CLI
                 self._repo = None
-        if self._repo is not None:
+        if backend == "pack":
+            if self._git_dir is None:
+                raise RuntimeError("Git repository not found or git CLI unavailable.")
+            self.backend = "pack"
+        elif self._repo is not None:
             self._use_gitpython = True
+            self.backend = "gitpython"
         else:
             self._ensure_git_cli_available()
+            self.backend = "cli"
 
     # ------------------------------------------------------------------
     # Public API
@@ -82,72 +229,160 @@ class GitRepository:
         *,
         include_diffs: bool = False,
         include_files: bool = False,
-    ) -> Iterator[CommitInfo]:
-        """Iterate over commits in the given range."""
-        if self._use_gitpython:
-            yield from self._iter_commits_gitpython(
-                commit_range, include_diffs=include_diffs, include_files=include_files
-            )
-        else:
-            yield from self._iter_commits_cli(
-                commit_range, include_diffs=include_diffs, include_files=include_files
-            )
+    ) -> Generator[CommitInfo, None, None]:
+        """Iterate over commits in the given range.
 
-    def get_commit_diff(self, sha: str, max_chars: int = 4000) -> str:
-        """Fetch the diff for a specific commit, truncated to max_chars."""
-        if self._use_gitpython and self._repo is not None:
-            try:
-                commit = self._repo.commit(sha)
-                # Get diff against parent (or empty tree if root)
-                parent = commit.parents[0] if commit.parents else None
-                diffs = parent.diff(commit, create_patch=True) if parent else commit.diff(None, create_patch=True)
-                
-                full_diff = "\n".join(
-                    (d.diff.tobytes().decode("utf-8", errors="replace") if isinstance(d.diff, memoryview)
-                     else d.diff.decode("utf-8", errors="replace") if isinstance(d.diff, (bytes, bytearray))
-                     else str(d.diff))
-                    for d in diffs
-                    if d.diff
+        Commits are yielded while git is still walking history. File churn and
+        diffs come from one extra streamed ``git log`` each, not per commit.
+        With a ``commit_index``, ranges without path filters are served from
+        the index once any commits it has not seen yet are added to it.
+        """
+        file_stats = self._bulk_file_changes(commit_range) if include_files else None
+        patches = self._bulk_commit_diffs(commit_range) if include_diffs else None
+        try:
+            if self.commit_index is not None and not commit_range.is_path_limited():
+                yield from self._iter_commits_indexed(
+                    commit_range, file_stats=file_stats, patches=patches
                 )
-                return full_diff[:max_chars]
-            except Exception:
+            elif self.backend != "cli" and self._prefers_git_walk(commit_range):
+                yield from self._iter_commits_cli(
+                    commit_range, file_stats=file_stats, patches=patches
+                )
+            elif self._use_gitpython:
+                yield from self._iter_commits_gitpython(
+                    commit_range, file_stats=file_stats, patches=patches
+                )
+            elif self.backend == "pack":
+                yield from self._iter_commits_pack(
+                    commit_range, file_stats=file_stats, patches=patches
+                )
+            else:
+                yield from self._iter_commits_cli(
+                    commit_range, file_stats=file_stats, patches=patches
+                )
+        finally:
+            for cursor in (file_stats, patches):
+                if cursor is not None:
+                    cursor.close()
+
+    def commit_graph(self) -> CommitGraphInfo:
+        """Describe the commit-graph and changed-path Bloom filters on disk."""
+        if self._git_dir is not None:
+            return read_commit_graph_info(find_common_dir(self._git_dir) / "objects")
+        if self._repo is not None:
+            return read_commit_graph_info(Path(self._repo.common_dir) / "objects")
+        return CommitGraphInfo()
+
+    def write_commit_graph(self, *, changed_paths: bool = True) -> CommitGraphInfo:
+        """Write a commit-graph for all reachable commits, with Bloom filters.
+
+        git uses the graph to parse commits without inflating them and the
+        changed-path filters to skip tree diffs for path-limited walks.
+        """
+        args = ["commit-graph", "write", "--reachable"]
+        if changed_paths:
+            args.append("--changed-paths")
+        self._run_git(*args)
+        return self.commit_graph()
+
+    def get_commit_diff(self, sha: str, max_chars: int = MAX_DIFF_CHARS) -> str:
+        """Fetch the diff for a specific commit, truncated to max_chars.
+
+        The patch is streamed from git and decoding stops once ``max_chars``
+        characters have been collected; binary file sections are skipped.
+        """
+        try:
+            commit = self.objects.info([f"{sha}^{{commit}}"])[0]
+            if commit is None:
                 return ""
-        
-        # CLI fallback
+            return self._diff_tree.diff(commit.sha, max_chars=max_chars)
+        except Exception:
+            pass
+        # The coprocess died or rejected the object; retry with a one-shot git.
+        args = ["show", "--patch", *PATCH_ARGS, sha]
         try:
-            # git show --format= --patch <sha>
-            output = self._run_git("show", "--format=", "--patch", sha)
-            return output[:max_chars]
+            for _sha, patch in self._stream_patches(args, max_chars=max_chars):
+                return patch
         except Exception:
             return ""
+        return ""
+
+    def patch_ids(self, shas: Iterable[str]) -> Dict[str, str]:
+        """Map commits to their ``git patch-id --stable``.
+
+        A patch id hashes the diff without line numbers or whitespace, so a
+        commit keeps it when rebased, cherry-picked or backported. Commits
+        without a diff are missing from the result, and so is everything when
+        git fails.
+        """
+        revisions = "".join(f"{sha}\n" for sha in dict.fromkeys(shas)).encode()
+        if not revisions:
+            return {}
+        try:
+            log = subprocess.Popen(
+                [
+                    "git",
+                    "log",
+                    "--stdin",
+                    "--no-walk=unsorted",
+                    "--patch",
+                    "--format=commit %H",
+                    *PATCH_ARGS[1:],
+                ],
+                cwd=self.path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            assert log.stdin is not None and log.stdout is not None
+            # git log reads every revision before it prints anything.
+            log.stdin.write(revisions)
+            log.stdin.close()
+            try:
+                output = subprocess.run(
+                    ["git", "patch-id", "--stable"],
+                    cwd=self.path,
+                    stdin=log.stdout,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                ).stdout
+            finally:
+                log.stdout.close()
+                log.wait()
+        except (OSError, subprocess.CalledProcessError):
+            return {}
+        if log.returncode != 0:
+            return {}
+        patch_ids: Dict[str, str] = {}
+        for line in output.decode("ascii", errors="replace").splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                patch_ids[parts[1]] = parts[0]
+        return patch_ids
 
     def list_tags(self, pattern: Optional[str] = None) -> List[TagInfo]:
         """Return repository tags, newest first."""
-        if self._use_gitpython:
-            tags = self._list_tags_gitpython()
-        else:
-            tags = self._list_tags_cli()
-        if pattern:
-            regex = re.compile(pattern)
-            tags = [tag for tag in tags if regex.search(tag.name)]
-        # Sort by date (newest first), using index as secondary key to preserve chronological order
-        # When dates are equal, higher index (newer tag) should come first
-        indexed_tags = list(enumerate(tags))
-        return [
-            tag
-            for _, tag in sorted(
-                indexed_tags,
-                key=lambda item: (item[1].tagged_date or datetime.min.replace(tzinfo=UTC), item[0]),
-                reverse=True,
-            )
-        ]
+        return self.tag_index().filter(pattern)
 
     def get_tag(self, name: str) -> Optional[TagInfo]:
         """Return a single tag by name."""
-        for tag in self.list_tags():
-            if tag.name == name:
-                return tag
-        return None
+        return self.tag_index().get(name)
+
+    def tag_index(self, glob: Optional[str] = None) -> TagIndex:
+        """Return the tag index, rebuilding it only when tag refs changed.
+
+        ``glob`` is passed to ``for-each-ref`` (e.g. ``"v*"``) so that only
+        matching tags are read. Each glob has its own cached index, checked
+        against the mtimes of ``packed-refs`` and the ``refs/tags`` tree.
+        """
+        stamp = self._tag_refs_stamp()
+        cached = self._tag_indexes.get(glob)
+        if cached is not None and stamp is not None and cached[0] == stamp:
+            return cached[1]
+        index = TagIndex(self._list_tags_batch(glob))
+        self._tag_indexes[glob] = (stamp, index)
+        return index
 
     def resolve_default_branch(self) -> str:
         """Infer the repository's default branch, defaulting to main."""
@@ -268,6 +503,33 @@ class GitRepository:
 
         self._run_git("commit", "-m", message)
 
+    @property
+    def objects(self) -> CatFileBatch:
+        """Return the repository's long-lived ``git cat-file`` object server."""
+        if self._objects is None:
+            self._objects = CatFileBatch(self.path)
+        return self._objects
+
+    def close(self) -> None:
+        """Stop any long-lived git coprocesses owned by this repository."""
+        if self._objects is not None:
+            self._objects.close()
+            self._objects = None
+        if self._diff_server is not None:
+            self._diff_server.close()
+            self._diff_server = None
+        if self._pack is not None:
+            self._pack.close()
+            self._pack = None
+        if self.commit_index is not None:
+            self.commit_index.save()
+
+    def __enter__(self) -> GitRepository:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
@@ -275,15 +537,25 @@ class GitRepository:
         self,
         commit_range: CommitRange,
         *,
-        include_diffs: bool = False,
-        include_files: bool = False,
-    ) -> Iterator[CommitInfo]:
+        file_stats: Optional[_CommitCursor[List[FileChange]]] = None,
+        patches: Optional[_CommitCursor[str]] = None,
+    ) -> Generator[CommitInfo, None, None]:
         assert self._repo is not None  # for type checkers
         kwargs = {
             "rev": commit_range.rev_spec(),
             "max_count": commit_range.max_count,
-            "paths": list(commit_range.paths) or None,
+            "paths": _pathspecs(commit_range) or None,
         }
+        if not commit_range.include_merges and not commit_range.max_count:
+            kwargs["no_merges"] = True
+        if commit_range.authors or commit_range.grep:
+            kwargs.update(fixed_strings=True, regexp_ignore_case=True)
+            if commit_range.authors:
+                kwargs["author"] = list(commit_range.authors)
+            if commit_range.grep:
+                kwargs["grep"] = list(commit_range.grep)
+        if commit_range.exclude_paths:
+            kwargs["full_history"] = True
         if commit_range.since_date:
             kwargs["since"] = commit_range.since_date.isoformat()
         if commit_range.until_date:
@@ -306,12 +578,12 @@ class GitRepository:
             committed_date = datetime.fromtimestamp(raw_commit.committed_date, tz=UTC)
             
             diff = None
-            if include_diffs:
-                diff = self.get_commit_diff(raw_commit.hexsha)
+            if patches is not None:
+                diff = patches.get(raw_commit.hexsha)
 
-            files: List[str] = []
-            if include_files:
-                files = self._get_commit_files_gitpython(raw_commit)
+            file_changes: List[FileChange] = []
+            if file_stats is not None:
+                file_changes = file_stats.get(raw_commit.hexsha)
 
             yield CommitInfo(
                 sha=raw_commit.hexsha,
@@ -323,35 +595,119 @@ class GitRepository:
                 committed_date=committed_date,
                 is_merge=len(raw_commit.parents) > 1,
                 diff=diff,
-                files=files,
+                files=[change.path for change in file_changes],
+                file_changes=file_changes,
             )
 
     def _iter_commits_cli(
         self,
         commit_range: CommitRange,
         *,
-        include_diffs: bool = False,
-        include_files: bool = False,
-    ) -> Iterator[CommitInfo]:
-        rev = commit_range.rev_spec()
+        file_stats: Optional[_CommitCursor[List[FileChange]]] = None,
+        patches: Optional[_CommitCursor[str]] = None,
+    ) -> Generator[CommitInfo, None, None]:
+        # Records are parsed as soon as git emits them; closing this generator
+        # early (e.g. once a search has enough hits) terminates git.
+        for commit, _parents in self._log_entries(self._range_args(commit_range)):
+            if not commit_range.include_merges and commit.is_merge:
+                continue
+            if patches is not None:
+                commit.diff = patches.get(commit.sha)
+            if file_stats is not None:
+                commit.file_changes = file_stats.get(commit.sha)
+                commit.files = [change.path for change in commit.file_changes]
+            yield commit
+
+    def _iter_commits_indexed(
+        self,
+        commit_range: CommitRange,
+        *,
+        file_stats: Optional[_CommitCursor[List[FileChange]]] = None,
+        patches: Optional[_CommitCursor[str]] = None,
+    ) -> Generator[CommitInfo, None, None]:
+        """Serve the range from the commit index after indexing any new commits.
+
+        The range endpoints are resolved by ``git rev-parse`` itself. If they
+        or any commit the walk reaches are not indexed (e.g. in a shallow
+        clone), the rest of the range comes from ``git log``.
+        """
+        index = self.commit_index
+        assert index is not None
+        include, exclude = self._git_range_tips(commit_range)
+        self._update_commit_index([include, *exclude])
+        seen: Set[str] = set()
+        try:
+            if not all(sha in index for sha in (include, *exclude)):
+                raise KeyError(include)
+            walk = index.walk(
+                [include],
+                exclude,
+                since=commit_range.since_date,
+                until=commit_range.until_date,
+            )
+            for count, entry in enumerate(walk):
+                if commit_range.max_count and count >= commit_range.max_count:
+                    break
+                seen.add(entry.sha)
+                if not commit_range.include_merges and len(entry.parents) > 1:
+                    continue
+                commit = entry.to_commit()
+                if not commit_range.matches(
+                    commit.author_name, commit.author_email, commit.message
+                ):
+                    continue
+                if file_stats is not None and entry.file_changes is None:
+                    # File lists are only collected by runs that ask for them.
+                    commit.file_changes = file_stats.get(entry.sha)
+                    commit.files = [change.path for change in commit.file_changes]
+                    index.set_file_changes(entry.sha, commit.file_changes)
+                if patches is not None:
+                    commit.diff = patches.get(entry.sha)
+                yield commit
+        except KeyError:
+            for commit in self._iter_commits_cli(
+                commit_range, file_stats=file_stats, patches=patches
+            ):
+                if commit.sha not in seen:
+                    yield commit
+        finally:
+            index.save()
+
+    def index_commits(self, revisions: Sequence[str] = ("HEAD",)) -> int:
+        """Add commits reachable from ``revisions`` to the commit index.
+
+        Returns the number of indexed commits.
+        """
+        index = self.commit_index
+        if index is None:
+            raise RuntimeError("This repository was opened without a commit index.")
+        shas = self._run_git("rev-parse", *(f"{name}^{{commit}}" for name in revisions))
+        self._update_commit_index(shas.split())
+        return len(index)
+
+    def _update_commit_index(self, tips: Sequence[str]) -> None:
+        """Index commits reachable from ``tips`` that the index does not hold."""
+        index = self.commit_index
+        assert index is not None
+        missing = [sha for sha in dict.fromkeys(tips) if sha not in index]
+        if not missing:
+            return
+        # Everything reachable from an indexed head is already indexed.
+        heads = index.heads()
+        rev_args = [*missing, "--not", *heads] if heads else missing
+        for commit, parents in self._log_entries(rev_args):
+            index.add(commit, parents)
+        index.save()
+
+    def _log_entries(self, rev_args: Sequence[str]) -> Iterator[Tuple[CommitInfo, List[str]]]:
+        """Stream ``git log`` metadata records as ``(commit, parent shas)``."""
         args = [
             "log",
-            rev,
             "--pretty=format:%H%x1f%P%x1f%an%x1f%ae%x1f%at%x1f%ct%x1f%s%x1f%b%x1e",
+            *rev_args,
         ]
-        if commit_range.max_count:
-            args.extend(["-n", str(commit_range.max_count)])
-        if commit_range.since_date:
-            args.append(f"--since={commit_range.since_date.isoformat()}")
-        if commit_range.until_date:
-            args.append(f"--until={commit_range.until_date.isoformat()}")
-        if commit_range.paths:
-            args.append("--")
-            args.extend(commit_range.paths)
-        raw_output = self._run_git(*args)
-        if not raw_output.strip():
-            return
-        for entry in raw_output.strip("\n\x1e").split("\x1e"):
+        for record in self._stream_git(*args):
+            entry = record.decode("utf-8", errors="replace")
             if not entry.strip():
                 continue
             (
@@ -363,106 +719,301 @@ class GitRepository:
                 commit_ts,
                 subject,
                 body,
-            ) = entry.split("\x1f")
-            if not commit_range.include_merges and len(parents.split()) > 1:
-                continue
-            
-            diff = None
-            if include_diffs:
-                diff = self.get_commit_diff(sha)
-
-            files: List[str] = []
-            if include_files:
-                files = self._get_commit_files_cli(sha)
-
-            yield CommitInfo(
-                sha=sha,
+            ) = entry.split("\x1f", 7)
+            parent_shas = parents.split()
+            commit = CommitInfo(
+                sha=sha.strip(),
                 subject=subject.strip(),
                 body=body.strip(),
                 author_name=author_name.strip(),
                 author_email=author_email.strip(),
                 authored_date=datetime.fromtimestamp(int(author_ts), tz=UTC),
                 committed_date=datetime.fromtimestamp(int(commit_ts), tz=UTC),
-                is_merge=len(parents.split()) > 1,
-                diff=diff,
-                files=files,
+                is_merge=len(parent_shas) > 1,
             )
+            yield commit, parent_shas
 
-    def _get_commit_files_gitpython(self, raw_commit: Any) -> List[str]:
+    def _prefers_git_walk(self, commit_range: CommitRange) -> bool:
+        """Whether ``git log`` can answer this range from the commit-graph.
+
+        Path filters are probed against changed-path Bloom filters and date
+        cut-offs read commit dates from the graph, both inside git, so the
+        other backends hand such ranges to the streamed CLI walk.
+        """
+        if not (commit_range.paths or commit_range.since_date):
+            return False
+        graph = self.commit_graph()
+        if commit_range.paths:
+            return graph.changed_paths
+        return graph.exists
+
+    def _iter_commits_pack(
+        self,
+        commit_range: CommitRange,
+        *,
+        file_stats: Optional[_CommitCursor[List[FileChange]]] = None,
+        patches: Optional[_CommitCursor[str]] = None,
+    ) -> Generator[CommitInfo, None, None]:
+        if commit_range.is_path_limited():
+            # Path limiting needs tree diffs, which git computes far faster.
+            yield from self._iter_commits_cli(
+                commit_range, file_stats=file_stats, patches=patches
+            )
+            return
+        pack = self._pack_repository
+        include, exclude = self._range_tips(commit_range)
+        walk = pack.walk(
+            [include],
+            exclude,
+            since=commit_range.since_date,
+            until=commit_range.until_date,
+        )
+        seen: Set[str] = set()
         try:
-            stats = raw_commit.stats.files or {}
-            return sorted(stats.keys())
-        except Exception:
-            return []
+            for count, header in enumerate(walk):
+                # ``-n`` counts merges too, as it does for the other backends.
+                if commit_range.max_count and count >= commit_range.max_count:
+                    break
+                seen.add(header.sha)
+                if not commit_range.include_merges and len(header.parents) > 1:
+                    continue
+                if not commit_range.matches(
+                    header.author_name, header.author_email, header.message
+                ):
+                    continue
+                yield self._commit_from_header(header, file_stats=file_stats, patches=patches)
+        except KeyError:
+            # An object is missing (e.g. a partial clone); git can still walk
+            # it, and lists commits in the same order, so resume from there.
+            for commit in self._iter_commits_cli(
+                commit_range, file_stats=file_stats, patches=patches
+            ):
+                if commit.sha not in seen:
+                    yield commit
+
+    def _commit_from_header(
+        self,
+        header: CommitHeader,
+        *,
+        file_stats: Optional[_CommitCursor[List[FileChange]]],
+        patches: Optional[_CommitCursor[str]],
+    ) -> CommitInfo:
+        subject, body = self._split_message(header.message)
+        file_changes: List[FileChange] = []
+        if file_stats is not None:
+            file_changes = file_stats.get(header.sha)
+        return CommitInfo(
+            sha=header.sha,
+            subject=subject,
+            body=body,
+            author_name=header.author_name,
+            author_email=header.author_email,
+            authored_date=datetime.fromtimestamp(header.authored_timestamp, tz=UTC),
+            committed_date=datetime.fromtimestamp(header.committed_timestamp, tz=UTC),
+            is_merge=len(header.parents) > 1,
+            diff=patches.get(header.sha) if patches is not None else None,
+            files=[change.path for change in file_changes],
+            file_changes=file_changes,
+        )
+
+    def _range_tips(self, commit_range: CommitRange) -> Tuple[str, List[str]]:
+        """Resolve a range to the commit to walk from and the ones to exclude."""
+        left, separator, right = commit_range.rev_spec().partition("..")
+        if separator:
+            return self._resolve_commit(right or "HEAD"), [self._resolve_commit(left or "HEAD")]
+        return self._resolve_commit(left), []
+
+    def _git_range_tips(self, commit_range: CommitRange) -> Tuple[str, List[str]]:
+        """Like :meth:`_range_tips`, but resolved by ``git rev-parse`` in one call."""
+        left, separator, right = commit_range.rev_spec().partition("..")
+        names = [right or "HEAD", left or "HEAD"] if separator else [left]
+        shas = self._run_git("rev-parse", *(f"{name}^{{commit}}" for name in names))
+        include, *exclude = shas.split()
+        return include, exclude
+
+    def _resolve_commit(self, name: str) -> str:
+        """Resolve ``name`` from ``.git`` files, asking git for complex revisions."""
+        sha = self._pack_repository.resolve(name) if self._git_dir is not None else None
+        if sha is not None:
+            return sha
+        return self._run_git("rev-parse", "--verify", f"{name}^{{commit}}").strip()
+
+    @property
+    def _pack_repository(self) -> PackRepository:
+        if self._pack is None:
+            assert self._git_dir is not None
+            self._pack = PackRepository(self._git_dir)
+        return self._pack
+
+    def _range_args(self, commit_range: CommitRange) -> List[str]:
+        """Translate a commit range into ``git log``/``rev-list`` arguments."""
+        args = [commit_range.rev_spec()]
+        if commit_range.max_count:
+            args.extend(["-n", str(commit_range.max_count)])
+        elif not commit_range.include_merges:
+            # With ``-n`` merges still count towards the limit, so they are
+            # only dropped by git when there is no limit.
+            args.append("--no-merges")
+        if commit_range.since_date:
+            args.append(f"--since={commit_range.since_date.isoformat()}")
+        if commit_range.until_date:
+            args.append(f"--until={commit_range.until_date.isoformat()}")
+        if commit_range.authors or commit_range.grep:
+            args.extend(["--fixed-strings", "--regexp-ignore-case"])
+            args.extend(f"--author={pattern}" for pattern in commit_range.authors)
+            args.extend(f"--grep={pattern}" for pattern in commit_range.grep)
+        if commit_range.exclude_paths:
+            # Without it, merges simplify away whole lines of history.
+            args.append("--full-history")
+        if commit_range.is_path_limited():
+            args.append("--")
+            args.extend(_pathspecs(commit_range))
+        return args
 
-    def _get_commit_files_cli(self, sha: str) -> List[str]:
+    def _bulk_file_changes(self, commit_range: CommitRange) -> _CommitCursor[List[FileChange]]:
+        """Stream per-file churn for the whole range from one ``git log`` process.
+
+        Merge commits are diffed against their first parent, matching what
+        GitPython's ``Commit.stats`` reports.
+        """
+        args = [
+            "log",
+            "--numstat",
+            "-z",
+            "--no-renames",
+            "--diff-merges=first-parent",
+            "--format=%x1e%H",
+            *self._full_diff_args(commit_range),
+            *self._range_args(commit_range),
+        ]
+        records = (_parse_numstat_record(record) for record in self._stream_git(*args))
+        return _CommitCursor(records, fallback=self._get_commit_file_changes)
+
+    def _bulk_commit_diffs(
+        self, commit_range: CommitRange, max_chars: int = MAX_DIFF_CHARS
+    ) -> _CommitCursor[str]:
+        """Stream budgeted patches for the whole range from one ``git log -p``."""
+        args = [
+            "log",
+            "--patch",
+            *PATCH_ARGS,
+            *self._full_diff_args(commit_range),
+            *self._range_args(commit_range),
+        ]
+        return _CommitCursor(
+            self._stream_patches(args, max_chars=max_chars),
+            fallback=lambda sha: self.get_commit_diff(sha, max_chars=max_chars),
+        )
+
+    def _full_diff_args(self, commit_range: CommitRange) -> List[str]:
+        # Path limits select commits; churn and patches still cover every file.
+        return ["--full-diff"] if commit_range.is_path_limited() else []
+
+    def _stream_patches(self, args: Sequence[str], *, max_chars: int) -> Iterator[Tuple[str, str]]:
+        with self._git_process(*args) as stdout:
+            yield from _iter_patches(stdout, max_chars=max_chars)
+
+    def _get_commit_file_changes(self, sha: str) -> List[FileChange]:
         try:
-            output = self._run_git("show", "--pretty=format:", "--name-only", sha)
+            output = subprocess.run(
+                ["git", "show", "--numstat", "-z", "--no-renames", "--format=", sha],
+                cwd=self.path,
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            ).stdout
         except Exception:
             return []
-        return [line.strip() for line in output.splitlines() if line.strip()]
+        return _parse_numstat_entries(output)
 
-    def _list_tags_gitpython(self) -> List[TagInfo]:
-        assert self._repo is not None
-        tags: List[TagInfo] = []
-        for tag in self._repo.tags:
-            tagged_date = None
-            message = None
-            is_annotated = False
-            if tag.tag is not None:
-                is_annotated = True
-                tag_object = tag.tag
-                if tag_object.tagged_date:
-                    tagged_date = datetime.fromtimestamp(tag_object.tagged_date, tz=UTC)
-                message = (tag_object.message or "").strip() or None
-                sha = tag_object.object.hexsha
-            else:
-                # Lightweight tag pointing to a commit
-                commit = tag.commit
-                tagged_date = datetime.fromtimestamp(commit.committed_date, tz=UTC)
-                sha = commit.hexsha
-            tags.append(
-                TagInfo(
-                    name=tag.name,
-                    sha=sha,
-                    tagged_date=tagged_date,
-                    message=message,
-                    is_annotated=is_annotated,
-                )
-            )
-        return tags
+    def _list_tags_batch(self, glob: Optional[str] = None) -> List[TagInfo]:
+        """Read all tags, already peeled, with one ``for-each-ref``.
 
-    def _list_tags_cli(self) -> List[TagInfo]:
+        ``%(*objectname)`` gives the target of each annotated tag; only tags
+        of tags need further peeling, done over the ``cat-file`` server.
+        """
         output = self._run_git(
             "for-each-ref",
-            "--sort=-creatordate",
-            "--format=%(refname:short)%00%(objectname)%00%(creatordate:iso8601)%00%(contents)",
-            "refs/tags",
+            "--format=%(refname:short)%00%(objectname)%00%(objecttype)"
+            "%00%(*objectname)%00%(*objecttype)%00%(creatordate:unix)%00%(contents)%1e",
+            f"refs/tags/{glob}" if glob else "refs/tags",
         )
         tags: List[TagInfo] = []
-        for line in output.strip().splitlines():
-            if not line:
+        nested: List[TagInfo] = []
+        for record in output.split("\x1e"):
+            record = record.lstrip("\n")
+            if not record:
                 continue
-            name, sha, date_str, message = line.split("\x00", 3)
-            tagged_date: Optional[datetime]
-            message = message.strip() or None
-            if date_str:
-                tagged_date = datetime.fromisoformat(date_str)
-                if tagged_date.tzinfo is None:
-                    tagged_date = tagged_date.replace(tzinfo=UTC)
-            else:
-                tagged_date = None
-            tags.append(
-                TagInfo(
-                    name=name,
-                    sha=sha,
-                    tagged_date=tagged_date,
-                    message=message,
-                    is_annotated=bool(message),
-                )
+            name, sha, object_type, target, target_type, timestamp, message = record.split(
+                "\x00", 6
             )
+            is_annotated = object_type == "tag"
+            tag = TagInfo(
+                name=name,
+                sha=target if is_annotated and target else sha,
+                tagged_date=datetime.fromtimestamp(int(timestamp), tz=UTC) if timestamp else None,
+                message=(message.strip() or None) if is_annotated else None,
+                is_annotated=is_annotated,
+            )
+            if target_type == "tag":
+                nested.append(tag)
+            tags.append(tag)
+        peeled = self._peel_tags([tag.sha for tag in nested])
+        for tag in nested:
+            tag.sha = peeled.get(tag.sha, tag.sha)
         return tags
 
+    def _tag_refs_stamp(self) -> Optional[Tuple[int, ...]]:
+        """Fingerprint tag ref storage; None when it cannot be located."""
+        if self._git_dir is not None:
+            common_dir = find_common_dir(self._git_dir)
+        elif self._repo is not None:
+            common_dir = Path(self._repo.common_dir)
+        else:
+            return None
+        stamp: List[int] = []
+        try:
+            packed = os.stat(common_dir / "packed-refs")
+            stamp.extend((packed.st_mtime_ns, packed.st_size))
+        except OSError:
+            stamp.append(0)
+        # Creating, moving or deleting a loose ref renames an entry in its
+        # directory, which updates that directory's mtime.
+        for directory, _subdirs, _files in os.walk(common_dir / "refs" / "tags"):
+            try:
+                stamp.append(os.stat(directory).st_mtime_ns)
+            except OSError:
+                return None
+        return tuple(stamp)
+
+    def _peel_tags(self, shas: Sequence[str]) -> Dict[str, str]:
+        """Map annotated tag object ids to the non-tag object they point at."""
+        peeled: Dict[str, str] = {}
+        # Each round follows one level of tag-to-tag nesting for every tag.
+        targets = {sha: sha for sha in dict.fromkeys(shas)}
+        while targets:
+            pending = list(dict.fromkeys(targets.values()))
+            objects = dict(zip(pending, self.objects.read(pending)))
+            next_targets: Dict[str, str] = {}
+            for origin, current in targets.items():
+                obj = objects.get(current)
+                if obj is None or obj.type != "tag":
+                    peeled[origin] = current
+                    continue
+                target = _tag_target(obj.data)
+                if target is None:
+                    peeled[origin] = current
+                else:
+                    next_targets[origin] = target
+            targets = next_targets
+        return peeled
+
+    @property
+    def _diff_tree(self) -> _DiffTreeServer:
+        if self._diff_server is None:
+            self._diff_server = _DiffTreeServer(self.path)
+        return self._diff_server
+
     def _split_message(self, message: str) -> Tuple[str, str]:
         if not message:
             return "", ""
@@ -471,6 +1022,61 @@ class GitRepository:
         body = parts[1].strip() if len(parts) > 1 else ""
         return subject, body
 
+    @contextmanager
+    def _git_process(self, *args: str) -> Iterator[IO[bytes]]:
+        """Run git with a streamed stdout pipe.
+
+        Leaving the block early (for example when a consuming generator is
+        closed) kills git instead of draining its output. A non-zero exit
+        after the output was fully read raises ``CalledProcessError``.
+        """
+        process = subprocess.Popen(
+            ["git", *args],
+            cwd=self.path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        assert process.stdout is not None and process.stderr is not None
+        aborted = False
+        try:
+            yield process.stdout
+        except BaseException:
+            aborted = True
+            process.kill()
+            raise
+        finally:
+            process.stdout.close()
+            stderr = process.stderr.read()
+            process.stderr.close()
+            returncode = process.wait()
+        if not aborted and returncode != 0:
+            raise subprocess.CalledProcessError(
+                returncode, ["git", *args], stderr=stderr.decode("utf-8", errors="replace")
+            )
+
+    def _stream_git(self, *args: str, separator: bytes = RECORD_SEPARATOR) -> Iterator[bytes]:
+        """Run git and yield raw output records as soon as they are complete."""
+        with self._git_process(*args) as stdout:
+            buffer = bytearray()
+            while True:
+                chunk = stdout.read1(STREAM_CHUNK_SIZE)  # type: ignore[attr-defined]
+                if not chunk:
+                    break
+                # Only rescan the tail that could hold a separator split across reads.
+                scan_from = max(len(buffer) - len(separator) + 1, 0)
+                buffer += chunk
+                start = 0
+                index = buffer.find(separator, scan_from)
+                while index != -1:
+                    if index > start:
+                        yield bytes(buffer[start:index])
+                    start = index + len(separator)
+                    index = buffer.find(separator, start)
+                if start:
+                    del buffer[:start]
+            if buffer:
+                yield bytes(buffer)
+
     def _run_git(self, *args: str) -> str:
         completed = subprocess.run(
             ["git", *args],
@@ -489,4 +1095,333 @@ class GitRepository:
             raise RuntimeError("Git repository not found or git CLI unavailable.") from exc
 
 
-__all__ = ["CommitRange", "GitRepository", "TagInfo"]
+class _GitCoprocess:
+    """A long-lived git process that answers newline-terminated requests.
+
+    Requests are pipelined: up to ``PIPELINE_WINDOW`` of them are written
+    before the matching responses are read back, so a batch of lookups costs
+    one pipe round-trip per window rather than one process per object.
+    """
+
+    def __init__(self, path: Path, args: Sequence[str]) -> None:
+        self.path = path
+        self.args = list(args)
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self._lock = threading.Lock()
+
+    def exchange(
+        self,
+        requests: Sequence[bytes],
+        read_response: Callable[[IO[bytes]], T],
+    ) -> List[T]:
+        results: List[T] = []
+        with self._lock:
+            process = self._ensure_started()
+            assert process.stdin is not None and process.stdout is not None
+            try:
+                for start in range(0, len(requests), PIPELINE_WINDOW):
+                    window = requests[start : start + PIPELINE_WINDOW]
+                    process.stdin.write(b"".join(window))
+                    process.stdin.flush()
+                    results.extend(read_response(process.stdout) for _ in window)
+            except BaseException:
+                # A partial exchange leaves unread responses in the pipe.
+                self._stop()
+                raise
+        return results
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+    def _ensure_started(self) -> subprocess.Popen[bytes]:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                ["git", *self.args],
+                cwd=self.path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            weakref.finalize(self, _stop_process, self._process)
+        return self._process
+
+    def _stop(self) -> None:
+        if self._process is not None:
+            _stop_process(self._process)
+            self._process = None
+
+
+class CatFileBatch:
+    """Persistent ``git cat-file --batch`` / ``--batch-check`` object server.
+
+    Both coprocesses start lazily on first use and serve commit, tag and tree
+    lookups for the lifetime of the owning :class:`GitRepository`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._batch = _GitCoprocess(path, ["cat-file", "--batch"])
+        self._check = _GitCoprocess(path, ["cat-file", "--batch-check"])
+
+    def read(self, names: Sequence[str]) -> List[Optional[GitObject]]:
+        """Return full objects (header and content) for ``names`` in order."""
+        return self._batch.exchange(_object_requests(names), _read_batch_object)
+
+    def info(self, names: Sequence[str]) -> List[Optional[GitObject]]:
+        """Return object headers only, without transferring content."""
+        return self._check.exchange(_object_requests(names), _read_batch_header)
+
+    def read_one(self, name: str) -> Optional[GitObject]:
+        return self.read([name])[0]
+
+    def close(self) -> None:
+        self._batch.close()
+        self._check.close()
+
+
+class _DiffTreeServer:
+    """Persistent ``git diff-tree --stdin --patch`` coprocess.
+
+    diff-tree echoes input lines that are not commit ids, which gives each
+    response an unambiguous terminator.
+    """
+
+    SENTINEL = b"\x1dhelixcommit-end\n"
+
+    def __init__(self, path: Path) -> None:
+        self._process = _GitCoprocess(
+            path, ["diff-tree", "--stdin", "--root", "--patch", *PATCH_ARGS]
+        )
+
+    def diff(self, sha: str, *, max_chars: int) -> str:
+        return self.diffs([sha], max_chars=max_chars)[0]
+
+    def diffs(self, shas: Sequence[str], *, max_chars: int) -> List[str]:
+        requests = [_request_line(sha) + self.SENTINEL for sha in shas]
+        return self._process.exchange(
+            requests, lambda stdout: self._read_patch(stdout, max_chars)
+        )
+
+    def _read_patch(self, stdout: IO[bytes], max_chars: int) -> str:
+        patch = _PatchBuffer(max_chars)
+        while True:
+            line = stdout.readline()
+            if not line:
+                raise OSError("git diff-tree exited unexpectedly")
+            if line == self.SENTINEL:
+                return patch.finish()
+            if line.startswith(RECORD_SEPARATOR):
+                continue
+            patch.feed(line)
+
+    def close(self) -> None:
+        self._process.close()
+
+
+class _CommitCursor(Generic[T]):
+    """Align a streamed per-commit ``git log`` walk with a commit iterator.
+
+    Both walks traverse the same range in the same order, so lookups normally
+    consume the stream one record at a time. Records that are passed over are
+    kept until requested; commits missing from the stream use ``fallback``.
+    """
+
+    def __init__(
+        self,
+        records: Iterator[Tuple[str, T]],
+        *,
+        fallback: Callable[[str], T],
+    ) -> None:
+        self._records = records
+        self._pending: Dict[str, T] = {}
+        self._fallback = fallback
+
+    def get(self, sha: str) -> T:
+        if sha in self._pending:
+            return self._pending.pop(sha)
+        for record_sha, value in self._records:
+            if record_sha == sha:
+                return value
+            self._pending[record_sha] = value
+        return self._fallback(sha)
+
+    def close(self) -> None:
+        """Stop the underlying stream, terminating its git process."""
+        close = getattr(self._records, "close", None)
+        if close is not None:
+            close()
+
+
+class _PatchBuffer:
+    """Collect one commit's patch text up to a character budget.
+
+    File sections are held as raw bytes until their first hunk so binary
+    sections can be dropped without ever being decoded.
+    """
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self._parts: List[str] = []
+        self._size = 0
+        self._header: List[bytes] = []
+        self._in_file = False
+        self._skip_file = False
+
+    @property
+    def full(self) -> bool:
+        return self.max_chars > 0 and self._size >= self.max_chars
+
+    def feed(self, line: bytes) -> None:
+        if self.full:
+            return
+        if line.startswith(b"diff --git "):
+            self._flush_header()
+            self._in_file = True
+            self._skip_file = False
+            self._header = [line]
+            return
+        if not self._in_file or self._skip_file:
+            return
+        if self._header:
+            if line.startswith(BINARY_PATCH_MARKERS):
+                self._header = []
+                self._skip_file = True
+                return
+            if not line.startswith((b"--- ", b"@@")):
+                self._header.append(line)
+                return
+            self._flush_header()
+        self._append(line)
+
+    def finish(self) -> str:
+        self._flush_header()
+        return "".join(self._parts)
+
+    def _flush_header(self) -> None:
+        header, self._header = self._header, []
+        for line in header:
+            self._append(line)
+
+    def _append(self, line: bytes) -> None:
+        if self.full:
+            return
+        text = line.decode("utf-8", errors="replace")
+        if self.max_chars > 0:
+            text = text[: self.max_chars - self._size]
+        self._parts.append(text)
+        self._size += len(text)
+
+
+def _iter_patches(lines: Iterable[bytes], *, max_chars: int) -> Iterator[Tuple[str, str]]:
+    """Split a ``--format=%x1e%H --patch`` stream into ``(sha, patch)`` pairs."""
+    sha: Optional[str] = None
+    patch = _PatchBuffer(max_chars)
+    for line in lines:
+        if line.startswith(RECORD_SEPARATOR):
+            if sha is not None:
+                yield sha, patch.finish()
+            sha = line[len(RECORD_SEPARATOR) :].strip().decode("ascii")
+            patch = _PatchBuffer(max_chars)
+            continue
+        patch.feed(line)
+    if sha is not None:
+        yield sha, patch.finish()
+
+
+def _parse_numstat_record(record: bytes) -> Tuple[str, List[FileChange]]:
+    sha, _, entries = record.partition(b"\x00")
+    return sha.decode("ascii").strip(), _parse_numstat_entries(entries)
+
+
+def _parse_numstat_entries(data: bytes) -> List[FileChange]:
+    changes: List[FileChange] = []
+    for entry in data.split(b"\x00"):
+        entry = entry.lstrip(b"\n")
+        if not entry:
+            continue
+        parts = entry.split(b"\t", 2)
+        if len(parts) != 3:
+            continue
+        added, deleted, path = parts
+        binary = added == b"-" or deleted == b"-"
+        changes.append(
+            FileChange(
+                path=path.decode("utf-8", errors="replace"),
+                insertions=0 if binary else int(added),
+                deletions=0 if binary else int(deleted),
+                binary=binary,
+            )
+        )
+    return changes
+
+
+def _pathspecs(commit_range: CommitRange) -> List[str]:
+    return [
+        *commit_range.paths,
+        *(f":(exclude){path}" for path in commit_range.exclude_paths),
+    ]
+
+
+def _stop_process(process: subprocess.Popen[bytes]) -> None:
+    if process.poll() is None:
+        try:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=1)
+        except Exception:
+            process.kill()
+            process.wait()
+    for stream in (process.stdin, process.stdout):
+        if stream is not None and not stream.closed:
+            stream.close()
+
+
+def _request_line(name: str) -> bytes:
+    if not name or "\n" in name:
+        raise ValueError(f"Invalid object name: {name!r}")
+    return name.encode("utf-8") + b"\n"
+
+
+def _object_requests(names: Sequence[str]) -> List[bytes]:
+    return [_request_line(name) for name in names]
+
+
+def _read_batch_header(stdout: IO[bytes]) -> Optional[GitObject]:
+    header = stdout.readline()
+    if not header:
+        raise OSError("git cat-file exited unexpectedly")
+    parts = header.split()
+    # "<name> missing" / "<name> ambiguous" responses carry no size.
+    if len(parts) != 3:
+        return None
+    sha, object_type, size = parts
+    return GitObject(sha=sha.decode("ascii"), type=object_type.decode("ascii"), size=int(size))
+
+
+def _read_batch_object(stdout: IO[bytes]) -> Optional[GitObject]:
+    obj = _read_batch_header(stdout)
+    if obj is None:
+        return None
+    obj.data = stdout.read(obj.size)
+    stdout.read(1)  # trailing LF after the content
+    return obj
+
+
+def _tag_target(data: bytes) -> Optional[str]:
+    for line in data.split(b"\n"):
+        if not line:
+            break
+        if line.startswith(b"object "):
+            return line[len(b"object ") :].strip().decode("ascii")
+    return None
+
+
+__all__ = [
+    "CatFileBatch",
+    "CommitGraphInfo",
+    "CommitRange",
+    "GitObject",
+    "GitRepository",
+    "TagIndex",
+    "TagInfo",
+]
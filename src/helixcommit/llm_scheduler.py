@@ -0,0 +1,384 @@
+"""Rate-limit-aware scheduling for LLM chat requests.
+
+Summarizers and the commit generator send every chat completion through a
+:class:`RequestScheduler` shared per provider and model. It keeps requests
+and tokens per minute under the configured quotas with token buckets, and
+adapts how many requests run at once AIMD-style: the limit grows by one per
+window of successes and halves when the provider answers 429. The delay a
+429 asks for (``retry-after``) pauses every caller of that provider and model,
+not just the one that hit it.
+
+:class:`SingleFlight` lets identical requests issued at the same time share
+one call.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+from .tokens import HEURISTIC_TOKENIZER
+
+try:  # pragma: no cover - optional dependency guard
+    from openai import APIConnectionError, RateLimitError  # type: ignore[import]
+except Exception:  # pragma: no cover - optional dependency guard
+    APIConnectionError = RateLimitError = None  # type: ignore[assignment,misc]
+
+T = TypeVar("T")
+
+DEFAULT_PROVIDER = "api.openai.com"
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_CAP = 60.0
+# OpenRouter caps ":free" model variants at 20 requests per minute.
+FREE_MODEL_REQUESTS_PER_MINUTE = 20
+
+RPM_ENV = "HELIXCOMMIT_LLM_RPM"
+TPM_ENV = "HELIXCOMMIT_LLM_TPM"
+CONCURRENCY_ENV = "HELIXCOMMIT_LLM_MAX_CONCURRENCY"
+RETRY_MAX_ENV = "HELIXCOMMIT_LLM_MAX_RETRIES"
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    try:
+        seconds = float(value)
+        return max(0.0, seconds)
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        delta = (parsed - datetime.now(timezone.utc)).total_seconds()
+        return max(0.0, delta)
+
+
+def _retry_after_seconds(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return max(0.0, float(milliseconds) / 1000.0)
+        except ValueError:
+            pass
+    header = headers.get("retry-after")
+    if not header:
+        return None
+    return _parse_retry_after(header)
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """Return whether ``exc`` is a rate-limit (HTTP 429) error from the API."""
+    if RateLimitError is not None and isinstance(exc, RateLimitError):
+        return True
+    return getattr(exc, "status_code", None) == 429
+
+
+def _is_transient(exc: BaseException) -> bool:
+    if APIConnectionError is not None and isinstance(exc, APIConnectionError):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+def estimate_tokens(messages: Iterable[Mapping[str, Any]], max_tokens: int = 0) -> int:
+    """Roughly estimate the tokens a chat request counts against a quota.
+
+    Providers charge the prompt plus the completion budget up front, so the
+    estimate is the message text at about four characters per token plus
+    ``max_tokens``.
+    """
+    total = max_tokens
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            total += HEURISTIC_TOKENIZER.count(content)
+        elif content is not None:
+            total += HEURISTIC_TOKENIZER.count(json.dumps(content, ensure_ascii=False))
+    return total
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` tokens per minute.
+
+    Not thread-safe on its own; :class:`RequestScheduler` guards it.
+    """
+
+    def __init__(self, per_minute: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return how many seconds to wait before using them.
+
+        The balance may go negative, which queues later reservations behind
+        this one. Amounts above the capacity are clamped so a single large
+        request can still run.
+        """
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= min(float(amount), self.capacity)
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+
+class RequestScheduler:
+    """Throttle, pace, and retry the LLM requests sent to one provider and model."""
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_cap: float = DEFAULT_BACKOFF_CAP,
+        clock: Optional[Callable[[], float]] = None,
+        sleep_func: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        self._clock = clock or time.monotonic
+        self._sleep = sleep_func or time.sleep
+        self._condition = threading.Condition()
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = max(0.0, backoff_base)
+        self.backoff_cap = max(self.backoff_base, backoff_cap)
+        # Fractional so additive increase can add 1 / limit per success.
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._decreased_at = float("-inf")
+        self._requests: Optional[TokenBucket] = None
+        self._tokens: Optional[TokenBucket] = None
+        self.set_limits(requests_per_minute, tokens_per_minute)
+
+    @property
+    def concurrency(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return max(1, int(self._limit))
+
+    def set_limits(
+        self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None
+    ) -> None:
+        """Replace the per-minute quotas; ``None`` or ``0`` means unlimited."""
+        with self._condition:
+            self.requests_per_minute = requests_per_minute or None
+            self.tokens_per_minute = tokens_per_minute or None
+            self._requests = (
+                TokenBucket(requests_per_minute, clock=self._clock) if requests_per_minute else None
+            )
+            self._tokens = (
+                TokenBucket(tokens_per_minute, clock=self._clock) if tokens_per_minute else None
+            )
+
+    def call(
+        self,
+        func: Callable[[], T],
+        *,
+        tokens: int = 0,
+        on_retry: Optional[Callable[[int, float, BaseException], None]] = None,
+    ) -> T:
+        """Run ``func`` once quota and a concurrency slot are available.
+
+        Rate-limit (429), server (5xx), and connection errors are retried up
+        to ``max_retries`` times; anything else, the last failure, or a
+        ``retry-after`` longer than ``backoff_cap`` is raised. ``on_retry(attempt, delay, error)`` is called before each
+        retry.
+        """
+        attempt = 0
+        while True:
+            started = self._acquire(tokens)
+            try:
+                result = func()
+            except Exception as exc:
+                rate_limited = is_rate_limited(exc)
+                self._release(started, rate_limited=rate_limited)
+                if not (rate_limited or _is_transient(exc)) or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after_seconds(exc)
+                if delay is None:
+                    delay = self._compute_backoff(attempt)
+                elif delay > self.backoff_cap:
+                    # A quota that resets this far out (e.g. a daily cap) will
+                    # not recover within a run; fail instead of stalling.
+                    raise
+                if rate_limited:
+                    self._pause(delay)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(attempt, delay, exc)
+                if not rate_limited:
+                    self._sleep(delay)
+                continue
+            self._release(started, rate_limited=False)
+            return result
+
+    def _acquire(self, tokens: int) -> float:
+        while True:
+            with self._condition:
+                pause = self._paused_until - self._clock()
+                if pause <= 0:
+                    while self._in_flight >= self.concurrency:
+                        self._condition.wait()
+                    pause = self._paused_until - self._clock()
+                if pause <= 0:
+                    self._in_flight += 1
+                    wait = 0.0
+                    if self._requests is not None:
+                        wait = self._requests.reserve(1)
+                    if self._tokens is not None and tokens > 0:
+                        wait = max(wait, self._tokens.reserve(tokens))
+                    break
+            self._sleep(pause)
+        if wait > 0:
+            self._sleep(wait)
+        return self._clock()
+
+    def _release(self, started: float, *, rate_limited: bool) -> None:
+        with self._condition:
+            self._in_flight -= 1
+            if rate_limited:
+                # Requests already in flight when the limit dropped report the
+                # same congestion; only the first of them halves the limit.
+                if started >= self._decreased_at:
+                    self._limit = max(1.0, self._limit / 2)
+                    self._decreased_at = self._clock()
+            else:
+                self._limit = min(float(self.max_concurrency), self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def _pause(self, delay: float) -> None:
+        with self._condition:
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+
+    def _compute_backoff(self, attempt: int) -> float:
+        base = min(self.backoff_cap, self.backoff_base * (2**attempt))
+        return min(self.backoff_cap, base * (1 + random.random()))
+
+
+class _Flight:
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs ``func``; callers arriving while it is
+    in flight wait and get its result or exception. Nothing is kept once the
+    call finishes, so later calls run again (pair with a cache for that).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, func: Callable[[], T]) -> T:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+
+_SCHEDULERS: Dict[Tuple[str, str], RequestScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def _provider_key(base_url: Optional[str]) -> str:
+    if not base_url:
+        return DEFAULT_PROVIDER
+    return (urlparse(base_url).hostname or base_url).lower()
+
+
+def get_scheduler(
+    base_url: Optional[str],
+    model: str,
+    *,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+) -> RequestScheduler:
+    """Return the scheduler shared by every client of ``model`` at ``base_url``.
+
+    Quotas come from the arguments, then the ``HELIXCOMMIT_LLM_RPM`` and
+    ``HELIXCOMMIT_LLM_TPM`` environment variables. Without either, requests are
+    unlimited except for OpenRouter ``:free`` models. Passing a quota to an
+    existing scheduler updates it.
+    """
+    key = (_provider_key(base_url), model)
+    with _SCHEDULERS_LOCK:
+        scheduler = _SCHEDULERS.get(key)
+        if scheduler is None:
+            default_rpm = FREE_MODEL_REQUESTS_PER_MINUTE if model.endswith(":free") else None
+            scheduler = RequestScheduler(
+                requests_per_minute=requests_per_minute or _env_int(RPM_ENV, default_rpm),
+                tokens_per_minute=tokens_per_minute or _env_int(TPM_ENV, None),
+                max_concurrency=_env_int(CONCURRENCY_ENV, DEFAULT_MAX_CONCURRENCY)
+                or DEFAULT_MAX_CONCURRENCY,
+                max_retries=_env_int(RETRY_MAX_ENV, DEFAULT_MAX_RETRIES) or 0,
+            )
+            _SCHEDULERS[key] = scheduler
+        elif requests_per_minute or tokens_per_minute:
+            scheduler.set_limits(
+                requests_per_minute or scheduler.requests_per_minute,
+                tokens_per_minute or scheduler.tokens_per_minute,
+            )
+    return scheduler
+
+
+__all__ = [
+    "RequestScheduler",
+    "SingleFlight",
+    "TokenBucket",
+    "estimate_tokens",
+    "get_scheduler",
+    "is_rate_limited",
+]
@@ -4,7 +4,19 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .parser import ParsedCommitMessage, parse_commit_message
+
+
+@dataclass
+class FileChange:
+    """Per-file churn recorded for a commit (``git log --numstat``)."""
+
+    path: str
+    insertions: int = 0
+    deletions: int = 0
+    binary: bool = False
 
 
 @dataclass
@@ -23,6 +35,21 @@ class CommitInfo:
     labels: List[str] = field(default_factory=list)
     diff: Optional[str] = None
     files: List[str] = field(default_factory=list)
+    file_changes: List[FileChange] = field(default_factory=list)
+    # Message the parse below was computed from, so edits invalidate it.
+    _parsed: Optional[Tuple[str, ParsedCommitMessage]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def insertions(self) -> int:
+        """Return the total number of added lines across all files."""
+        return sum(change.insertions for change in self.file_changes)
+
+    @property
+    def deletions(self) -> int:
+        """Return the total number of removed lines across all files."""
+        return sum(change.deletions for change in self.file_changes)
 
     @property
     def message(self) -> str:
@@ -31,6 +58,15 @@ class CommitInfo:
             return f"{self.subject}\n\n{self.body}".strip()
         return self.subject
 
+    @property
+    def parsed(self) -> ParsedCommitMessage:
+        """Return the parsed commit message, shared by every stage that needs it."""
+        message = self.message
+        cached = self._parsed
+        if cached is None or cached[0] != message:
+            cached = self._parsed = (message, parse_commit_message(message))
+        return cached[1]
+
     def short_sha(self, length: int = 7) -> str:
         """Return the short SHA for display purposes."""
         return self.sha[:length]
@@ -92,5 +128,6 @@ __all__ = [
     "Changelog",
     "ChangelogSection",
     "CommitInfo",
+    "FileChange",
     "PullRequestInfo",
 ]
@@ -0,0 +1,687 @@
+"""Read-only access to Git object storage without GitPython or a subprocess.
+
+Pack indexes and packfiles are memory-mapped and only the objects a caller
+asks for are inflated. Loose objects are read as a fallback. This module is
+the basis of the ``pack`` backend of :class:`helixcommit.git_client.GitRepository`.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import re
+import struct
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+TYPE_NAMES = {OBJ_COMMIT: "commit", OBJ_TREE: "tree", OBJ_BLOB: "blob", OBJ_TAG: "tag"}
+
+PACK_INDEX_SIGNATURE = b"\xfftOc"
+COMMIT_GRAPH_SIGNATURE = b"CGPH"
+# Chunks written by ``git commit-graph write --changed-paths``.
+BLOOM_CHUNKS = (b"BIDX", b"BDAT")
+SHA_LENGTH = 20
+INFLATE_CHUNK_SIZE = 4096
+DELTA_BASE_CACHE_SIZE = 256
+# Index entries small enough to scan linearly instead of bisecting further.
+INDEX_SCAN_ENTRIES = 64
+# Extra commits popped after only uninteresting ones remain, to tolerate
+# clock skew (same idea as git's SLOP in revision.c).
+WALK_SLOP = 5
+
+HEADER_LINE = re.compile(rb"^(tree|parent|author|committer|encoding) (.*)$", re.MULTILINE)
+SIGNATURE = re.compile(rb"^(.*?) ?<([^>]*)> ?(\d*)")
+
+# Anything with ``parents`` and ``committed_timestamp`` can be walked.
+WalkCommit = Any
+CommitLookup = Callable[[str], WalkCommit]
+
+# Ref namespaces tried for a short name, in git's ``rev-parse`` order.
+REF_SEARCH_PATTERNS = (
+    "{}",
+    "refs/{}",
+    "refs/tags/{}",
+    "refs/heads/{}",
+    "refs/remotes/{}",
+    "refs/remotes/{}/HEAD",
+)
+
+
+class PackIndex:
+    """Memory-mapped version 2 ``.idx`` file."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != PACK_INDEX_SIGNATURE or struct.unpack_from(">I", self._map, 4)[0] != 2:
+            self._map.close()
+            raise ValueError(f"Unsupported pack index format: {path}")
+        self._fanout = struct.unpack_from(">256I", self._map, 8)
+        self.count = self._fanout[255]
+        self._names_start = 8 + 256 * 4
+        self._offsets_start = self._names_start + self.count * (SHA_LENGTH + 4)
+        self._large_offsets_start = self._offsets_start + self.count * 4
+
+    def find(self, sha: bytes) -> Optional[int]:
+        """Return the pack offset of a binary object id, if present."""
+        low = self._fanout[sha[0] - 1] if sha[0] else 0
+        high = self._fanout[sha[0]]
+        while high - low > INDEX_SCAN_ENTRIES:
+            middle = (low + high) // 2
+            start = self._names_start + middle * SHA_LENGTH
+            candidate = self._map[start : start + SHA_LENGTH]
+            if candidate < sha:
+                low = middle + 1
+            elif candidate > sha:
+                high = middle
+            else:
+                return self._offset(middle)
+        # Finish with a C-speed scan of the remaining, sorted window.
+        start = self._names_start + low * SHA_LENGTH
+        window = self._map[start : self._names_start + high * SHA_LENGTH]
+        found = window.find(sha)
+        while found != -1 and found % SHA_LENGTH:
+            found = window.find(sha, found + 1)
+        if found == -1:
+            return None
+        return self._offset(low + found // SHA_LENGTH)
+
+    def _offset(self, position: int) -> int:
+        (offset,) = struct.unpack_from(">I", self._map, self._offsets_start + position * 4)
+        if offset & 0x80000000:
+            large_index = offset & 0x7FFFFFFF
+            (offset,) = struct.unpack_from(
+                ">Q", self._map, self._large_offsets_start + large_index * 8
+            )
+        return offset
+
+    def close(self) -> None:
+        self._map.close()
+
+
+class PackFile:
+    """Memory-mapped ``.pack`` file that inflates objects on demand."""
+
+    def __init__(self, path: Path, index: PackIndex, store: ObjectStore) -> None:
+        self.path = path
+        self.index = index
+        self._store = store
+        with path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:4] != b"PACK":
+            self._map.close()
+            raise ValueError(f"Not a packfile: {path}")
+        self._view = memoryview(self._map)
+        self._bases: OrderedDict[int, Tuple[str, bytes]] = OrderedDict()
+
+    def read(self, offset: int) -> Tuple[str, bytes]:
+        """Return ``(type, content)`` for the object stored at ``offset``."""
+        type_number, _size, position = self._entry_header(offset)
+        if type_number == OBJ_OFS_DELTA:
+            distance, position = self._ofs_delta_distance(position)
+            base_type, base = self._read_base(offset - distance)
+            return base_type, _apply_delta(base, self._inflate(position))
+        if type_number == OBJ_REF_DELTA:
+            base_sha = bytes(self._view[position : position + SHA_LENGTH])
+            found = self._store.read_binary(base_sha)
+            if found is None:
+                raise KeyError(f"Missing delta base {base_sha.hex()} in {self.path}")
+            base_type, base = found
+            return base_type, _apply_delta(base, self._inflate(position + SHA_LENGTH))
+        if type_number not in TYPE_NAMES:
+            raise ValueError(f"Unknown pack object type {type_number} in {self.path}")
+        return TYPE_NAMES[type_number], self._inflate(position)
+
+    def close(self) -> None:
+        self._bases.clear()
+        self._view.release()
+        self._map.close()
+
+    def _read_base(self, offset: int) -> Tuple[str, bytes]:
+        cached = self._bases.get(offset)
+        if cached is not None:
+            self._bases.move_to_end(offset)
+            return cached
+        value = self.read(offset)
+        self._bases[offset] = value
+        if len(self._bases) > DELTA_BASE_CACHE_SIZE:
+            self._bases.popitem(last=False)
+        return value
+
+    def _entry_header(self, position: int) -> Tuple[int, int, int]:
+        byte = self._map[position]
+        position += 1
+        type_number = (byte >> 4) & 0x7
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = self._map[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+        return type_number, size, position
+
+    def _ofs_delta_distance(self, position: int) -> Tuple[int, int]:
+        byte = self._map[position]
+        position += 1
+        distance = byte & 0x7F
+        while byte & 0x80:
+            byte = self._map[position]
+            position += 1
+            distance = ((distance + 1) << 7) | (byte & 0x7F)
+        return distance, position
+
+    def _inflate(self, position: int) -> bytes:
+        decompressor = zlib.decompressobj()
+        parts: List[bytes] = []
+        while not decompressor.eof:
+            chunk = self._view[position : position + INFLATE_CHUNK_SIZE]
+            if not chunk:
+                raise ValueError(f"Truncated object data in {self.path}")
+            position += len(chunk)
+            parts.append(decompressor.decompress(chunk))
+        return b"".join(parts)
+
+
+class ObjectStore:
+    """Look objects up across packfiles, then loose object files."""
+
+    def __init__(self, objects_dir: Path) -> None:
+        self.object_dirs = [objects_dir, *_alternate_object_dirs(objects_dir)]
+        self._packs: List[PackFile] = []
+        for directory in self.object_dirs:
+            for index_path in sorted((directory / "pack").glob("*.idx")):
+                pack_path = index_path.with_suffix(".pack")
+                if not pack_path.exists():
+                    continue
+                self._packs.append(PackFile(pack_path, PackIndex(index_path), self))
+
+    def read(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        """Return ``(type, content)`` for a hex object id, or None if absent."""
+        try:
+            binary = bytes.fromhex(sha)
+        except ValueError:
+            return None
+        if len(binary) != SHA_LENGTH:
+            return None
+        return self.read_binary(binary)
+
+    def read_binary(self, sha: bytes) -> Optional[Tuple[str, bytes]]:
+        for pack in self._packs:
+            offset = pack.index.find(sha)
+            if offset is not None:
+                return pack.read(offset)
+        return self._read_loose(sha.hex())
+
+    def close(self) -> None:
+        for pack in self._packs:
+            pack.close()
+            pack.index.close()
+        self._packs = []
+
+    def _read_loose(self, sha: str) -> Optional[Tuple[str, bytes]]:
+        for directory in self.object_dirs:
+            path = directory / sha[:2] / sha[2:]
+            try:
+                raw = zlib.decompress(path.read_bytes())
+            except FileNotFoundError:
+                continue
+            header, _, content = raw.partition(b"\x00")
+            object_type, _, _size = header.partition(b" ")
+            return object_type.decode("ascii"), content
+        return None
+
+
+@dataclass(slots=True)
+class CommitHeader:
+    """Fields parsed straight from a raw commit object."""
+
+    sha: str
+    tree: str
+    parents: List[str] = field(default_factory=list)
+    author_name: str = ""
+    author_email: str = ""
+    authored_timestamp: int = 0
+    committed_timestamp: int = 0
+    message: str = ""
+
+
+def parse_commit(sha: str, data: bytes) -> CommitHeader:
+    """Parse a raw commit object body into a :class:`CommitHeader`."""
+    header, _, message = data.partition(b"\n\n")
+    commit = CommitHeader(sha=sha, tree="")
+    encoding = "utf-8"
+    # Continuation lines of multi-line headers (gpgsig) start with a space
+    # and never match.
+    for key, value in HEADER_LINE.findall(header):
+        if key == b"parent":
+            commit.parents.append(value.decode("ascii"))
+        elif key == b"tree":
+            commit.tree = value.decode("ascii")
+        elif key == b"author":
+            commit.author_name, commit.author_email, commit.authored_timestamp = _parse_signature(
+                value
+            )
+        elif key == b"committer":
+            commit.committed_timestamp = _parse_signature(value)[2]
+        else:
+            encoding = value.decode("ascii", errors="replace")
+    try:
+        commit.message = message.decode(encoding, errors="replace")
+    except LookupError:
+        commit.message = message.decode("utf-8", errors="replace")
+    return commit
+
+
+@dataclass(slots=True)
+class CommitGraphInfo:
+    """What the repository's commit-graph files (if any) provide."""
+
+    files: List[Path] = field(default_factory=list)
+    commits: int = 0
+    changed_paths: bool = False
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.files)
+
+
+def read_commit_graph_info(objects_dir: Path) -> CommitGraphInfo:
+    """Inspect the single-file or split commit-graph under ``objects_dir``.
+
+    Only the header and chunk table of each layer are read. Changed-path
+    Bloom filters count as present when every layer carries them.
+    """
+    info_dir = objects_dir / "info"
+    chain = info_dir / "commit-graphs" / "commit-graph-chain"
+    if chain.is_file():
+        names = chain.read_text(encoding="ascii", errors="replace").split()
+        files = [info_dir / "commit-graphs" / f"graph-{name}.graph" for name in names]
+    else:
+        files = [info_dir / "commit-graph"]
+    info = CommitGraphInfo(changed_paths=True)
+    for path in files:
+        chunks = _commit_graph_chunks(path)
+        if chunks is None:
+            continue
+        info.files.append(path)
+        fanout = chunks.get(b"OIDF")
+        if fanout is not None:
+            with path.open("rb") as handle:
+                handle.seek(fanout + 255 * 4)
+                info.commits += struct.unpack(">I", handle.read(4))[0]
+        info.changed_paths = info.changed_paths and all(key in chunks for key in BLOOM_CHUNKS)
+    info.changed_paths = info.changed_paths and info.exists
+    return info
+
+
+class PackRepository:
+    """Resolve refs and walk commit history straight from ``.git`` files."""
+
+    def __init__(self, git_dir: Path) -> None:
+        self.git_dir = git_dir
+        self.common_dir = find_common_dir(git_dir)
+        self.store = ObjectStore(self.common_dir / "objects")
+        self._packed_refs: Optional[Dict[str, str]] = None
+        self._shallow: Optional[Set[str]] = None
+        self._commits: OrderedDict[str, CommitHeader] = OrderedDict()
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Resolve a full sha or ref name to a commit id, peeling tags.
+
+        Returns None for revision expressions this reader does not evaluate
+        (``HEAD~2``, abbreviated ids, ...), so callers can defer to git.
+        """
+        if len(name) == SHA_LENGTH * 2 and _is_hex(name):
+            return self._peel_to_commit(name)
+        candidates = [name] if name == "HEAD" else [p.format(name) for p in REF_SEARCH_PATTERNS]
+        for candidate in candidates:
+            target = self._read_ref(candidate)
+            if target is not None:
+                return self._peel_to_commit(target)
+        return None
+
+    def commit(self, sha: str) -> CommitHeader:
+        cached = self._commits.get(sha)
+        if cached is not None:
+            return cached
+        found = self.store.read(sha)
+        if found is None or found[0] != "commit":
+            raise KeyError(f"Commit {sha} not found")
+        commit = parse_commit(sha, found[1])
+        if sha in self._shallow_commits():
+            # Grafted boundary of a shallow clone: its parents are not in the
+            # store, and git treats it as a root commit.
+            commit.parents = []
+        self._commits[sha] = commit
+        if len(self._commits) > 4096:
+            self._commits.popitem(last=False)
+        return commit
+
+    def walk(
+        self,
+        include: Sequence[str],
+        exclude: Sequence[str] = (),
+        *,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[CommitHeader]:
+        """Yield commits reachable from ``include`` but not from ``exclude``."""
+        return walk_commits(self.commit, include, exclude, since=since, until=until)
+
+    def close(self) -> None:
+        self.store.close()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _peel_to_commit(self, sha: str) -> Optional[str]:
+        for _ in range(16):
+            found = self.store.read(sha)
+            if found is None:
+                return None
+            object_type, data = found
+            if object_type == "commit":
+                return sha
+            if object_type != "tag":
+                return None
+            target = _tag_object(data)
+            if target is None:
+                return None
+            sha = target
+        return None
+
+    def _read_ref(self, name: str, depth: int = 0) -> Optional[str]:
+        if depth > 5:
+            return None
+        base = self.git_dir if "/" not in name else self.common_dir
+        try:
+            content = (base / name).read_text(encoding="utf-8").strip()
+        except (OSError, UnicodeDecodeError):
+            content = self._load_packed_refs().get(name, "")
+        if content.startswith("ref:"):
+            return self._read_ref(content[4:].strip(), depth + 1)
+        if len(content) == SHA_LENGTH * 2 and _is_hex(content):
+            return content
+        return None
+
+    def _shallow_commits(self) -> Set[str]:
+        if self._shallow is None:
+            try:
+                lines = (self.common_dir / "shallow").read_text(encoding="utf-8").split()
+            except OSError:
+                lines = []
+            self._shallow = {line for line in lines if _is_hex(line)}
+        return self._shallow
+
+    def _load_packed_refs(self) -> Dict[str, str]:
+        if self._packed_refs is None:
+            refs: Dict[str, str] = {}
+            try:
+                lines = (self.common_dir / "packed-refs").read_text(encoding="utf-8").splitlines()
+            except OSError:
+                lines = []
+            for line in lines:
+                if not line or line.startswith(("#", "^")):
+                    continue
+                sha, _, ref = line.partition(" ")
+                refs[ref.strip()] = sha
+            self._packed_refs = refs
+        return self._packed_refs
+
+
+def walk_commits(
+    lookup: CommitLookup,
+    include: Sequence[str],
+    exclude: Sequence[str] = (),
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Iterator[WalkCommit]:
+    """Yield commits reachable from ``include`` but not from ``exclude``.
+
+    ``lookup`` maps a sha to an object with ``parents`` and
+    ``committed_timestamp``. Commits come out newest-first by committer date
+    like ``git log``. As in git, a commit older than ``since`` hides its
+    ancestors too.
+    """
+    since_ts = since.timestamp() if since else None
+    until_ts = until.timestamp() if until else None
+    if not exclude and since_ts is None:
+        commits: Iterable[WalkCommit] = _walk_unlimited(lookup, include)
+    else:
+        commits = _walk_limited(lookup, include, exclude, since_ts)
+    for commit in commits:
+        if until_ts is None or commit.committed_timestamp <= until_ts:
+            yield commit
+
+
+def _walk_unlimited(lookup: CommitLookup, include: Iterable[str]) -> Iterator[WalkCommit]:
+    queue: List[Tuple[int, int, str]] = []
+    seen: Set[str] = set()
+    counter = 0
+    for sha in include:
+        if sha not in seen:
+            seen.add(sha)
+            heapq.heappush(queue, (-lookup(sha).committed_timestamp, counter, sha))
+            counter += 1
+    while queue:
+        _, _, sha = heapq.heappop(queue)
+        commit = lookup(sha)
+        yield commit
+        for parent in commit.parents:
+            if parent not in seen:
+                seen.add(parent)
+                parent_commit = lookup(parent)
+                heapq.heappush(queue, (-parent_commit.committed_timestamp, counter, parent))
+                counter += 1
+
+def _walk_limited(
+    lookup: CommitLookup,
+    include: Iterable[str],
+    exclude: Iterable[str],
+    since_ts: Optional[float],
+) -> List[WalkCommit]:
+    queue: List[Tuple[int, int, str]] = []
+    uninteresting: Set[str] = set()
+    seen: Set[str] = set()
+    processed: Dict[str, WalkCommit] = {}
+    order: List[str] = []
+    counter = 0
+
+    def push(sha: str) -> None:
+        nonlocal counter
+        if sha in seen:
+            return
+        seen.add(sha)
+        heapq.heappush(queue, (-lookup(sha).committed_timestamp, counter, sha))
+        counter += 1
+
+    def mark_uninteresting(sha: str) -> None:
+        stack = [sha]
+        while stack:
+            current = stack.pop()
+            if current in uninteresting:
+                continue
+            uninteresting.add(current)
+            # Already-walked commits pass the mark on immediately.
+            if current in processed:
+                stack.extend(processed[current].parents)
+
+    for sha in exclude:
+        mark_uninteresting(sha)
+        push(sha)
+    for sha in include:
+        push(sha)
+
+    slop = WALK_SLOP
+    while queue:
+        _, _, sha = heapq.heappop(queue)
+        commit = lookup(sha)
+        processed[sha] = commit
+        if since_ts is not None and commit.committed_timestamp < since_ts:
+            mark_uninteresting(sha)
+        if sha in uninteresting:
+            for parent in commit.parents:
+                mark_uninteresting(parent)
+        else:
+            order.append(sha)
+        for parent in commit.parents:
+            push(parent)
+        if all(entry[2] in uninteresting for entry in queue):
+            slop -= 1
+            if slop <= 0:
+                break
+        else:
+            slop = WALK_SLOP
+    return [processed[sha] for sha in order if sha not in uninteresting]
+
+
+def find_git_dir(path: Path) -> Optional[Path]:
+    """Locate the git directory for a work tree, gitfile or bare repository."""
+    dot_git = path / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        content = dot_git.read_text(encoding="utf-8").strip()
+        if content.startswith("gitdir:"):
+            return (path / content[len("gitdir:") :].strip()).resolve()
+    if (path / "objects").is_dir() and (path / "HEAD").is_file():
+        return path
+    return None
+
+
+def find_common_dir(git_dir: Path) -> Path:
+    """Return the directory holding objects and shared refs for ``git_dir``."""
+    common = git_dir / "commondir"
+    if common.is_file():
+        return (git_dir / common.read_text(encoding="utf-8").strip()).resolve()
+    return git_dir
+
+
+def _commit_graph_chunks(path: Path) -> Optional[Dict[bytes, int]]:
+    try:
+        with path.open("rb") as handle:
+            header = handle.read(8)
+            if len(header) != 8 or header[:4] != COMMIT_GRAPH_SIGNATURE:
+                return None
+            chunk_count = header[6]
+            table = handle.read((chunk_count + 1) * 12)
+    except OSError:
+        return None
+    if len(table) < chunk_count * 12:
+        return None
+    chunks: Dict[bytes, int] = {}
+    for index in range(chunk_count):
+        chunk_id, offset = struct.unpack_from(">4sQ", table, index * 12)
+        chunks[chunk_id] = offset
+    return chunks
+
+
+def _apply_delta(base: bytes, delta: bytes) -> bytes:
+    source_size, position = _delta_size(delta, 0)
+    target_size, position = _delta_size(delta, position)
+    if source_size != len(base):
+        raise ValueError("Delta base size mismatch")
+    result = bytearray()
+    end = len(delta)
+    while position < end:
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            offset = 0
+            size = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if opcode & (0x10 << bit):
+                    size |= delta[position] << (8 * bit)
+                    position += 1
+            result += base[offset : offset + (size or 0x10000)]
+        elif opcode:
+            result += delta[position : position + opcode]
+            position += opcode
+        else:
+            raise ValueError("Invalid delta opcode 0")
+    if len(result) != target_size:
+        raise ValueError("Delta result size mismatch")
+    return bytes(result)
+
+
+def _delta_size(delta: bytes, position: int) -> Tuple[int, int]:
+    size = 0
+    shift = 0
+    while True:
+        byte = delta[position]
+        position += 1
+        size |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return size, position
+
+
+def _parse_signature(value: bytes) -> Tuple[str, str, int]:
+    match = SIGNATURE.match(value)
+    if match is None:
+        return value.decode("utf-8", errors="replace").strip(), "", 0
+    name, email, timestamp = match.groups()
+    return (
+        name.decode("utf-8", errors="replace").strip(),
+        email.decode("utf-8", errors="replace").strip(),
+        int(timestamp) if timestamp else 0,
+    )
+
+
+def _tag_object(data: bytes) -> Optional[str]:
+    for line in data.split(b"\n"):
+        if not line:
+            break
+        if line.startswith(b"object "):
+            return line[len(b"object ") :].strip().decode("ascii")
+    return None
+
+
+def _alternate_object_dirs(objects_dir: Path) -> List[Path]:
+    try:
+        lines = (objects_dir / "info" / "alternates").read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    directories = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            directories.append((objects_dir / line).resolve())
+    return directories
+
+
+def _is_hex(value: str) -> bool:
+    return all(char in "0123456789abcdefABCDEF" for char in value)
+
+
+__all__ = [
+    "CommitGraphInfo",
+    "CommitHeader",
+    "ObjectStore",
+    "PackFile",
+    "PackIndex",
+    "PackRepository",
+    "find_common_dir",
+    "find_git_dir",
+    "parse_commit",
+    "read_commit_graph_info",
+    "walk_commits",
+]
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import re
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 # Header pattern for conventional commits
 # - Type: starts with letter, can contain letters, digits, hyphens
@@ -69,6 +71,23 @@ FALLBACK_PATTERNS: Tuple[Tuple[re.Pattern[str], str], ...] = (
     (re.compile(r"\bperf(ormance)?\b|\boptimi[sz]e\b", re.IGNORECASE), "perf"),
     (re.compile(r"\bbuild\b", re.IGNORECASE), "build"),
 )
+FALLBACK_PATTERN_SOURCES: Tuple[Tuple[str, str], ...] = tuple(
+    (pattern.pattern, change_type) for pattern, change_type in FALLBACK_PATTERNS
+)
+
+# Every match of a FALLBACK_PATTERNS entry starts with one of its type's keywords.
+FALLBACK_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "test": ("test",),
+    "fix": ("fix", "bug"),
+    "feat": ("feat",),
+    "docs": ("doc",),
+    "refactor": ("refactor",),
+    "perf": ("perf", "optimi"),
+    "build": ("build",),
+}
+
+DEFAULT_CHANGE_TYPE = "chore"
+CLASSIFY_CACHE_SIZE = 8192
 
 
 @dataclass
@@ -172,17 +191,200 @@ def normalize_type(raw_type: Optional[str]) -> Optional[str]:
     return key
 
 
-def classify_change_type(message: str, *, default: str = "chore") -> str:
-    """Guess a change type for arbitrary commit messages."""
+def parse_many(messages: Iterable[str]) -> List[ParsedCommitMessage]:
+    """Parse several messages, parsing each distinct message only once.
+
+    Identical messages (reverts, dependency bumps, merge subjects) share one
+    result, so callers must treat the returned objects as read-only.
+    """
+    seen: Dict[str, ParsedCommitMessage] = {}
+    results: List[ParsedCommitMessage] = []
+    for message in messages:
+        parsed = seen.get(message)
+        if parsed is None:
+            parsed = seen[message] = parse_commit_message(message)
+        results.append(parsed)
+    return results
+
+
+def classify_change_type(
+    message: str, *, default: str = DEFAULT_CHANGE_TYPE, parsed: Optional[ParsedCommitMessage] = None
+) -> str:
+    """Guess a change type for arbitrary commit messages.
+
+    Pass ``parsed`` when the message has already been parsed to skip parsing it again.
+    """
 
-    parsed = parse_commit_message(message)
-    if parsed.type:
+    if parsed is not None and parsed.type:
         return parsed.type
-    lowered = message.lower()
-    for pattern, change_type in FALLBACK_PATTERNS:
-        if pattern.search(lowered):
-            return change_type
-    return default
+    return DEFAULT_CLASSIFIER.classify(message, default=default)
+
+
+class ChangeTypeClassifier:
+    """Assign change types using a configurable taxonomy.
+
+    Conventional headers are normalized through ``aliases`` into ``types``.
+    Other messages are searched with all fallback patterns merged into one
+    regex. When several patterns match, the one listed first wins, as if the
+    patterns had been tried one by one.
+    """
+
+    def __init__(
+        self,
+        *,
+        types: Iterable[str] = KNOWN_TYPES,
+        aliases: Mapping[str, str] = TYPE_ALIASES,
+        patterns: Sequence[Tuple[str, str]] = FALLBACK_PATTERN_SOURCES,
+        keywords: Mapping[str, Sequence[str]] = FALLBACK_KEYWORDS,
+        default: str = DEFAULT_CHANGE_TYPE,
+        cache_size: int = CLASSIFY_CACHE_SIZE,
+    ) -> None:
+        self.types: FrozenSet[str] = frozenset(name.lower() for name in types)
+        self.aliases: Dict[str, str] = {
+            alias.lower(): target.lower() for alias, target in aliases.items()
+        }
+        self.patterns: Tuple[Tuple[str, str], ...] = tuple(
+            (source, change_type.lower()) for source, change_type in patterns
+        )
+        self.default = default
+        for change_type in (*self.aliases.values(), *(name for _, name in self.patterns)):
+            if change_type not in self.types:
+                raise ValueError(f"Unknown change type {change_type!r}")
+        # Types whose pattern matches always start with one of these keywords.
+        self._keywords: Dict[str, Optional[FrozenSet[str]]] = {}
+        for _, change_type in self.patterns:
+            declared = keywords.get(change_type)
+            self._keywords[change_type] = frozenset(declared) if declared else None
+        # _fallbacks[n - 1] searches for the first n patterns at once.
+        self._fallbacks: List[re.Pattern[str]] = [
+            self._compile_fallback(count) for count in range(1, len(self.patterns) + 1)
+        ]
+        # Fallback results keyed by a digest of the message, so the cache stays
+        # small no matter how long the commit bodies are.
+        self._cache: Dict[bytes, Optional[str]] = {}
+        self._cache_size = cache_size
+
+    @classmethod
+    def extended(
+        cls,
+        *,
+        types: Iterable[str] = (),
+        aliases: Optional[Mapping[str, str]] = None,
+        patterns: Optional[Mapping[str, str]] = None,
+        keywords: Optional[Mapping[str, Sequence[str]]] = None,
+    ) -> ChangeTypeClassifier:
+        """Return the built-in taxonomy plus custom types, aliases and patterns.
+
+        Custom patterns take precedence over the built-in heuristics. Declaring
+        the ``keywords`` every match of a custom pattern starts with keeps the
+        fast path and lets git prefilter commits of that type.
+        """
+        default = DEFAULT_CLASSIFIER
+        patterns = {name.lower(): source for name, source in (patterns or {}).items()}
+        custom_keywords = {name.lower(): words for name, words in (keywords or {}).items()}
+        merged_keywords: Dict[str, List[str]] = {
+            name: list(words) for name, words in FALLBACK_KEYWORDS.items()
+        }
+        for name in patterns:
+            if name in custom_keywords:
+                merged_keywords.setdefault(name, []).extend(custom_keywords[name])
+            else:
+                merged_keywords.pop(name, None)
+        return cls(
+            types=default.types | {name.lower() for name in types},
+            aliases={**default.aliases, **(aliases or {})},
+            patterns=(*((source, name) for name, source in patterns.items()), *default.patterns),
+            keywords=merged_keywords,
+        )
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable digest of the taxonomy, for caches that store classifications."""
+        payload = json.dumps(
+            [sorted(self.types), sorted(self.aliases.items()), self.patterns, self.default]
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def normalize(self, raw_type: Optional[str]) -> Optional[str]:
+        """Normalize a raw header type into this taxonomy."""
+        if not raw_type:
+            return None
+        key = raw_type.lower()
+        key = self.aliases.get(key, key)
+        return key if key in self.types else None
+
+    def header_type(self, message: str) -> Optional[str]:
+        """Return the type declared by a Conventional Commit header, if any."""
+        header = (message or "").strip().split("\n", 1)[0].strip()
+        match = HEADER_PATTERN.match(header)
+        return self.normalize(match.group("type")) if match else None
+
+    def classify(self, message: str, *, default: Optional[str] = None) -> str:
+        """Return the header type, else the first matching fallback type."""
+        message = message or ""
+        change_type = self.header_type(message)
+        if change_type is None:
+            key = hashlib.blake2b(message.encode("utf-8"), digest_size=16).digest()
+            try:
+                change_type = self._cache[key]
+            except KeyError:
+                change_type = self._match_fallback(message)
+                if len(self._cache) >= self._cache_size:
+                    self._cache.clear()
+                self._cache[key] = change_type
+        return change_type or default or self.default
+
+    def keywords(self, change_type: str) -> Optional[FrozenSet[str]]:
+        """Return substrings present in every message classified as ``change_type``.
+
+        Returns None when no such set is known, e.g. for the default type or a
+        type with custom patterns.
+        """
+        if change_type == self.default:
+            return None
+        found = {change_type}
+        found.update(alias for alias, target in self.aliases.items() if target == change_type)
+        if change_type in self._keywords:
+            declared = self._keywords[change_type]
+            if declared is None:
+                return None
+            found.update(declared)
+        return frozenset(found)
+
+    def _match_fallback(self, message: str) -> Optional[str]:
+        # Scan left to right once. After each match only patterns with higher
+        # precedence are still of interest, so the search narrows as it goes.
+        best = len(self.patterns)
+        position = 0
+        while best:
+            match = self._fallbacks[best - 1].search(message, position)
+            if match is None or match.lastgroup is None:
+                break
+            best = int(match.lastgroup[1:])
+            position = match.start() + 1
+        return self.patterns[best][1] if best < len(self.patterns) else None
+
+    def _compile_fallback(self, count: int) -> re.Pattern[str]:
+        patterns = self.patterns[:count]
+        alternatives = "|".join(
+            f"(?P<p{index}>{source})" for index, (source, _) in enumerate(patterns)
+        )
+        # A zero-width match leaves the text unconsumed, so a later pattern's
+        # match cannot hide a higher-precedence one that starts inside it.
+        merged = f"(?=(?:{alternatives}))"
+        keywords = [self._keywords[change_type] for _, change_type in patterns]
+        known = [words for words in keywords if words]
+        if len(known) == len(keywords):
+            # Let the regex engine skip to characters that can start a match.
+            initials = {word[0].lower() for words in known for word in words}
+            merged = f"(?=[{re.escape(''.join(sorted(initials)))}]){merged}"
+        try:
+            return re.compile(merged, re.IGNORECASE)
+        except re.error as exc:
+            raise ValueError(f"Invalid change type pattern: {exc}") from None
+
+
+DEFAULT_CLASSIFIER = ChangeTypeClassifier()
 
 
 def _strip_leading_blank_lines(lines: Iterable[str]) -> List[str]:
@@ -200,21 +402,25 @@ def _strip_leading_blank_lines(lines: Iterable[str]) -> List[str]:
 def _split_body_and_footers(lines: List[str]) -> Tuple[List[str], List[str]]:
     if not lines:
         return [], []
-    # Identify the start of the footer block, if any.
-    for idx, line in enumerate(lines):
-        if FOOTER_PATTERN.match(line.strip()):
-            if idx > 0 and lines[idx - 1].strip():
-                continue
-            candidate = lines[idx:]
-            if all(_is_footer_line(item) for item in candidate):
-                body = lines[:idx]
-                footers = candidate
-                break
-    else:
-        body = lines
-        footers = []
-    body = _trim_trailing_blank_lines(body)
-    return body, footers
+    # The footer block is a suffix made only of footer-like lines, so scan
+    # backwards to the earliest line where that suffix starts, remembering
+    # which lines are actual "Token: value" footers along the way.
+    start = len(lines)
+    footer_starts: List[int] = []
+    while start > 0:
+        line = lines[start - 1]
+        stripped = line.strip()
+        if stripped and FOOTER_PATTERN.match(stripped):
+            footer_starts.append(start - 1)
+        elif stripped and not line.startswith((" ", "\t")):
+            break
+        start -= 1
+    # The block begins at the first footer token that follows a blank line
+    # (or opens the message).
+    for idx in reversed(footer_starts):
+        if idx == 0 or not lines[idx - 1].strip():
+            return _trim_trailing_blank_lines(lines[:idx]), lines[idx:]
+    return _trim_trailing_blank_lines(lines), []
 
 
 def _parse_footers(lines: List[str]) -> Dict[str, List[str]]:
@@ -255,14 +461,6 @@ def _parse_footers(lines: List[str]) -> Dict[str, List[str]]:
     return footers
 
 
-def _is_footer_line(line: str) -> bool:
-    if not line.strip():
-        return True
-    if FOOTER_PATTERN.match(line.strip()):
-        return True
-    return line.startswith((" ", "\t"))
-
-
 def _trim_trailing_blank_lines(lines: List[str]) -> List[str]:
     trimmed = list(lines)
     while trimmed and not trimmed[-1].strip():
@@ -284,8 +482,11 @@ def _first_paragraph(lines: List[str]) -> Optional[str]:
 
 
 __all__ = [
+    "DEFAULT_CLASSIFIER",
+    "ChangeTypeClassifier",
     "ParsedCommitMessage",
     "classify_change_type",
     "normalize_type",
     "parse_commit_message",
+    "parse_many",
 ]
@@ -0,0 +1,164 @@
+"""Plan which commit filters git can evaluate while walking history.
+
+``plan_commit_query`` moves the filters that map onto ``git log`` options
+into the :class:`CommitRange`, so fewer commits are printed by git and
+materialized as :class:`CommitInfo`. Whatever git can only approximate
+stays in the plan's residual filters, which run in Python afterwards.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .changelog import iter_filtered_commits
+from .git_client import CommitRange
+from .models import CommitInfo
+from .parser import DEFAULT_CLASSIFIER, ChangeTypeClassifier
+
+REGEX_METACHARACTERS = frozenset(".^$*+?{}[]|()")
+# Characters that join name and email in the header git matches against.
+AUTHOR_SEPARATORS = frozenset(" <>")
+
+
+@dataclass(slots=True)
+class QueryPlan:
+    """A narrowed commit range plus the filters left for Python."""
+
+    commit_range: CommitRange
+    include_types: Optional[Sequence[str]] = None
+    exclude_scopes: Optional[Sequence[str]] = None
+    author_filter: Optional[str] = None
+    include_paths: Optional[Sequence[str]] = None
+    exclude_paths: Optional[Sequence[str]] = None
+    classifier: ChangeTypeClassifier = DEFAULT_CLASSIFIER
+
+    def filter(
+        self,
+        commits: Sequence[CommitInfo],
+        *,
+        classify: Optional[Callable[[CommitInfo], Tuple[str, Optional[str]]]] = None,
+    ) -> List[CommitInfo]:
+        """Apply the residual filters to commits produced from ``commit_range``."""
+        return list(self.stream(commits, classify=classify))
+
+    def stream(
+        self,
+        commits: Iterable[CommitInfo],
+        *,
+        classify: Optional[Callable[[CommitInfo], Tuple[str, Optional[str]]]] = None,
+    ) -> Iterator[CommitInfo]:
+        """Lazily apply the residual filters, e.g. to ``GitRepository.iter_commits``."""
+        return iter_filtered_commits(
+            commits,
+            include_types=self.include_types,
+            exclude_scopes=self.exclude_scopes,
+            author_filter=self.author_filter,
+            include_paths=self.include_paths,
+            exclude_paths=self.exclude_paths,
+            classify=classify,
+            classifier=self.classifier,
+        )
+
+
+def plan_commit_query(
+    commit_range: CommitRange,
+    *,
+    include_types: Optional[Sequence[str]] = None,
+    exclude_scopes: Optional[Sequence[str]] = None,
+    author_filter: Optional[str] = None,
+    include_paths: Optional[Sequence[str]] = None,
+    exclude_paths: Optional[Sequence[str]] = None,
+    classifier: ChangeTypeClassifier = DEFAULT_CLASSIFIER,
+) -> QueryPlan:
+    """Push the ``filter_commits`` criteria git can evaluate into the range.
+
+    - Literal author patterns (``alice|bob@example.com``) become ``--author``
+      options. They are removed from the residual filter unless a pattern
+      could match across the name/email boundary.
+    - ``include_types`` become ``--grep`` keywords that every message of
+      those types contains. The exact type check still runs in Python.
+
+    ``exclude_paths`` stay in Python. An ``:(exclude)`` pathspec would also
+    drop empty commits and merges without changes of their own, which
+    ``filter_commits`` keeps because they have no files to match.
+
+    A ``max_count`` limits the history the filters are applied to, so with
+    one nothing is pushed down and results stay the same.
+    """
+    plan = QueryPlan(
+        commit_range=replace(commit_range),
+        include_types=include_types,
+        exclude_scopes=exclude_scopes,
+        author_filter=author_filter,
+        include_paths=include_paths,
+        exclude_paths=exclude_paths,
+        classifier=classifier,
+    )
+    if commit_range.max_count:
+        return plan
+    narrowed = plan.commit_range
+
+    authors = _literal_alternatives(author_filter) if author_filter else None
+    if authors:
+        narrowed.authors = tuple(authors)
+        if not any(AUTHOR_SEPARATORS & set(author) for author in authors):
+            plan.author_filter = None
+
+    keywords = _type_keywords(include_types, classifier) if include_types else None
+    if keywords:
+        narrowed.grep = tuple(keywords)
+    return plan
+
+
+def _literal_alternatives(pattern: str) -> Optional[List[str]]:
+    """Split ``a|b`` into literals, or return None if it uses other regex syntax.
+
+    Only ASCII literals are returned, because git's case folding for fixed
+    strings is not Unicode-aware like Python's ``re.IGNORECASE``.
+    """
+    alternatives: List[str] = []
+    current: List[str] = []
+    characters = iter(pattern)
+    for character in characters:
+        if character == "\\":
+            escaped = next(characters, "")
+            if not escaped or escaped.isalnum():
+                return None
+            current.append(escaped)
+        elif character == "|":
+            alternatives.append("".join(current))
+            current = []
+        elif character in REGEX_METACHARACTERS:
+            return None
+        else:
+            current.append(character)
+    alternatives.append("".join(current))
+    if not all(alternatives) or not all(text.isascii() for text in alternatives):
+        return None
+    return alternatives
+
+
+def _type_keywords(
+    include_types: Iterable[str], classifier: ChangeTypeClassifier = DEFAULT_CLASSIFIER
+) -> Optional[List[str]]:
+    """Return substrings at least one of which occurs in every wanted commit."""
+    keywords: Set[str] = set()
+    for change_type in include_types:
+        if change_type not in classifier.types:
+            continue  # never produced by the classifier
+        found = classifier.keywords(change_type)
+        if found is None:
+            return None
+        keywords.update(found)
+    if not keywords:
+        return None
+    # "fix" already matches "bugfix" and "hotfix".
+    return sorted(
+        keyword
+        for keyword in keywords
+        if not any(other != keyword and other in keyword for other in keywords)
+    )
+
+
+__all__ = ["QueryPlan", "plan_commit_query"]
@@ -0,0 +1,233 @@
+"""Local retrieval of supporting evidence for change entries.
+
+:class:`RetrievalIndex` is built once per summarization run from every
+entry's title, body (commit and PR bodies) and diff. Tokenization happens
+up front. Query planning then takes an entry's top TF-IDF terms instead of
+asking the model for keywords, and evidence is the entry's body paragraphs
+ranked by BM25 against those terms. Neither step needs a network call or
+per-entry index setup.
+
+The optional ``chroma`` backend embeds every body paragraph into a single
+collection for the run and filters queries by entry. It falls back to BM25
+when ``chromadb`` is missing or fails.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Sequence, Tuple
+from uuid import uuid4
+
+try:  # pragma: no cover - optional dependency guard
+    import chromadb  # type: ignore[import]
+except Exception:  # pragma: no cover - optional dependency guard
+    chromadb = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:  # pragma: no cover - type checking only
+    from .summarizer import SummaryRequest
+
+DEFAULT_QUERY_TERMS = 4
+DEFAULT_MAX_PASSAGES = 6
+# Title terms count this many times when ranking an entry's keywords.
+TITLE_WEIGHT = 2
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TERM_RE = re.compile(r"[a-z0-9_][a-z0-9_\-]{2,}")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n+")
+STOPWORDS = frozenset(
+    {
+        "about", "after", "also", "and", "any", "are", "been", "before", "but", "can",
+        "does", "each", "for", "from", "had", "has", "have", "into", "its", "more",
+        "not", "now", "only", "other", "our", "should", "such", "than", "that", "the",
+        "their", "them", "then", "there", "these", "they", "this", "those", "was",
+        "were", "what", "when", "which", "while", "will", "with", "would", "you", "your",
+    }
+)  # fmt: skip
+
+
+def tokenize(text: str) -> List[str]:
+    """Split ``text`` into lowercase terms, dropping stopwords and bare numbers."""
+    return [
+        term
+        for term in _TERM_RE.findall(text.lower())
+        if term not in STOPWORDS and not term.isdigit()
+    ]
+
+
+def similarity(first: str, second: str) -> float:
+    """Token overlap (Jaccard) of two texts, from 0.0 to 1.0."""
+    first_terms, second_terms = set(tokenize(first)), set(tokenize(second))
+    if not first_terms and not second_terms:
+        return 1.0 if first.strip().lower() == second.strip().lower() else 0.0
+    return len(first_terms & second_terms) / len(first_terms | second_terms)
+
+
+def paragraphs(text: str) -> List[str]:
+    return [part.strip() for part in _PARAGRAPH_RE.split(text) if part.strip()]
+
+
+def _changed_lines(diff: str) -> str:
+    # Only added and removed lines; file headers and context add noise.
+    return "\n".join(
+        line[1:]
+        for line in diff.splitlines()
+        if line[:1] in ("+", "-") and not line.startswith(("+++", "---"))
+    )
+
+
+@dataclass(slots=True)
+class Passage:
+    """A body paragraph with its precomputed term frequencies."""
+
+    entry: str
+    text: str
+    terms: Counter[str]
+    length: int
+
+
+class RetrievalIndex:
+    """TF-IDF keywords and BM25 passage search over one run's change entries."""
+
+    def __init__(self, requests: Iterable[SummaryRequest], *, backend: str = "simple") -> None:
+        self._terms: Dict[str, Counter[str]] = {}
+        self._order: Dict[str, Dict[str, int]] = {}
+        self._passages: Dict[str, List[Passage]] = {}
+        entry_frequency: Counter[str] = Counter()
+        passage_frequency: Counter[str] = Counter()
+        total_length = 0
+        for req in requests:
+            body = (req.body or "").strip()
+            title_terms = tokenize(req.title)
+            content_terms = tokenize(body) + tokenize(_changed_lines(req.diff or ""))
+            terms = Counter(title_terms * TITLE_WEIGHT + content_terms)
+            self._terms[req.identifier] = terms
+            # First occurrence breaks keyword ties, so title terms win them.
+            order: Dict[str, int] = {}
+            for index, term in enumerate(title_terms + content_terms):
+                order.setdefault(term, index)
+            self._order[req.identifier] = order
+            entry_frequency.update(terms.keys())
+            passages = []
+            for text in paragraphs(body):
+                passage_terms = Counter(tokenize(text))
+                length = sum(passage_terms.values())
+                passages.append(Passage(req.identifier, text, passage_terms, length))
+                passage_frequency.update(passage_terms.keys())
+                total_length += length
+            self._passages[req.identifier] = passages
+        self._entry_count = len(self._terms)
+        self._entry_frequency = entry_frequency
+        self._passage_count = sum(len(passages) for passages in self._passages.values())
+        self._passage_frequency = passage_frequency
+        self._average_length = total_length / self._passage_count if self._passage_count else 0.0
+        self._client: Any = None
+        self._collection: Any = None
+        if backend == "chroma":
+            self._client, self._collection = _chroma_collection(self._passages)
+
+    def __contains__(self, identifier: object) -> bool:
+        return identifier in self._terms
+
+    def keywords(self, identifier: str, limit: int = DEFAULT_QUERY_TERMS) -> List[str]:
+        """Return the entry's ``limit`` highest TF-IDF terms."""
+        terms = self._terms.get(identifier)
+        if not terms:
+            return []
+        order = self._order[identifier]
+
+        def weight(term: str) -> Tuple[float, int]:
+            idf = math.log((1 + self._entry_count) / (1 + self._entry_frequency[term])) + 1
+            return (-terms[term] * idf, order[term])
+
+        return sorted(terms, key=weight)[:limit]
+
+    def search(
+        self, identifier: str, queries: Sequence[str], limit: int = DEFAULT_MAX_PASSAGES
+    ) -> List[str]:
+        """Return the entry's body paragraphs that best match ``queries``.
+
+        Without any match the first paragraph is returned, so an entry with a
+        body always has some evidence.
+        """
+        passages = self._passages.get(identifier) or []
+        if not passages:
+            return []
+        if self._collection is not None:
+            try:
+                found = self._search_chroma(identifier, queries, limit)
+            except Exception:
+                found = []
+            if found:
+                return found
+        query_terms = set(tokenize(" ".join(queries)))
+        scored = [(self._bm25(passage, query_terms), passage.text) for passage in passages]
+        ranked = sorted(
+            ((score, text) for score, text in scored if score > 0),
+            key=lambda item: (-item[0], len(item[1])),
+        )
+        return [text for _, text in ranked[:limit]] or [passages[0].text]
+
+    def evidence(self, identifier: str) -> str:
+        """Best-matching body paragraphs for the entry's own keywords."""
+        return "\n\n".join(self.search(identifier, self.keywords(identifier)))
+
+    def close(self) -> None:
+        """Drop the run's embedding collection, if one was created."""
+        collection, self._collection = self._collection, None
+        if collection is None:
+            return
+        try:
+            self._client.delete_collection(collection.name)
+        except Exception:
+            pass
+
+    def _bm25(self, passage: Passage, query_terms: Iterable[str]) -> float:
+        score = 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * passage.length / (self._average_length or 1))
+        for term in query_terms:
+            frequency = passage.terms.get(term)
+            if not frequency:
+                continue
+            document_frequency = self._passage_frequency[term]
+            idf = math.log(
+                1 + (self._passage_count - document_frequency + 0.5) / (document_frequency + 0.5)
+            )
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return score
+
+    def _search_chroma(self, identifier: str, queries: Sequence[str], limit: int) -> List[str]:
+        count = len(self._passages[identifier])
+        selected: List[str] = []
+        for query in queries:
+            result = self._collection.query(
+                query_texts=[query], n_results=min(3, count), where={"entry": identifier}
+            )
+            for document in (result.get("documents") or [[]])[0]:
+                if document not in selected:
+                    selected.append(document)
+        return selected[:limit]
+
+
+def _chroma_collection(passages: Dict[str, List[Passage]]) -> Tuple[Any, Any]:
+    """Embed every passage of the run into one collection; ``(None, None)`` on failure."""
+    documents = [passage for entry in passages.values() for passage in entry]
+    if chromadb is None or not documents:
+        return None, None
+    try:
+        client = chromadb.Client()
+        collection = client.create_collection(name=f"helixcommit-{uuid4().hex}")
+        collection.add(
+            documents=[passage.text for passage in documents],
+            metadatas=[{"entry": passage.entry} for passage in documents],
+            ids=[str(index) for index in range(len(documents))],
+        )
+    except Exception:
+        return None, None
+    return client, collection
+
+
+__all__ = ["Passage", "RetrievalIndex", "paragraphs", "similarity", "tokenize"]
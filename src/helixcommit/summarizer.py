@@ -8,23 +8,60 @@ This module provides a few summarizer implementations:
     several prompt-engineering techniques:
     - Domain-scoped system prompt to narrow norms and tone
     - Multi-expert role prompting (generate from 3+ perspectives, then merge)
-    - Lightweight RAG with query planning over provided bodies (no extra deps)
+    - Lightweight RAG: TF-IDF query terms and BM25 paragraph retrieval over
+      provided bodies, indexed once per run (no extra deps)
     - Self-critique final pass for clarity and brevity
 
-All advanced steps now run on every generation; the summarizer always applies
-the full prompt-engineering pipeline to each entry to keep outputs consistent.
-Caching is respected per-entry.
+By default every step runs for every entry, one call per entry and step. Two
+options reduce the number of calls while keeping the same steps:
+
+- ``max_batch_size > 1`` lets each step handle a chunk of entries in one JSON
+  call, so calls scale with chunks instead of entries.
+- ``fused=True`` runs the expert, synthesis and critique steps of an entry in
+  one structured-JSON call. If the reply does not validate, the steps run
+  separately.
+
+Skipping work is opt-in:
+
+- ``early_exit`` skips synthesis when the expert candidates already agree.
+  It also skips critique when the merged sentence already meets the length
+  and style rules.
+- ``stop_on_agreement`` asks the expert roles one at a time and stops once
+  two of them agree.
+
+Both flags are part of the summary cache key. When summarization tiers are
+enabled in the config, :class:`~helixcommit.changelog.ChangelogBuilder`
+sends trivial entries to a light single-call summarizer instead.
+
+Summaries are cached per entry.
 """
 
 from __future__ import annotations
 
 import hashlib
 import json
-import re
+import sqlite3
 import textwrap
-from dataclasses import dataclass
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from .llm_scheduler import SingleFlight, estimate_tokens, get_scheduler
+from .retrieval import RetrievalIndex, similarity
+from .tokens import DEFAULT_MAX_INPUT_TOKENS, ContextBudget, ContextSection
 
 try:  # pragma: no cover - optional dependency guard
     from openai import OpenAI  # type: ignore[import]
@@ -32,10 +69,13 @@ except Exception:  # pragma: no cover - optional dependency guard
     OpenAI = None  # type: ignore[assignment]
 
 if TYPE_CHECKING:  # pragma: no cover - type checking only
-    ChatCompletionMessageParam = Dict[str, object]
+    from openai.types.chat import ChatCompletionMessageParam
+    from openai.types.shared_params import ResponseFormatJSONObject
 else:
     ChatCompletionMessageParam = Dict[str, object]  # type: ignore[misc,assignment]
 
+_JSON_RESPONSE_FORMAT: ResponseFormatJSONObject = {"type": "json_object"}
+
 
 RELEASE_NOTES_SYSTEM_PROMPT = textwrap.dedent(
     """
@@ -266,6 +306,46 @@ RELEASE_NOTES_SYSTEM_PROMPT = textwrap.dedent(
     """
 ).strip()
 
+# Entries PromptEngineeredSummarizer summarizes concurrently by default.
+DEFAULT_MAX_WORKERS = 4
+# Entries per call in PromptEngineeredSummarizer's batched mode; 1 runs the
+# pipeline once per entry.
+DEFAULT_PIPELINE_BATCH_SIZE = 1
+
+BATCH_SUMMARY_INSTRUCTIONS = (
+    "Rewrite each change entry into a concise, release-note ready sentence (<= 30 words). "
+    "Capture the impact, mention affected area if obvious, and avoid repetition. "
+    "Use the provided diffs to understand the actual changes if the commit message is sparse. "
+    'Respond with JSON object {"entries": [{"id": str, "summary": str}, ...]} in the same order as input.\n\n'
+)
+
+SUMMARY_CACHE_SUFFIX = ".sqlite3"
+CHAT_MEMO_PREFIX = "chat:"
+DEFAULT_CACHE_MAX_ENTRIES = 200_000
+DEFAULT_CACHE_MAX_AGE_SECONDS = 180 * 24 * 3600
+DEFAULT_CACHE_COMMIT_INTERVAL = 64
+
+ENTRIES_JSON_INSTRUCTION = (
+    'Respond with JSON object {"entries": [{"id": str, "summary": str}, ...]} '
+    "with one entry per input id."
+)
+
+FUSED_INSTRUCTIONS = (
+    "Work in three steps. 1) As each of these roles, write one candidate sentence: {roles}. "
+    "2) Merge the candidates into one polished sentence (<= 30 words); avoid redundancy, "
+    "prefer user impact, and keep terminology consistent. 3) Critique the merged sentence "
+    "for clarity, brevity, and tone, then write the improved final sentence.\n"
+    'Respond with JSON object {{"candidates": [{{"role": str, "summary": str}}, ...], '
+    '"merged": str, "final": str}}.\n'
+)
+# A fused final sentence longer than this is rejected as not release-note ready.
+FUSED_MAX_WORDS = 60
+
+# Candidates whose pairwise token overlap reaches this are treated as agreeing.
+DEFAULT_EARLY_EXIT_THRESHOLD = 0.8
+SUMMARY_MAX_WORDS = 30
+_FILLER_OPENINGS = ("this commit", "this change", "this pr", "this pull request")
+
 
 def build_release_notes_system_prompt(
     domain_scope: Optional[str] = None,
@@ -286,12 +366,17 @@ class SummaryRequest:
     title: str
     body: Optional[str] = None
     diff: Optional[str] = None
+    # Content address for caching (e.g. from ``git patch-id``); when set it
+    # replaces the identifier and raw text in cache keys.
+    content_key: Optional[str] = None
 
 
 @dataclass(slots=True)
 class SummaryResult:
     identifier: str
     summary: str
+    # Pipeline steps the summarizer could skip for this entry (see early exit).
+    skipped_steps: List[str] = field(default_factory=list)
 
 
 class BaseSummarizer:
@@ -312,25 +397,135 @@ class NoOpSummarizer(BaseSummarizer):
 
 
 class SummaryCache:
-    """Simple JSON-backed cache for summaries."""
+    """SQLite-backed cache for summaries, safe to share between threads.
+
+    The database runs in WAL mode and is queried per key, so nothing is loaded
+    up front. Writes are committed every ``commit_interval`` entries and on
+    :meth:`flush`. A ``.json`` path opens the database next to it. Entries of
+    the old JSON cache are not imported: their keys predate the current key
+    format and could never be hit. Opening the cache evicts entries unused for
+    ``max_age_seconds`` and the least recently used beyond ``max_entries``.
+    """
 
-    def __init__(self, path: Optional[Path]) -> None:
-        self.path = path
-        self._data: Dict[str, str] = {}
-        if path and path.exists():
-            try:
-                self._data = json.loads(path.read_text(encoding="utf-8"))
-            except (ValueError, OSError):  # pragma: no cover - defensive
-                self._data = {}
+    def __init__(
+        self,
+        path: Optional[Path],
+        *,
+        max_entries: Optional[int] = DEFAULT_CACHE_MAX_ENTRIES,
+        max_age_seconds: Optional[float] = DEFAULT_CACHE_MAX_AGE_SECONDS,
+        commit_interval: int = DEFAULT_CACHE_COMMIT_INTERVAL,
+        clock: Optional[Callable[[], float]] = None,
+    ) -> None:
+        self.path = _summary_cache_path(path)
+        self.commit_interval = max(1, commit_interval)
+        self._clock = clock or time.time
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._touched: Dict[str, float] = {}
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            str(self.path) if self.path else ":memory:", timeout=30, check_same_thread=False
+        )
+        if self.path:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed)"
+        )
+        self._connection.commit()
+        self.evict(max_entries=max_entries, max_age_seconds=max_age_seconds)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
 
     def get(self, key: str) -> Optional[str]:
-        return self._data.get(key)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Access times are written with the next commit, not per lookup.
+            self._touched[key] = self._clock()
+            return row[0]
 
     def set(self, key: str, value: str) -> None:
-        self._data[key] = value
-        if self.path:
-            self.path.parent.mkdir(parents=True, exist_ok=True)
-            self.path.write_text(json.dumps(self._data, indent=2, sort_keys=True), encoding="utf-8")
+        with self._lock:
+            now = self._clock()
+            self._connection.execute(
+                "INSERT INTO summaries (key, value, created, accessed) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, accessed = excluded.accessed",
+                (key, value, now, now),
+            )
+            self._touched.pop(key, None)
+            self._pending += 1
+            if self._pending >= self.commit_interval:
+                self._commit()
+
+    def flush(self) -> None:
+        """Commit pending writes and access times."""
+        with self._lock:
+            self._commit()
+
+    def evict(
+        self, *, max_entries: Optional[int] = None, max_age_seconds: Optional[float] = None
+    ) -> int:
+        """Drop stale and least recently used entries; return how many were removed."""
+        removed = 0
+        with self._lock:
+            self._commit()
+            # Check before deleting so that opening a cache only takes the
+            # write lock when there is something to evict.
+            if max_age_seconds is not None:
+                cutoff = self._clock() - max_age_seconds
+                if self._connection.execute(
+                    "SELECT 1 FROM summaries WHERE accessed < ? LIMIT 1", (cutoff,)
+                ).fetchone():
+                    cursor = self._connection.execute(
+                        "DELETE FROM summaries WHERE accessed < ?", (cutoff,)
+                    )
+                    removed += cursor.rowcount
+            if max_entries is not None:
+                max_entries = max(0, max_entries)
+                if self._connection.execute(
+                    "SELECT 1 FROM summaries LIMIT 1 OFFSET ?", (max_entries,)
+                ).fetchone():
+                    cursor = self._connection.execute(
+                        "DELETE FROM summaries WHERE key IN ("
+                        "SELECT key FROM summaries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                        (max_entries,),
+                    )
+                    removed += cursor.rowcount
+            self._connection.commit()
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+    def _commit(self) -> None:
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE summaries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._connection.commit()
+        self._pending = 0
+
+
+def _summary_cache_path(path: Optional[Path]) -> Optional[Path]:
+    """Return the database path for a cache path, mapping ``.json`` to SQLite."""
+    if path is not None and path.suffix == ".json":
+        return path.with_suffix(SUMMARY_CACHE_SUFFIX)
+    return path
 
 
 class OpenAISummarizer(BaseSummarizer):
@@ -346,18 +541,31 @@ class OpenAISummarizer(BaseSummarizer):
         max_tokens: int = 300,
         prompt_version: str = "v1",
         cache_path: Optional[Path] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
     ) -> None:
         if OpenAI is None:
             raise RuntimeError(
                 "openai package is not installed. Install optional extras to enable summarization."
             )
-        self.client = OpenAI(api_key=api_key)
+        # Retries go through the scheduler, which needs to see every 429.
+        self.client = OpenAI(api_key=api_key, max_retries=0)
+        self.scheduler = get_scheduler(
+            None,
+            model,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
         self.model = model
         self.temperature = temperature
         self.max_batch_size = max_batch_size
         self.max_tokens = max_tokens
         self.prompt_version = prompt_version
         self.cache = SummaryCache(cache_path)
+        self.context_budget = ContextBudget(
+            model, max_output_tokens=max_tokens, max_input_tokens=max_input_tokens
+        )
 
     def summarize(self, requests: Iterable[SummaryRequest]) -> Iterable[SummaryResult]:
         requests_list = list(requests)
@@ -375,55 +583,64 @@ class OpenAISummarizer(BaseSummarizer):
         for chunk in _chunked(pending, self.max_batch_size):
             summaries = self._summarize_batch(chunk)
             for req, summary in zip(chunk, summaries):
-                text = summary or req.title
-                self.cache.set(cache_keys[req.identifier], text)
-                results[req.identifier] = text
+                if not summary:
+                    # Not cached, so a failed or rate-limited call is retried next run.
+                    results[req.identifier] = req.title
+                    continue
+                self.cache.set(cache_keys[req.identifier], summary)
+                results[req.identifier] = summary
+        self.cache.flush()
         return [
             SummaryResult(identifier=req.identifier, summary=results.get(req.identifier, req.title))
             for req in requests_list
         ]
 
-    def _summarize_batch(self, requests: Sequence[SummaryRequest]) -> List[str]:
+    def _summarize_batch(self, requests: Sequence[SummaryRequest]) -> List[Optional[str]]:
         if not requests:
             return []
         try:
-            payload = {
-                "entries": [
+            system_prompt = build_release_notes_system_prompt(
+                extra=(
+                    "Your tone is concise, objective, and actionable. Prefer active voice, avoid repetition, and keep to <= 30 words per entry."
+                ),
+            )
+            # Every entry gets an equal share of what the system prompt and titles leave.
+            share = self.context_budget.available(
+                [system_prompt, BATCH_SUMMARY_INSTRUCTIONS, *(req.title for req in requests)]
+            ) // len(requests)
+            entries = []
+            for req in requests:
+                packed = _pack_request(self.context_budget, req, share)
+                entries.append(
                     {
                         "id": req.identifier,
                         "title": req.title,
-                        "body": req.body or "",
-                        "diff": req.diff or "",
+                        "body": packed["body"],
+                        "diff": packed["diff"],
                     }
-                    for req in requests
-                ]
-            }
-            message_content = (
-                "Rewrite each change entry into a concise, release-note ready sentence (<= 30 words). "
-                "Capture the impact, mention affected area if obvious, and avoid repetition. "
-                "Use the provided diffs to understand the actual changes if the commit message is sparse. "
-                'Respond with JSON object {"entries": [{"id": str, "summary": str}, ...]} in the same order as input.\n\n'
-                + json.dumps(payload, ensure_ascii=False)
+                )
+            message_content = BATCH_SUMMARY_INSTRUCTIONS + json.dumps(
+                {"entries": entries}, ensure_ascii=False
             )
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": build_release_notes_system_prompt(
-                            extra=(
-                                "Your tone is concise, objective, and actionable. Prefer active voice, avoid repetition, and keep to <= 30 words per entry."
-                            ),
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": message_content,
-                    },
-                ],
-                response_format={"type": "json_object"},
+            messages: List[ChatCompletionMessageParam] = [
+                {
+                    "role": "system",
+                    "content": system_prompt,
+                },
+                {
+                    "role": "user",
+                    "content": message_content,
+                },
+            ]
+            completion = self.scheduler.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    messages=messages,
+                    response_format=_JSON_RESPONSE_FORMAT,
+                ),
+                tokens=estimate_tokens(messages, self.max_tokens),
             )
             content = completion.choices[0].message.content or ""
             parsed = json.loads(content)
@@ -433,21 +650,134 @@ class OpenAISummarizer(BaseSummarizer):
                 for entry in entries
                 if isinstance(entry, dict)
             }
-            return [summary_map.get(req.identifier, req.title) for req in requests]
+            return [summary_map.get(req.identifier) for req in requests]
         except Exception:  # pragma: no cover - defensive fallback
-            return [req.title for req in requests]
+            return [None for _ in requests]
 
     def _cache_key(self, request: SummaryRequest) -> str:
-        content = f"{request.identifier}|{request.title}|{request.body or ''}|{request.diff or ''}|{self.model}|{self.prompt_version}"
+        content = f"{_request_fingerprint(request)}|{self.model}|{self.prompt_version}"
         digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
         return digest
 
 
+def _request_fingerprint(request: SummaryRequest) -> str:
+    if request.content_key:
+        return f"content={request.content_key}"
+    return f"{request.identifier}|{request.title}|{request.body or ''}|{request.diff or ''}"
+
+
 def _chunked(items: Sequence[SummaryRequest], size: int) -> Iterator[Sequence[SummaryRequest]]:
     for index in range(0, len(items), max(size, 1)):
         yield items[index : index + size]
 
 
+def _json_entries(content: Optional[str]) -> List[Dict[str, object]]:
+    try:
+        data = json.loads(content or "{}")
+    except ValueError:
+        return []
+    entries = data.get("entries") if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return []
+    return [entry for entry in entries if isinstance(entry, dict)]
+
+
+def _converged(candidates: Sequence[str], threshold: float) -> bool:
+    """Whether every pair of candidates overlaps by at least ``threshold``."""
+    return all(
+        similarity(first, second) >= threshold
+        for index, first in enumerate(candidates)
+        for second in candidates[index + 1 :]
+    )
+
+
+def _most_central(candidates: Sequence[str]) -> str:
+    """The candidate closest to all others; the shortest one on ties."""
+    return max(
+        candidates,
+        key=lambda text: (sum(similarity(text, other) for other in candidates), -len(text)),
+    )
+
+
+def _release_note_ready(text: str) -> bool:
+    """Check the length and style rules the critique step would enforce."""
+    words = text.split()
+    return (
+        0 < len(words) <= SUMMARY_MAX_WORDS
+        and "\n" not in text
+        and text[0].isupper()
+        and text.endswith((".", "!"))
+        and not text.lower().startswith(_FILLER_OPENINGS)
+    )
+
+
+def _chat_memo_key(
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    messages: Sequence[ChatCompletionMessageParam],
+    response_format: Optional[Dict[str, str]],
+) -> str:
+    payload = json.dumps(
+        [model, temperature, max_tokens, list(messages), response_format],
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    # Prefixed so step replies never collide with per-entry summary keys.
+    return CHAT_MEMO_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _validate_fused(content: Optional[str], roles: Sequence[str]) -> Optional[str]:
+    """Return the final sentence of a fused reply, or ``None`` if it breaks the schema.
+
+    The reply must carry a non-empty candidate for every role plus non-empty
+    ``merged`` and ``final`` strings, and the final sentence must be a single
+    line of at most ``FUSED_MAX_WORDS`` words.
+    """
+    try:
+        data = json.loads(content or "")
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    candidates = data.get("candidates")
+    if not isinstance(candidates, list):
+        return None
+    covered = set()
+    for candidate in candidates:
+        if not isinstance(candidate, dict):
+            return None
+        role, summary = candidate.get("role"), candidate.get("summary")
+        if not (isinstance(role, str) and isinstance(summary, str) and summary.strip()):
+            return None
+        covered.add(role.strip().lower())
+    if not {role.lower() for role in roles} <= covered:
+        return None
+    merged, final = data.get("merged"), data.get("final")
+    if not (isinstance(merged, str) and merged.strip()):
+        return None
+    if not (isinstance(final, str) and final.strip()):
+        return None
+    final = final.strip()
+    if "\n" in final or len(final.split()) > FUSED_MAX_WORDS:
+        return None
+    return final
+
+
+def _pack_request(
+    budget: ContextBudget, req: SummaryRequest, tokens: int, evidence: str = ""
+) -> Dict[str, str]:
+    """Fit a request's body, retrieved evidence and diff into ``tokens``."""
+    return budget.pack(
+        [
+            ContextSection("evidence", evidence, weight=2.0),
+            ContextSection("diff", req.diff or "", weight=2.0, kind="diff"),
+            ContextSection("body", req.body or ""),
+        ],
+        tokens,
+    )
+
+
 class OpenRouterSummarizer(BaseSummarizer):
     """Summarize change entries using OpenRouter's API (OpenAI-compatible)."""
 
@@ -462,6 +792,9 @@ class OpenRouterSummarizer(BaseSummarizer):
         prompt_version: str = "v1",
         cache_path: Optional[Path] = None,
         base_url: str = "https://openrouter.ai/api/v1",
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
     ) -> None:
         if OpenAI is None:
             raise RuntimeError(
@@ -470,6 +803,13 @@ class OpenRouterSummarizer(BaseSummarizer):
         self.client = OpenAI(
             api_key=api_key,
             base_url=base_url,
+            max_retries=0,
+        )
+        self.scheduler = get_scheduler(
+            base_url,
+            model,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
         )
         self.model = model
         self.temperature = temperature
@@ -477,6 +817,9 @@ class OpenRouterSummarizer(BaseSummarizer):
         self.max_tokens = max_tokens
         self.prompt_version = prompt_version
         self.cache = SummaryCache(cache_path)
+        self.context_budget = ContextBudget(
+            model, max_output_tokens=max_tokens, max_input_tokens=max_input_tokens
+        )
 
     def summarize(self, requests: Iterable[SummaryRequest]) -> Iterable[SummaryResult]:
         requests_list = list(requests)
@@ -494,55 +837,64 @@ class OpenRouterSummarizer(BaseSummarizer):
         for chunk in _chunked(pending, self.max_batch_size):
             summaries = self._summarize_batch(chunk)
             for req, summary in zip(chunk, summaries):
-                text = summary or req.title
-                self.cache.set(cache_keys[req.identifier], text)
-                results[req.identifier] = text
+                if not summary:
+                    # Not cached, so a failed or rate-limited call is retried next run.
+                    results[req.identifier] = req.title
+                    continue
+                self.cache.set(cache_keys[req.identifier], summary)
+                results[req.identifier] = summary
+        self.cache.flush()
         return [
             SummaryResult(identifier=req.identifier, summary=results.get(req.identifier, req.title))
             for req in requests_list
         ]
 
-    def _summarize_batch(self, requests: Sequence[SummaryRequest]) -> List[str]:
+    def _summarize_batch(self, requests: Sequence[SummaryRequest]) -> List[Optional[str]]:
         if not requests:
             return []
         try:
-            payload = {
-                "entries": [
+            system_prompt = build_release_notes_system_prompt(
+                extra=(
+                    "Your tone is concise, objective, and actionable. Prefer active voice, avoid repetition, and keep to <= 30 words per entry."
+                ),
+            )
+            # Every entry gets an equal share of what the system prompt and titles leave.
+            share = self.context_budget.available(
+                [system_prompt, BATCH_SUMMARY_INSTRUCTIONS, *(req.title for req in requests)]
+            ) // len(requests)
+            entries = []
+            for req in requests:
+                packed = _pack_request(self.context_budget, req, share)
+                entries.append(
                     {
                         "id": req.identifier,
                         "title": req.title,
-                        "body": req.body or "",
-                        "diff": req.diff or "",
+                        "body": packed["body"],
+                        "diff": packed["diff"],
                     }
-                    for req in requests
-                ]
-            }
-            message_content = (
-                "Rewrite each change entry into a concise, release-note ready sentence (<= 30 words). "
-                "Capture the impact, mention affected area if obvious, and avoid repetition. "
-                "Use the provided diffs to understand the actual changes if the commit message is sparse. "
-                'Respond with JSON object {"entries": [{"id": str, "summary": str}, ...]} in the same order as input.\n\n'
-                + json.dumps(payload, ensure_ascii=False)
+                )
+            message_content = BATCH_SUMMARY_INSTRUCTIONS + json.dumps(
+                {"entries": entries}, ensure_ascii=False
             )
-            completion = self.client.chat.completions.create(
-                model=self.model,
-                temperature=self.temperature,
-                max_tokens=self.max_tokens,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": build_release_notes_system_prompt(
-                            extra=(
-                                "Your tone is concise, objective, and actionable. Prefer active voice, avoid repetition, and keep to <= 30 words per entry."
-                            ),
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": message_content,
-                    },
-                ],
-                response_format={"type": "json_object"},
+            messages: List[ChatCompletionMessageParam] = [
+                {
+                    "role": "system",
+                    "content": system_prompt,
+                },
+                {
+                    "role": "user",
+                    "content": message_content,
+                },
+            ]
+            completion = self.scheduler.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    messages=messages,
+                    response_format=_JSON_RESPONSE_FORMAT,
+                ),
+                tokens=estimate_tokens(messages, self.max_tokens),
             )
             content = completion.choices[0].message.content or ""
             parsed = json.loads(content)
@@ -552,16 +904,25 @@ class OpenRouterSummarizer(BaseSummarizer):
                 for entry in entries
                 if isinstance(entry, dict)
             }
-            return [summary_map.get(req.identifier, req.title) for req in requests]
+            return [summary_map.get(req.identifier) for req in requests]
         except Exception:  # pragma: no cover - defensive fallback
-            return [req.title for req in requests]
+            return [None for _ in requests]
 
     def _cache_key(self, request: SummaryRequest) -> str:
-        content = f"{request.identifier}|{request.title}|{request.body or ''}|{request.diff or ''}|{self.model}|{self.prompt_version}"
+        content = f"{_request_fingerprint(request)}|{self.model}|{self.prompt_version}"
         digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
         return digest
 
 
+@dataclass(slots=True)
+class _PipelineRun:
+    """State shared by the entries of one ``summarize`` call."""
+
+    index: RetrievalIndex
+    # Written per entry from worker threads; each writes only its own key.
+    skipped_steps: Dict[str, List[str]] = field(default_factory=dict)
+
+
 class PromptEngineeredSummarizer(BaseSummarizer):
     """Advanced orchestrated summarizer with prompt-engineering techniques.
 
@@ -583,17 +944,32 @@ class PromptEngineeredSummarizer(BaseSummarizer):
         enable_multi_expert: bool = True,
         expert_roles: Optional[Sequence[str]] = None,
         enable_rag: bool = True,
-        rag_backend: str = "simple",  # "simple" or "chroma" (best-effort)
+        rag_backend: str = "simple",  # "simple" (BM25) or "chroma" (best-effort)
         enable_self_critique: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_batch_size: int = DEFAULT_PIPELINE_BATCH_SIZE,
+        fused: bool = False,
+        early_exit: bool = False,
+        early_exit_threshold: float = DEFAULT_EARLY_EXIT_THRESHOLD,
+        stop_on_agreement: bool = False,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
     ) -> None:
         if OpenAI is None:
             raise RuntimeError(
                 "openai package is not installed. Install optional extras to enable summarization."
             )
         if base_url:
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
+            self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
         else:
-            self.client = OpenAI(api_key=api_key)
+            self.client = OpenAI(api_key=api_key, max_retries=0)
+        self.scheduler = get_scheduler(
+            base_url,
+            model,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        )
         if not (enable_multi_expert and enable_rag and enable_self_critique):
             raise ValueError(
                 "Prompt engineering features are always enabled and can no longer be disabled."
@@ -603,6 +979,9 @@ class PromptEngineeredSummarizer(BaseSummarizer):
         self.max_tokens = max_tokens
         self.prompt_version = prompt_version
         self.cache = SummaryCache(cache_path)
+        self.context_budget = ContextBudget(
+            model, max_output_tokens=max_tokens, max_input_tokens=max_input_tokens
+        )
         # Features
         self.domain_scope = (
             domain_scope or "software release notes"
@@ -620,6 +999,19 @@ class PromptEngineeredSummarizer(BaseSummarizer):
         if self.rag_backend not in {"simple", "chroma"}:
             self.rag_backend = "simple"
         self.enable_self_critique = True
+        # Entries summarized at once; each also runs its expert roles in parallel.
+        self.max_workers = max(1, max_workers)
+        # Above 1, each pipeline step handles this many entries in one call.
+        self.max_batch_size = max(1, max_batch_size)
+        # Run an entry's experts, synthesis and critique as one JSON call.
+        self.fused = fused
+        # Identical chat calls in flight at once share one request.
+        self._in_flight = SingleFlight()
+        # Opt-in: skip synthesis/critique when their output is already
+        # determined; stop_on_agreement also stops asking roles once two agree.
+        self.early_exit = early_exit
+        self.early_exit_threshold = early_exit_threshold
+        self.stop_on_agreement = stop_on_agreement
 
     # ----------------------------- Public API -----------------------------
     def summarize(self, requests: Iterable[SummaryRequest]) -> Iterable[SummaryResult]:
@@ -635,15 +1027,37 @@ class PromptEngineeredSummarizer(BaseSummarizer):
                 results[req.identifier] = cached
             else:
                 pending.append(req)
-        for req in pending:
-            try:
-                text = self._summarize_one(req)
-            except Exception:
-                text = req.title
-            self.cache.set(cache_keys[req.identifier], text)
-            results[req.identifier] = text
+        # One index over the whole run, so term weights reflect every entry.
+        run = _PipelineRun(
+            RetrievalIndex(requests_list if pending else [], backend=self.rag_backend)
+        )
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                # map() yields in submission order, so cache writes stay ordered.
+                if self.max_batch_size > 1:
+                    chunks = executor.map(
+                        partial(self._summarize_chunk, run=run),
+                        _chunked(pending, self.max_batch_size),
+                    )
+                    texts: Iterable[Optional[str]] = (text for chunk in chunks for text in chunk)
+                else:
+                    texts = executor.map(partial(self._summarize_or_none, run=run), pending)
+                for req, text in zip(pending, texts):
+                    if text is None:
+                        # Not cached, so a failed or rate-limited entry is retried next run.
+                        results[req.identifier] = req.title
+                        continue
+                    self.cache.set(cache_keys[req.identifier], text)
+                    results[req.identifier] = text
+        finally:
+            run.index.close()
+        self.cache.flush()
         return [
-            SummaryResult(identifier=req.identifier, summary=results.get(req.identifier, req.title))
+            SummaryResult(
+                identifier=req.identifier,
+                summary=results.get(req.identifier, req.title),
+                skipped_steps=run.skipped_steps.get(req.identifier, []),
+            )
             for req in requests_list
         ]
 
@@ -651,103 +1065,162 @@ class PromptEngineeredSummarizer(BaseSummarizer):
     def _build_system_prompt(self) -> str:
         return build_release_notes_system_prompt(self.domain_scope)
 
-    def _summarize_one(self, req: SummaryRequest) -> str:
+    def _summarize_or_none(
+        self, req: SummaryRequest, run: Optional[_PipelineRun] = None
+    ) -> Optional[str]:
+        try:
+            return self._summarize_one(req, run)
+        except Exception:
+            return None
+
+    def _summarize_one(self, req: SummaryRequest, run: Optional[_PipelineRun] = None) -> str:
         # Step 1: domain-scoped system prompt
         system_prompt = self._build_system_prompt()
         instructions_suffix = (
             " Your tone is concise, objective, and actionable. Prefer active voice, avoid repetition, and keep to <= 30 words per entry."
         )
 
-        # Step 2: optional RAG with query planning over provided body
-        context_blocks: List[str] = []
-        if self.enable_rag and (req.body or "").strip():
-            planning = self._plan_queries(system_prompt, req)
-            evidence = self._gather_evidence(req, planning)
-            if evidence:
-                context_blocks.append("Relevant context from body:\n" + evidence)
-        
-        if req.diff:
-            context_blocks.append("Code changes (diff):\n" + req.diff)
+        # Step 2: RAG over the body, with queries planned from TF-IDF terms
+        evidence = self._gather_evidence(req, run) if self.enable_rag else ""
 
         base_user = (
             "Rewrite the change into a concise, release-note ready sentence (<= 30 words).\n"
             "Mention affected area if obvious, and clarify user impact when possible.\n"
         )
+        fused_steps = (
+            FUSED_INSTRUCTIONS.format(roles=", ".join(self.expert_roles)) if self.fused else ""
+        )
+        # Body, evidence and diff share what the fixed prompt leaves of the budget.
+        longest_role = max(self.expert_roles, key=len)
+        packed = _pack_request(
+            self.context_budget,
+            req,
+            self.context_budget.available(
+                [
+                    system_prompt,
+                    f"Act as a {longest_role} reviewing changes for release notes.",
+                    instructions_suffix,
+                    base_user,
+                    fused_steps,
+                    req.title,
+                ]
+            ),
+            evidence,
+        )
+        context_blocks: List[str] = []
+        if packed["evidence"]:
+            context_blocks.append("Relevant context from body:\n" + packed["evidence"])
+        if packed["diff"]:
+            context_blocks.append("Code changes (diff):\n" + packed["diff"])
         base_payload = {
             "id": req.identifier,
             "title": req.title,
-            "body": (req.body or "")[:1600],
+            "body": packed["body"],
         }
+        entry_content = (
+            "\nInput:"
+            + json.dumps(base_payload, ensure_ascii=False)
+            + ("\n\n" + "\n\n".join(context_blocks) if context_blocks else "")
+        )
+
+        # Steps 3-5 in one call; an invalid reply falls through to separate calls.
+        if self.fused:
+            fused = self._summarize_fused(
+                system_prompt + instructions_suffix, base_user + fused_steps + entry_content
+            )
+            if fused:
+                return fused
 
         # Step 3: multi-expert role prompting to produce candidates
+        skipped: List[str] = []
+        if run is not None:
+            run.skipped_steps[req.identifier] = skipped
         candidates: List[str] = []
         if self.enable_multi_expert:
-            for role in self.expert_roles:
+            user_content = base_user + entry_content
+
+            def ask_expert(role: str) -> Optional[str]:
                 role_prompt = f"Act as a {role} reviewing changes for release notes."
-                msg = self._chat(
+                return self._chat(
                     [
                         {"role": "system", "content": system_prompt + " " + role_prompt + instructions_suffix},
-                        {
-                            "role": "user",
-                            "content": base_user
-                            + "\nInput:"
-                            + json.dumps(base_payload, ensure_ascii=False)
-                            + ("\n\n" + "\n\n".join(context_blocks) if context_blocks else ""),
-                        },
+                        {"role": "user", "content": user_content},
                     ],
                     response_format=None,
                 )
-                text = (msg or "").strip()
-                if text:
+
+            if self.stop_on_agreement:
+                # One role at a time, so the rest can be skipped once two agree.
+                for position, role in enumerate(self.expert_roles):
+                    text = (ask_expert(role) or "").strip()
+                    if not text:
+                        continue
+                    agrees = any(
+                        similarity(text, other) >= self.early_exit_threshold
+                        for other in candidates
+                    )
                     candidates.append(text)
+                    if agrees:
+                        skipped.extend(f"expert:{rest}" for rest in self.expert_roles[position + 1 :])
+                        break
+            else:
+                if self.max_workers > 1 and len(self.expert_roles) > 1:
+                    with ThreadPoolExecutor(max_workers=len(self.expert_roles)) as experts:
+                        replies = list(experts.map(ask_expert, self.expert_roles))
+                else:
+                    replies = [ask_expert(role) for role in self.expert_roles]
+                for msg in replies:
+                    text = (msg or "").strip()
+                    if text:
+                        candidates.append(text)
 
         # Always produce at least one candidate (fallback)
         if not candidates:
             msg = self._chat(
                 [
                     {"role": "system", "content": system_prompt + instructions_suffix},
-                    {
-                        "role": "user",
-                        "content": base_user
-                        + "\nInput:"
-                        + json.dumps(base_payload, ensure_ascii=False)
-                        + ("\n\n" + "\n\n".join(context_blocks) if context_blocks else ""),
-                    },
+                    {"role": "user", "content": base_user + entry_content},
                 ],
                 response_format=None,
             )
             candidates.append((msg or req.title).strip() or req.title)
 
-        # Step 4: synthesis/merge
-        synthesis_instructions = (
-            "Merge the candidate summaries into one polished sentence (<= 30 words). "
-            "Avoid redundancy, prefer user impact, and keep terminology consistent."
-        )
-        synthesis_input = {
-            "id": req.identifier,
-            "title": req.title,
-            "candidates": candidates,
-        }
-        merged = (
-            self._chat(
-                [
-                    {"role": "system", "content": system_prompt + " You are now the synthesizer."},
-                    {
-                        "role": "user",
-                        "content": synthesis_instructions
-                        + "\nInput:"
-                        + json.dumps(synthesis_input, ensure_ascii=False),
-                    },
-                ],
-                response_format=None,
+        # Step 4: synthesis/merge, unless the candidates already agree
+        if self.early_exit and _converged(candidates, self.early_exit_threshold):
+            merged = _most_central(candidates)
+            skipped.append("synthesis")
+        else:
+            synthesis_instructions = (
+                "Merge the candidate summaries into one polished sentence (<= 30 words). "
+                "Avoid redundancy, prefer user impact, and keep terminology consistent."
+            )
+            synthesis_input = {
+                "id": req.identifier,
+                "title": req.title,
+                "candidates": candidates,
+            }
+            merged = (
+                self._chat(
+                    [
+                        {"role": "system", "content": system_prompt + " You are now the synthesizer."},
+                        {
+                            "role": "user",
+                            "content": synthesis_instructions
+                            + "\nInput:"
+                            + json.dumps(synthesis_input, ensure_ascii=False),
+                        },
+                    ],
+                    response_format=None,
+                )
+                or req.title
             )
-            or req.title
-        )
 
         final_text = merged.strip() or req.title
 
-        # Step 5: optional self-critique/edit
-        if self.enable_self_critique:
+        # Step 5: optional self-critique/edit, unless the sentence already passes
+        if self.early_exit and _release_note_ready(final_text):
+            skipped.append("critique")
+        elif self.enable_self_critique:
             critique_instructions = (
                 "Critique the sentence for clarity, brevity, and tone; then output the improved sentence only. "
                 "Remove unnecessary qualifiers, keep <= 30 words, and ensure it's release-note ready."
@@ -771,114 +1244,216 @@ class PromptEngineeredSummarizer(BaseSummarizer):
 
         return final_text.strip() or req.title
 
-    # -- Query planning and retrieval -------------------------------------------------
-    def _plan_queries(self, system_prompt: str, req: SummaryRequest) -> List[str]:
-        plan_request = {
-            "task": "Identify 2-4 short search queries/keywords to find the most relevant evidence in the provided text.",
-            "title": req.title,
-            "body": (req.body or "")[:1600],
-        }
+    def _summarize_fused(self, system_content: str, user_content: str) -> Optional[str]:
+        """Ask for candidates, merge and final sentence at once; ``None`` if invalid."""
         content = self._chat(
             [
                 {
                     "role": "system",
-                    "content": system_prompt + " You are planning evidence retrieval.",
+                    "content": system_content
+                    + " You act as every expert, then as the synthesizer and final editor.",
                 },
-                {"role": "user", "content": json.dumps(plan_request, ensure_ascii=False)},
+                {"role": "user", "content": user_content},
             ],
             response_format={"type": "json_object"},
+            # Room for one candidate per role plus the merged and final sentences.
+            max_tokens=self.max_tokens * (len(self.expert_roles) + 2) // 2,
         )
-        queries: List[str] = []
+        return _validate_fused(content, self.expert_roles)
+
+    # -- Retrieval ---------------------------------------------------------------
+    def _gather_evidence(self, req: SummaryRequest, run: Optional[_PipelineRun]) -> str:
+        if not (req.body or "").strip():
+            return ""
+        index = run.index if run is not None else None
+        if index is None or req.identifier not in index:
+            index = RetrievalIndex([req])
+        return index.evidence(req.identifier)
+
+    # -- Batched pipeline -----------------------------------------------------------
+    def _summarize_chunk(
+        self, chunk: Sequence[SummaryRequest], run: Optional[_PipelineRun] = None
+    ) -> List[Optional[str]]:
+        """Summarize a chunk with batched calls, splitting it on partial failure."""
+        if len(chunk) == 1:
+            return [self._summarize_or_none(chunk[0], run)]
         try:
-            data = json.loads(content or "{}")
-            raw = data.get("queries") or data.get("keywords") or []
-            if isinstance(raw, list):
-                queries = [str(q) for q in raw][:4]
-            elif isinstance(raw, str):
-                queries = [raw]
+            summaries = self._summarize_batch(chunk, run)
         except Exception:
-            pass
-        # Fallback: extract top words from title
-        if not queries:
-            queries = [w.lower() for w in re.findall(r"[a-zA-Z0-9_\-]{3,}", req.title)][:3]
-        return queries
-
-    def _gather_evidence(self, req: SummaryRequest, queries: Sequence[str]) -> str:
-        text = (req.body or "").strip()
-        if not text:
-            return ""
-        # Try chroma if requested (best-effort); otherwise simple keyword retrieval
-        if self.rag_backend == "chroma":
-            try:  # optional dependency path
-                from uuid import uuid4
-
-                import chromadb  # type: ignore
-
-                client = chromadb.Client()
-                coll_name = f"grg-{uuid4()}"
-                coll = client.create_collection(name=coll_name)
-                # Split into paragraphs
-                paras = [p.strip() for p in re.split(r"\n\s*\n+", text) if p.strip()]
-                if not paras:
-                    paras = [text]
-                ids = [str(i) for i in range(len(paras))]
-                coll.add(documents=paras, ids=ids)
-                # Query with each term and collect top hits
-                seen = set()
-                selected: List[str] = []
-                for q in queries:
-                    res = coll.query(query_texts=[q], n_results=min(3, len(paras)))
-                    docs = (res.get("documents") or [[]])[0]
-                    for d in docs:
-                        if d not in seen:
-                            seen.add(d)
-                            selected.append(d)
-                            if len(selected) >= 6:
-                                break
-                return "\n\n".join(selected[:6])
+            summaries = {}
+        failed = [req for req in chunk if req.identifier not in summaries]
+        if failed:
+            # Retry what is missing as two smaller chunks; single entries fall
+            # back to the per-entry pipeline.
+            middle = (len(failed) + 1) // 2
+            for part in (failed[:middle], failed[middle:]):
+                for req, text in zip(part, self._summarize_chunk(part, run)):
+                    if text is not None:
+                        summaries[req.identifier] = text
+        return [summaries.get(req.identifier) for req in chunk]
+
+    def _summarize_batch(
+        self, chunk: Sequence[SummaryRequest], run: Optional[_PipelineRun] = None
+    ) -> Dict[str, str]:
+        """Run each pipeline step once for the whole chunk.
+
+        Returns summaries for the entries that made it through every step.
+        """
+        system_prompt = self._build_system_prompt()
+        instructions_suffix = (
+            " Your tone is concise, objective, and actionable. Prefer active voice, avoid repetition, and keep to <= 30 words per entry. "
+            + ENTRIES_JSON_INSTRUCTION
+        )
+
+        # Step 2: RAG over each body, from the shared index
+        user_instructions = (
+            "Rewrite each change entry into a concise, release-note ready sentence (<= 30 words).\n"
+            "Mention affected area if obvious, and clarify user impact when possible. "
+            "Use context and diff, when given, to understand the actual change.\n"
+        )
+        longest_role = max(self.expert_roles, key=len)
+        share = self.context_budget.available(
+            [
+                system_prompt,
+                f"Act as a {longest_role} reviewing changes for release notes.",
+                instructions_suffix,
+                user_instructions,
+                *(req.title for req in chunk),
+            ]
+        ) // len(chunk)
+        entries = []
+        for req in chunk:
+            evidence = self._gather_evidence(req, run) if self.enable_rag else ""
+            packed = _pack_request(self.context_budget, req, share, evidence)
+            entry: Dict[str, object] = {
+                "id": req.identifier,
+                "title": req.title,
+                "body": packed["body"],
+            }
+            if packed["evidence"]:
+                entry["context"] = packed["evidence"]
+            if packed["diff"]:
+                entry["diff"] = packed["diff"]
+            entries.append(entry)
+        user_content = user_instructions + "\nInput:" + json.dumps(
+            {"entries": entries}, ensure_ascii=False
+        )
+
+        # Step 3: one call per expert role for the whole chunk
+        def ask_expert(role: str) -> Dict[str, str]:
+            role_prompt = f"Act as a {role} reviewing changes for release notes."
+            try:
+                return self._chat_entries(
+                    system_prompt + " " + role_prompt + instructions_suffix, user_content, chunk
+                )
             except Exception:
-                # Fallback to simple retrieval
-                pass
-            finally:
-                try:
-                    # Best-effort cleanup if API available
-                    client.delete_collection(coll_name)  # type: ignore[attr-defined]
-                except Exception:
-                    pass
-
-        # Simple retrieval: choose paragraphs with most keyword hits
-        paras = [p.strip() for p in re.split(r"\n\s*\n+", text) if p.strip()]
-        if not paras:
-            paras = [text]
-        scored = []
-        qset = [q.lower() for q in queries]
-        for p in paras:
-            pl = p.lower()
-            score = sum(pl.count(q) for q in qset)
-            if score:
-                scored.append((score, p))
-        scored.sort(key=lambda x: (-x[0], len(x[1])))
-        top = [p for _s, p in scored[:6]] or paras[:1]
-        return "\n\n".join(top)
+                return {}
+
+        if self.max_workers > 1 and len(self.expert_roles) > 1:
+            with ThreadPoolExecutor(max_workers=len(self.expert_roles)) as experts:
+                replies = list(experts.map(ask_expert, self.expert_roles))
+        else:
+            replies = [ask_expert(role) for role in self.expert_roles]
+        candidates: Dict[str, List[str]] = {}
+        for reply in replies:
+            for identifier, text in reply.items():
+                candidates.setdefault(identifier, []).append(text)
+        if not candidates:
+            return {}
+
+        # Step 4: synthesis/merge
+        synthesis_input = [
+            {"id": req.identifier, "title": req.title, "candidates": candidates[req.identifier]}
+            for req in chunk
+            if req.identifier in candidates
+        ]
+        merged = self._chat_entries(
+            system_prompt + " You are now the synthesizer. " + ENTRIES_JSON_INSTRUCTION,
+            "Merge each entry's candidate summaries into one polished sentence (<= 30 words). "
+            "Avoid redundancy, prefer user impact, and keep terminology consistent."
+            "\nInput:" + json.dumps({"entries": synthesis_input}, ensure_ascii=False),
+            chunk,
+        )
+        if not merged or not self.enable_self_critique:
+            return merged
+
+        # Step 5: self-critique/edit; entries the editor drops keep their merge
+        edited = self._chat_entries(
+            system_prompt + " You are now the final editor. " + ENTRIES_JSON_INSTRUCTION,
+            "Critique each sentence for clarity, brevity, and tone; then output the improved sentence only. "
+            "Remove unnecessary qualifiers, keep <= 30 words, and ensure it's release-note ready."
+            "\nInput:"
+            + json.dumps(
+                {"entries": [{"id": key, "sentence": text} for key, text in merged.items()]},
+                ensure_ascii=False,
+            ),
+            chunk,
+        )
+        return {key: edited.get(key) or text for key, text in merged.items()}
+
+    def _chat_entries(
+        self, system_content: str, user_content: str, chunk: Sequence[SummaryRequest]
+    ) -> Dict[str, str]:
+        """Ask for one summary per entry and keep the non-empty ones for known ids."""
+        content = self._chat(
+            [
+                {"role": "system", "content": system_content},
+                {"role": "user", "content": user_content},
+            ],
+            response_format={"type": "json_object"},
+        )
+        identifiers = {req.identifier for req in chunk}
+        summaries: Dict[str, str] = {}
+        for entry in _json_entries(content):
+            identifier = str(entry.get("id"))
+            text = entry.get("summary")
+            if identifier in identifiers and isinstance(text, str) and text.strip():
+                summaries[identifier] = text.strip()
+        return summaries
 
     # -- Chat wrapper ---------------------------------------------------------------
     def _chat(
         self,
         messages: List[ChatCompletionMessageParam],
         response_format: Optional[Dict[str, str]],
+        max_tokens: Optional[int] = None,
     ) -> Optional[str]:
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-            messages=messages,
-            **({"response_format": response_format} if response_format else {}),
-        )
-        return (
-            (completion.choices[0].message.content or "")
-            if completion and completion.choices
-            else ""
-        )
+        """Send one chat completion, memoized by its full request.
+
+        Replies are cached per step, so changing one step of the pipeline
+        re-runs only the calls whose prompts changed.
+        """
+        max_tokens = max(max_tokens or 0, self.max_tokens)
+        key = _chat_memo_key(self.model, self.temperature, max_tokens, messages, response_format)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def request() -> str:
+            # A caller that just finished the same request may have stored it.
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+            completion = self.scheduler.call(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    temperature=self.temperature,
+                    max_tokens=max_tokens,
+                    messages=messages,
+                    **({"response_format": response_format} if response_format else {}),
+                ),
+                tokens=estimate_tokens(messages, max_tokens),
+            )
+            content = (
+                (completion.choices[0].message.content or "")
+                if completion and completion.choices
+                else ""
+            )
+            if content:
+                self.cache.set(key, content)
+            return content
+
+        return self._in_flight.do(key, request)
 
     def _cache_key(self, request: SummaryRequest) -> str:
         flags = (
@@ -886,7 +1461,17 @@ class PromptEngineeredSummarizer(BaseSummarizer):
             f"rag={int(self.enable_rag)}:{self.rag_backend}|crit={int(self.enable_self_critique)}|"
             f"model={self.model}|pv={self.prompt_version}"
         )
-        content = f"{request.identifier}|{request.title}|{request.body or ''}|{request.diff or ''}|{flags}"
+        if self.max_batch_size > 1:
+            # Batched prompts differ, so keep their results apart from per-entry ones.
+            flags += "|batched"
+        if self.fused:
+            flags += "|fused"
+        # Skipped steps change the output, so each setting keeps its own results.
+        if self.early_exit:
+            flags += f"|early={self.early_exit_threshold}"
+        if self.stop_on_agreement:
+            flags += f"|agree={self.early_exit_threshold}"
+        content = f"{_request_fingerprint(request)}|{flags}"
         digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
         return digest
 
@@ -0,0 +1,71 @@
+"""Route change entries to summarization tiers by change type and size.
+
+Not every entry deserves the full prompt-engineered pipeline. A one-line
+``chore(ci): bump action`` reads fine as written, and a small docs change
+only needs a light rewrite. :class:`TierPolicy` picks one of three tiers:
+
+- ``full``: the configured summarizer (multi-expert, RAG, critique).
+- ``light``: a single batched call through a cheap summarizer.
+- ``title``: no LLM call; the entry keeps its own title.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, Optional
+
+TIER_FULL = "full"
+TIER_LIGHT = "light"
+TIER_TITLE = "title"
+
+DEFAULT_TRIVIAL_TYPES = frozenset({"build", "chore", "ci", "docs", "style", "test"})
+# Changed lines (insertions + deletions) a trivial entry may have per tier.
+DEFAULT_TITLE_MAX_LINES = 10
+DEFAULT_LIGHT_MAX_LINES = 200
+
+
+@dataclass(slots=True)
+class TierPolicy:
+    """Choose a summarization tier from an entry's type, body and size.
+
+    Only entries whose commits are all of a trivial type, with no body and no
+    breaking change, leave the full tier. Within the ``title_max_lines`` budget
+    they keep their title, within ``light_max_lines`` they get the light tier,
+    and anything larger goes back to the full pipeline. Entries of unknown
+    size (no diff or file stats) stay in the full tier.
+    """
+
+    trivial_types: FrozenSet[str] = field(default=DEFAULT_TRIVIAL_TYPES)
+    title_max_lines: int = DEFAULT_TITLE_MAX_LINES
+    light_max_lines: int = DEFAULT_LIGHT_MAX_LINES
+
+    def choose(
+        self,
+        types: Iterable[str],
+        *,
+        breaking: bool = False,
+        has_body: bool = False,
+        changed_lines: Optional[int] = None,
+    ) -> str:
+        if breaking or has_body:
+            return TIER_FULL
+        if any(change_type not in self.trivial_types for change_type in types):
+            return TIER_FULL
+        if changed_lines is None:
+            return TIER_FULL
+        if changed_lines <= self.title_max_lines:
+            return TIER_TITLE
+        if changed_lines <= self.light_max_lines:
+            return TIER_LIGHT
+        return TIER_FULL
+
+
+__all__ = [
+    "DEFAULT_LIGHT_MAX_LINES",
+    "DEFAULT_TITLE_MAX_LINES",
+    "DEFAULT_TRIVIAL_TYPES",
+    "TIER_FULL",
+    "TIER_LIGHT",
+    "TIER_TITLE",
+    "TierPolicy",
+]
@@ -0,0 +1,221 @@
+"""Token estimation and context budgeting for LLM prompts.
+
+Prompts used to be cut at fixed character counts that knew nothing about the
+model. :class:`ContextBudget` works in tokens instead: it takes the model's
+context window (capped at ``max_input_tokens`` to bound cost), subtracts the
+completion budget and the fixed parts of the prompt, and splits the rest
+across the variable sections (body, evidence, diff) by weight. Space a short
+section does not need goes to the others. Sections that still do not fit are
+trimmed at paragraph or diff-hunk boundaries.
+
+Token counts come from ``tiktoken`` when it is installed and knows the model,
+and otherwise from a fast four-characters-per-token heuristic.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Protocol, Sequence
+
+try:  # pragma: no cover - optional dependency guard
+    import tiktoken  # type: ignore[import]
+except Exception:  # pragma: no cover - optional dependency guard
+    tiktoken = None  # type: ignore[assignment]
+
+CHARS_PER_TOKEN = 4
+DEFAULT_CONTEXT_WINDOW = 8_192
+# Upper bound on prompt tokens per request, however large the window is.
+DEFAULT_MAX_INPUT_TOKENS = 6_000
+
+# Context windows by model name, without provider prefix or ":free"-style tags.
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-turbo": 128_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+    "o3-mini": 200_000,
+    "claude-3.5-sonnet": 200_000,
+    "gemini-2.0-flash": 1_048_576,
+    "llama-3.1-8b-instruct": 131_072,
+    "llama-3.3-70b-instruct": 131_072,
+    "mistral-7b-instruct": 32_768,
+}
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_HUNK_START_RE = re.compile(r"^(?=Diff for |diff --git |@@ )", re.MULTILINE)
+
+
+class Tokenizer(Protocol):
+    def count(self, text: str) -> int: ...
+
+    def truncate(self, text: str, max_tokens: int) -> str: ...
+
+
+class HeuristicTokenizer:
+    """Estimate about four characters per token, in constant time."""
+
+    def count(self, text: str) -> int:
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max(0, max_tokens) * CHARS_PER_TOKEN]
+
+
+class TiktokenTokenizer:
+    """Exact counts from a ``tiktoken`` encoding."""
+
+    def __init__(self, encoding: Any) -> None:
+        self._encoding = encoding
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._encoding.decode(tokens[: max(0, max_tokens)])
+
+
+HEURISTIC_TOKENIZER = HeuristicTokenizer()
+
+
+def _base_model(model: str) -> str:
+    return model.rsplit("/", 1)[-1].split(":", 1)[0].lower()
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """Return the tokenizer for ``model``, or the heuristic when none is available."""
+    if tiktoken is None or not model:
+        return HEURISTIC_TOKENIZER
+    try:
+        return TiktokenTokenizer(tiktoken.encoding_for_model(_base_model(model)))
+    except Exception:
+        # Unknown to tiktoken (e.g. open models), or its encoding files
+        # could not be loaded.
+        return HEURISTIC_TOKENIZER
+
+
+def context_window(model: Optional[str]) -> int:
+    """Return the context window of ``model``, matching the longest known prefix."""
+    if not model:
+        return DEFAULT_CONTEXT_WINDOW
+    name = _base_model(model)
+    matches = [known for known in MODEL_CONTEXT_WINDOWS if name.startswith(known)]
+    if not matches:
+        return DEFAULT_CONTEXT_WINDOW
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)]
+
+
+@dataclass(slots=True)
+class ContextSection:
+    """A variable part of a prompt competing for the token budget."""
+
+    name: str
+    text: str
+    weight: float = 1.0
+    # "diff" sections are trimmed by hunk, anything else by paragraph.
+    kind: str = "text"
+
+
+class ContextBudget:
+    """Split a model's prompt budget across fixed text and weighted sections."""
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        *,
+        max_output_tokens: int = 0,
+        max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+        window: Optional[int] = None,
+        tokenizer: Optional[Tokenizer] = None,
+    ) -> None:
+        self.tokenizer = tokenizer or get_tokenizer(model)
+        self.window = window or context_window(model)
+        self.input_tokens = max(0, min(self.window - max_output_tokens, max_input_tokens))
+
+    def count(self, text: str) -> int:
+        return self.tokenizer.count(text) if text else 0
+
+    def available(self, fixed: Sequence[str] = ()) -> int:
+        """Tokens left for sections once the ``fixed`` prompt parts are counted."""
+        return max(0, self.input_tokens - sum(self.count(text) for text in fixed))
+
+    def allocate(self, sections: Sequence[ContextSection], tokens: int) -> Dict[str, int]:
+        """Share ``tokens`` across ``sections`` by weight, capped at what each needs."""
+        demands = {section.name: self.count(section.text) for section in sections}
+        weights = {section.name: max(section.weight, 0.0) for section in sections}
+        allocation = {name: 0 for name in demands}
+        pending = [name for name, demand in demands.items() if demand and weights[name]]
+        remaining = tokens
+        while pending and remaining > 0:
+            total = sum(weights[name] for name in pending)
+            shares = {name: remaining * weights[name] / total for name in pending}
+            satisfied = [name for name in pending if demands[name] <= shares[name]]
+            if not satisfied:
+                for name in pending:
+                    allocation[name] = int(shares[name])
+                break
+            for name in satisfied:
+                allocation[name] = demands[name]
+                remaining -= demands[name]
+                pending.remove(name)
+        return allocation
+
+    def pack(self, sections: Sequence[ContextSection], tokens: int) -> Dict[str, str]:
+        """Return each section's text trimmed to its share of ``tokens``."""
+        allocation = self.allocate(sections, tokens)
+        return {
+            section.name: self.fit(section.text, allocation[section.name], kind=section.kind)
+            for section in sections
+        }
+
+    def fit(self, text: str, tokens: int, *, kind: str = "text") -> str:
+        """Trim ``text`` to ``tokens``, keeping whole paragraphs or hunks where possible."""
+        if not text or self.count(text) <= tokens:
+            return text
+        if tokens <= 0:
+            return ""
+        if kind == "diff":
+            units = [unit for unit in _HUNK_START_RE.split(text) if unit.strip()]
+            separator = ""
+        else:
+            units = [unit for unit in _PARAGRAPH_RE.split(text) if unit.strip()]
+            separator = "\n\n"
+        kept: List[str] = []
+        used = 0
+        omitted = 0
+        marker_tokens = self.count("\n[... 999 more paragraphs omitted]")
+        budget = tokens - marker_tokens
+        for unit in units:
+            cost = self.count(unit + separator)
+            if used + cost <= budget:
+                kept.append(unit)
+                used += cost
+            else:
+                omitted += 1
+        if not kept:
+            # Nothing fits whole; keep the start of the first unit.
+            return self.tokenizer.truncate(units[0] if units else text, tokens)
+        packed = separator.join(kept)
+        if omitted:
+            label = "hunks" if kind == "diff" else "paragraphs"
+            packed = f"{packed.rstrip()}\n[... {omitted} more {label} omitted]"
+        return packed
+
+
+__all__ = [
+    "HEURISTIC_TOKENIZER",
+    "ContextBudget",
+    "ContextSection",
+    "HeuristicTokenizer",
+    "TiktokenTokenizer",
+    "Tokenizer",
+    "context_window",
+    "get_tokenizer",
+]
@@ -0,0 +1,323 @@
+"""Tests for ChangelogBuilder.build, including the streaming mode."""
+
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from helixcommit.changelog import ChangelogBuilder
+from helixcommit.models import CommitInfo, PullRequestInfo
+from helixcommit.summarizer import BaseSummarizer, SummaryResult
+from helixcommit.tiers import TierPolicy
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_commit(
+    index: int,
+    subject: str,
+    body: str = "",
+    pr_number: Optional[int] = None,
+    diff: Optional[str] = None,
+) -> CommitInfo:
+    return CommitInfo(
+        sha=f"{index:040x}",
+        subject=subject,
+        body=body,
+        author_name=f"Author {index % 3}",
+        author_email="dev@example.com",
+        authored_date=NOW,
+        committed_date=NOW,
+        pr_number=pr_number,
+        diff=diff,
+    )
+
+
+def make_pr(number: int) -> PullRequestInfo:
+    return PullRequestInfo(
+        number=number,
+        title=f"PR {number}",
+        url=f"https://example.com/pr/{number}",
+        author="reviewer",
+        merged_at=NOW,
+        body=None,
+    )
+
+
+class RecordingSummarizer(BaseSummarizer):
+    def __init__(self) -> None:
+        self.batches: List[int] = []
+
+    def summarize(self, requests):
+        requests = list(requests)
+        self.batches.append(len(requests))
+        for request in requests:
+            yield SummaryResult(identifier=request.identifier, summary=f"AI: {request.title}")
+
+
+def section_items(changelog):
+    return [
+        (section.title, item.title, item.metadata["commit_shas"], item.breaking)
+        for section in changelog.sections
+        for item in section.items
+    ]
+
+
+def test_streaming_build_matches_batch_build():
+    commits = [make_commit(index, f"feat: change {index}") for index in range(40)]
+    commits += [make_commit(40 + index, "fix: part of pr", pr_number=7) for index in range(3)]
+    pr_index = {7: make_pr(7)}
+
+    expected = ChangelogBuilder().build(
+        version="1.0.0", release_date=NOW, commits=commits, pr_index=dict(pr_index)
+    )
+    summarizer = RecordingSummarizer()
+    streamed = ChangelogBuilder(summarizer=summarizer).build(
+        version="1.0.0",
+        release_date=NOW,
+        commits=iter(commits),
+        pr_index=dict(pr_index),
+        batch_size=8,
+    )
+
+    assert [(title, shas) for title, _, shas, _ in section_items(streamed)] == [
+        (title, shas) for title, _, shas, _ in section_items(expected)
+    ]
+    assert all(item[1].startswith("AI: ") for item in section_items(streamed))
+    assert len(summarizer.batches) > 1
+    assert sum(summarizer.batches) == 41
+
+
+def test_streaming_build_folds_late_pull_request_commits_into_entry():
+    commits = [make_commit(0, "feat: first part", pr_number=5)]
+    commits += [make_commit(index, f"docs: note {index}") for index in range(1, 10)]
+    commits.append(
+        make_commit(10, "feat!: second part", body="BREAKING CHANGE: drops v1", pr_number=5)
+    )
+
+    changelog = ChangelogBuilder().build(
+        version=None,
+        release_date=NOW,
+        commits=iter(commits),
+        pr_index={5: make_pr(5)},
+        batch_size=2,
+    )
+
+    (pr_item,) = [
+        item for section in changelog.sections for item in section.items
+        if item.metadata.get("pr_number") == "5"
+    ]
+    assert pr_item.metadata["commit_shas"] == [commits[0].sha, commits[-1].sha]
+    assert pr_item.metadata["commit_count"] == 2
+    assert pr_item.breaking is True
+    assert pr_item.notes == ["drops v1"]
+
+
+def test_streaming_build_releases_diffs_of_written_buckets():
+    def commits():
+        for index in range(400):
+            diff = f"+{index}" + "x" * 50_000
+            yield make_commit(index, f"fix: change {index}", diff=diff)
+
+    tracemalloc.start()
+    try:
+        changelog = ChangelogBuilder(summarizer=RecordingSummarizer()).build(
+            version=None, release_date=NOW, commits=commits(), batch_size=16
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert sum(len(section.items) for section in changelog.sections) == 400
+    # 400 diffs total 20MB; only the open window of 32 buckets is ever held.
+    assert peak < 5_000_000
+
+
+def test_templated_titles_are_summarized_once():
+    commits = [
+        make_commit(0, "build(deps): bump lodash from 4.17.20 to 4.17.21"),
+        make_commit(1, "build(deps): bump requests from 2.31.0 to 2.32.0"),
+        make_commit(2, "build(deps): bump rich from 13.0.0 to 13.7.1"),
+        make_commit(3, "feat: add exporter"),
+    ]
+    summarizer = RecordingSummarizer()
+
+    changelog = ChangelogBuilder(summarizer=summarizer).build(
+        version=None, release_date=NOW, commits=commits
+    )
+
+    titles = {item.metadata["commit_shas"][0]: item.title for _, item in _items(changelog)}
+    assert summarizer.batches == [2]
+    assert titles[commits[1].sha] == "AI: bump requests from 2.31.0 to 2.32.0"
+    assert titles[commits[2].sha] == "AI: bump rich from 13.0.0 to 13.7.1"
+    assert titles[commits[3].sha] == "AI: add exporter"
+
+    plain = RecordingSummarizer()
+    ChangelogBuilder(summarizer=plain, dedupe_templates=False).build(
+        version=None, release_date=NOW, commits=commits
+    )
+    assert plain.batches == [4]
+
+
+def _items(changelog):
+    return [(section, item) for section in changelog.sections for item in section.items]
+
+
+def test_tier_policy_routes_entries_and_reports_tier():
+    small_diff = "--- a/ci.yml\n+++ b/ci.yml\n-uses: v3\n+uses: v4"
+    medium_diff = "\n".join(f"+line {index}" for index in range(40))
+    commits = [
+        make_commit(0, "ci: pin checkout action", diff=small_diff),
+        make_commit(1, "docs: expand install guide", diff=medium_diff),
+        make_commit(2, "docs: explain flags", body="Covers every option.", diff=small_diff),
+        make_commit(3, "fix: handle empty input", diff=small_diff),
+    ]
+    full, light = RecordingSummarizer(), RecordingSummarizer()
+
+    changelog = ChangelogBuilder(
+        summarizer=full, light_summarizer=light, tier_policy=TierPolicy()
+    ).build(version=None, release_date=NOW, commits=commits)
+
+    items = {item.metadata["commit_shas"][0]: item for _, item in _items(changelog)}
+    tiers = [items[commit.sha].metadata["summary_tier"] for commit in commits]
+    assert tiers == ["title", "light", "full", "full"]
+    assert (full.batches, light.batches) == ([2], [1])
+    assert items[commits[0].sha].title == "pin checkout action"
+    assert items[commits[1].sha].title == "AI: expand install guide"
+
+
+class SkippingSummarizer(BaseSummarizer):
+    def summarize(self, requests):
+        for request in requests:
+            yield SummaryResult(
+                identifier=request.identifier,
+                summary=f"AI: {request.title}",
+                skipped_steps=["synthesis"] if "docs" in request.title else [],
+            )
+
+
+def test_builder_records_skipped_summary_steps():
+    commits = [make_commit(0, "feat: add docs export"), make_commit(1, "feat: add api")]
+
+    changelog = ChangelogBuilder(summarizer=SkippingSummarizer()).build(
+        version=None, release_date=NOW, commits=commits
+    )
+
+    items = {item.metadata["commit_shas"][0]: item for _, item in _items(changelog)}
+    assert items[commits[0].sha].metadata["summary_skipped_steps"] == ["synthesis"]
+    assert "summary_skipped_steps" not in items[commits[1].sha].metadata
+
+
+class CapturingSummarizer(BaseSummarizer):
+    def __init__(self) -> None:
+        self.requests = []
+
+    def summarize(self, requests):
+        for request in requests:
+            self.requests.append(request)
+            yield SummaryResult(identifier=request.identifier, summary=f"AI: {request.title}")
+
+
+def test_summary_keys_follow_patch_ids_across_backports():
+    main = make_commit(0, "fix: handle empty input", body="Guard the parser.")
+    backport = make_commit(
+        1,
+        "[1.x] fix: handle empty input",
+        body=f"Guard the parser.\n\n(cherry picked from commit {main.sha})",
+    )
+    other = make_commit(2, "fix: handle empty input", body="Guard the parser.")
+    looked_up = []
+
+    def patch_ids(shas):
+        looked_up.append(list(shas))
+        return {main.sha: "p1", backport.sha: "p1", other.sha: "p2"}
+
+    summarizer = CapturingSummarizer()
+    ChangelogBuilder(summarizer=summarizer, patch_ids=patch_ids, dedupe_templates=False).build(
+        version=None, release_date=NOW, commits=[main, backport, other]
+    )
+
+    keys = {request.identifier[len("commit-"):]: request.content_key for request in summarizer.requests}
+    assert looked_up == [[main.sha, backport.sha, other.sha]]
+    assert keys[main.sha] == keys[backport.sha]
+    assert keys[other.sha] != keys[main.sha]
+
+
+def test_pull_request_summary_keys_ignore_number_and_line_offsets():
+    def build(number, hunk):
+        diff = f"diff --git a/app.py b/app.py\nindex {number}abc..{number}def 100644\n{hunk}\n-old\n+new"
+        pr = PullRequestInfo(
+            number=number,
+            title="Add retries",
+            url=f"https://example.com/pr/{number}",
+            author="reviewer",
+            merged_at=NOW,
+            body="Retries failed uploads.",
+        )
+        summarizer = CapturingSummarizer()
+        ChangelogBuilder(summarizer=summarizer).build(
+            version=None,
+            release_date=NOW,
+            commits=[make_commit(number, "feat: add retries", pr_number=number, diff=diff)],
+            pr_index={number: pr},
+        )
+        return summarizer.requests[0].content_key
+
+    assert build(7, "@@ -10,2 +10,2 @@ def upload():") == build(9, "@@ -42,2 +42,2 @@")
+
+
+def _bot_commit(index: int, package: str, old: str, new: str, resolved: str) -> CommitInfo:
+    body = (
+        f"Bumps [{package}](https://github.com/example/{package}) from {old} to {new}.\n"
+        f"- [Release notes](https://github.com/example/{package}/releases)\n"
+        f"- [Commits](https://github.com/example/{package}/compare/v{old}...v{new})\n\n"
+        "---\nupdated-dependencies:\n"
+        f"- dependency-name: {package}\n  dependency-type: direct:production\n...\n\n"
+        "Signed-off-by: dependabot[bot] <support@github.com>"
+    )
+    diff = (
+        "diff --git a/package.json b/package.json\n--- a/package.json\n+++ b/package.json\n"
+        f"@@ -12,7 +12,7 @@\n-    \"{package}\": \"^{old}\",\n+    \"{package}\": \"^{new}\",\n"
+        "diff --git a/package-lock.json b/package-lock.json\n"
+        "--- a/package-lock.json\n+++ b/package-lock.json\n"
+        f"@@ -{index * 97},9 +{index * 97},9 @@\n"
+        f"-      \"version\": \"{old}\",\n+      \"version\": \"{new}\",\n"
+        f"+      \"resolved\": \"{resolved}\",\n"
+    )
+    return make_commit(
+        index, f"build(deps): bump {package} from {old} to {new}", body=body, diff=diff
+    )
+
+
+def test_dependency_bot_commits_share_one_summary():
+    commits = [
+        _bot_commit(1, "lodash", "4.17.20", "4.17.21", "https://registry.npmjs.org/lodash"),
+        _bot_commit(2, "axios", "1.6.0", "1.6.2", "https://registry.npmjs.org/axios/-/axios-1.6.2.tgz"),
+    ]
+    summarizer = RecordingSummarizer()
+
+    changelog = ChangelogBuilder(summarizer=summarizer).build(
+        version=None, release_date=NOW, commits=commits
+    )
+
+    titles = {item.metadata["commit_shas"][0]: item.title for _, item in _items(changelog)}
+    assert summarizer.batches == [1]
+    assert titles[commits[1].sha] == "AI: bump axios from 1.6.0 to 1.6.2"
+
+
+def test_templated_titles_touching_other_files_are_summarized_separately():
+    def diff(*paths: str) -> str:
+        return "\n".join(f"--- a/{path}\n+++ b/{path}\n-old\n+new" for path in paths)
+
+    commits = [
+        make_commit(0, "fix: bump parser from 2.0.0 to 2.1.0", diff=diff("pyproject.toml")),
+        make_commit(1, "fix: bump lexer from 2.0.0 to 2.1.0", diff=diff("pyproject.toml", "src/lex.py")),
+        make_commit(2, "fix: bump cli from 2.0.0 to 2.1.0", diff=diff("pyproject.toml")),
+    ]
+    summarizer = CapturingSummarizer()
+
+    ChangelogBuilder(summarizer=summarizer).build(version=None, release_date=NOW, commits=commits)
+
+    assert sorted(request.title for request in summarizer.requests) == [
+        "bump lexer from 2.0.0 to 2.1.0",
+        "bump parser from 2.0.0 to 2.1.0",
+    ]
@@ -5,7 +5,8 @@ from typing import List, Optional
 
 import pytest
 
-from helixcommit.changelog import filter_commits
+from helixcommit import models
+from helixcommit.changelog import ChangelogBuilder, filter_commits
 from helixcommit.models import CommitInfo
 
 
@@ -315,3 +316,40 @@ class TestFilterCommitsByPath:
 
         assert result == []
 
+
+
+class TestSharedParse:
+    """The parsed message is computed once per commit and reused."""
+
+    def test_filter_and_build_parse_each_commit_once(self, monkeypatch):
+        calls: List[str] = []
+        original = models.parse_commit_message
+
+        def counting(message):
+            calls.append(message)
+            return original(message)
+
+        monkeypatch.setattr(models, "parse_commit_message", counting)
+        commits = [
+            make_commit(sha="1", subject="feat(api): add endpoint"),
+            make_commit(sha="2", subject="Fix crash on start"),
+        ]
+
+        filtered = filter_commits(commits, include_types=["feat", "fix"])
+        changelog = ChangelogBuilder().build(
+            version="1.0.0", release_date=None, commits=filtered
+        )
+
+        assert [item.type for section in changelog.sections for item in section.items] == [
+            "feat",
+            "fix",
+        ]
+        assert len(calls) == 2
+
+    def test_parse_is_refreshed_when_message_changes(self):
+        commit = make_commit(subject="feat: add login")
+        assert commit.parsed.type == "feat"
+
+        commit.subject = "fix: resolve bug"
+
+        assert commit.parsed.type == "fix"
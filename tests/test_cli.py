@@ -4,12 +4,17 @@ import git
 import pytest
 from typer.testing import CliRunner
 
+from helixcommit.changelog import ChangelogBuilder
 from helixcommit.cli import (
+    GENERATE_BATCH_SIZE,
     _extract_mr_number,
     _extract_pr_number,
+    _open_repository,
     _parse_date,
     app,
 )
+from helixcommit.commit_index import DEFAULT_COMMIT_INDEX
+from helixcommit.summarizer import BaseSummarizer, SummaryResult
 
 runner = CliRunner()
 
@@ -51,6 +56,72 @@ def test_cli_generate_text_output(tmp_path):
     assert "add feature" in result.output
 
 
+def test_cli_generate_streams_commits_without_pr_lookups(tmp_path, monkeypatch):
+    """Test generate hands the builder a lazy commit stream with a batch size."""
+    repo = git.Repo.init(tmp_path)
+    initial = create_commit(repo, tmp_path, "README.md", "Initial", "chore: initial commit")
+    create_commit(repo, tmp_path, "feature.txt", "Feature", "feat: add feature")
+    last = create_commit(repo, tmp_path, "fix.txt", "Fix", "fix: close #12")
+    calls = []
+    build = ChangelogBuilder.build
+
+    def recording_build(self, **kwargs):
+        calls.append((kwargs["commits"], kwargs["batch_size"]))
+        return build(self, **kwargs)
+
+    monkeypatch.setattr(ChangelogBuilder, "build", recording_build)
+    result = runner.invoke(
+        app,
+        [
+            "generate", "--repo", str(tmp_path), "--since", initial.hexsha,
+            "--until", last.hexsha, "--format", "markdown", "--no-prs",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "add feature" in result.output
+    assert "#12" in result.output
+    [(commits, batch_size)] = calls
+    assert batch_size == GENERATE_BATCH_SIZE
+    assert not isinstance(commits, list)
+
+
+@pytest.mark.parametrize("tiers_enabled", [False, True])
+def test_cli_generate_builds_light_summarizer_only_with_tiers(tmp_path, monkeypatch, tiers_enabled):
+    """Test the light summarizer is only created when tiers are enabled."""
+    repo = git.Repo.init(tmp_path)
+    initial = create_commit(repo, tmp_path, "README.md", "Initial", "chore: initial commit")
+    last = create_commit(repo, tmp_path, "ci.yml", "uses: v4", "ci: pin checkout action")
+    (tmp_path / ".helixcommit.toml").write_text(
+        f"[tiers]\nenabled = {str(tiers_enabled).lower()}\n"
+    )
+    created = []
+
+    class FakeSummarizer(BaseSummarizer):
+        def __init__(self, **kwargs):
+            created.append(type(self).__name__)
+
+        def summarize(self, requests):
+            for request in requests:
+                yield SummaryResult(identifier=request.identifier, summary=request.title)
+
+    class FakeLight(FakeSummarizer):
+        pass
+
+    monkeypatch.setattr("helixcommit.cli.PromptEngineeredSummarizer", FakeSummarizer)
+    monkeypatch.setattr("helixcommit.cli.OpenRouterSummarizer", FakeLight)
+    result = runner.invoke(
+        app,
+        [
+            "generate", "--repo", str(tmp_path), "--since", initial.hexsha,
+            "--until", last.hexsha, "--no-prs", "--use-llm", "--openrouter-api-key", "sk-test",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert created == (["FakeSummarizer", "FakeLight"] if tiers_enabled else ["FakeSummarizer"])
+
+
 # --- GitHub PR Number Extraction Tests ---
 
 
@@ -144,6 +215,40 @@ def test_cli_generate_include_types(tmp_path):
     assert "update docs" not in result.output
 
 
+def test_cli_generate_custom_types_from_config(tmp_path):
+    """Custom types from .helixcommit.toml are used for classification and filtering."""
+    repo = git.Repo.init(tmp_path)
+    initial = create_commit(repo, tmp_path, "README.md", "Initial", "chore: initial commit")
+    create_commit(repo, tmp_path, "feature.txt", "Feature", "feat: add feature")
+    last = create_commit(repo, tmp_path, "keys.txt", "Keys", "sec: rotate signing keys")
+    (tmp_path / ".helixcommit.toml").write_text(
+        '[types]\ncustom = ["security"]\naliases = { sec = "security" }\n'
+    )
+
+    result = runner.invoke(
+        app,
+        [
+            "generate",
+            "--repo",
+            str(tmp_path),
+            "--since",
+            initial.hexsha,
+            "--until",
+            last.hexsha,
+            "--format",
+            "text",
+            "--no-prs",
+            "--include-types",
+            "security",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "SECURITY" in result.output
+    assert "rotate signing keys" in result.output
+    assert "add feature" not in result.output
+
+
 def test_cli_generate_exclude_scopes(tmp_path):
     """Test --exclude-scopes filters out commits with specified scopes."""
     repo = git.Repo.init(tmp_path)
@@ -579,4 +684,30 @@ def test_cli_generate_commit_shows_staged_files(tmp_path):
     assert "- file1.txt" in result.output
     assert "- subdir/file2.py" in result.output
     assert "--- a/file1.txt" not in result.output  # Ensure diff is not shown
-    assert "+++ b/file1.txt" not in result.output  # Ensure diff is not shown
\ No newline at end of file
+    assert "+++ b/file1.txt" not in result.output  # Ensure diff is not shown
+
+
+def test_cli_index_writes_commit_graph(tmp_path):
+    """Test index writes a commit-graph with changed-path Bloom filters."""
+    repo = git.Repo.init(tmp_path)
+    create_commit(repo, tmp_path, "README.md", "Initial", "chore: initial commit")
+
+    result = runner.invoke(app, ["index", "--repo", str(tmp_path)])
+
+    assert result.exit_code == 0, result.output
+    assert "with changed-path Bloom filters" in result.output
+    assert "Commit index holds 1 commits" in result.output
+    assert (tmp_path / ".git" / "objects" / "info" / "commit-graph").exists()
+    assert (tmp_path / DEFAULT_COMMIT_INDEX).exists()
+
+
+def test_cli_uses_commit_index_only_after_index_command(tmp_path):
+    """Test scans use the commit index only once the index command built it."""
+    repo = git.Repo.init(tmp_path)
+    create_commit(repo, tmp_path, "README.md", "Initial", "chore: initial commit")
+
+    assert _open_repository(tmp_path).commit_index is None
+    assert not (tmp_path / DEFAULT_COMMIT_INDEX).exists()
+
+    runner.invoke(app, ["index", "--repo", str(tmp_path)])
+    assert _open_repository(tmp_path).commit_index is not None
@@ -1,4 +1,10 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
 from helixcommit.commit_generator import CommitGenerator
+from helixcommit.llm_scheduler import RequestScheduler
 
 
 def test_to_message_dedup_subject():
@@ -21,3 +27,50 @@ def test_to_message_dedup_subject():
     assert "feat: add login\n\nfeat: add login" not in cleaned
     assert "- Add login form" in cleaned
     assert "Validate credentials" in cleaned
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def broken_stream(*texts):
+    yield from (chunk(text) for text in texts)
+    raise ServerError("stream reset")
+
+
+def streaming_generator(*responses):
+    gen = CommitGenerator.__new__(CommitGenerator)
+    gen.model = "test-model"
+    gen.history = []
+    gen.client = MagicMock()
+    gen.client.chat.completions.create.side_effect = list(responses)
+    gen.scheduler = RequestScheduler(backoff_base=0.0, sleep_func=lambda _: None)
+    return gen
+
+
+def test_stream_retries_before_first_chunk_and_names_the_error(capsys):
+    gen = streaming_generator(broken_stream(), iter([chunk("feat: "), chunk("add login")]))
+    received = []
+
+    message = gen.generate("diff", stream=True, stream_callback=received.append)
+
+    assert message == "feat: add login"
+    assert received == ["feat: ", "add login"]
+    output = capsys.readouterr().out
+    assert "Provider error (HTTP 503). Retrying" in output
+    assert "Rate limit" not in output
+
+
+def test_stream_is_not_retried_after_partial_output():
+    gen = streaming_generator(broken_stream("feat: "), iter([chunk("feat: add login")]))
+    received = []
+
+    with pytest.raises(RuntimeError, match="interrupted after partial output"):
+        gen.generate("diff", stream=True, stream_callback=received.append)
+
+    assert received == ["feat: "]
+    assert gen.client.chat.completions.create.call_count == 1
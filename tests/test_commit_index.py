@@ -0,0 +1,142 @@
+import sqlite3
+from pathlib import Path
+
+import git
+
+from helixcommit.commit_index import CommitIndex
+from helixcommit.git_client import CommitRange, GitRepository
+from helixcommit.parser import ChangeTypeClassifier
+
+
+def create_commit(
+    repo: git.Repo, base_path: Path, relative: str, content: str, message: str
+) -> git.Commit:
+    file_path = base_path / relative
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content, encoding="utf-8")
+    repo.index.add([relative])
+    actor = git.Actor("Test User", "test@example.com")
+    return repo.index.commit(message, author=actor, committer=actor)
+
+
+def commit_fields(commits):
+    return [
+        (commit.sha, commit.subject, commit.body, commit.author_email, commit.is_merge)
+        for commit in commits
+    ]
+
+
+def record_log_calls(git_repo, monkeypatch):
+    calls = []
+    original = git_repo._log_entries
+
+    def recording(rev_args):
+        calls.append(list(rev_args))
+        return original(rev_args)
+
+    monkeypatch.setattr(git_repo, "_log_entries", recording)
+    return calls
+
+
+def test_commit_index_serves_ranges_like_git(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    first = create_commit(repo, tmp_path, "a.txt", "a", "chore: initial commit")
+    repo.create_tag("v0.1.0", ref=first)
+    for index in range(4):
+        create_commit(repo, tmp_path, f"f{index}.txt", "x", f"feat(core): change {index}\n\nBody.")
+
+    cli = GitRepository(tmp_path, prefer_gitpython=False)
+    indexed = GitRepository(tmp_path, commit_index=CommitIndex(tmp_path / "commits.sqlite3"))
+    for commit_range in (
+        CommitRange(),
+        CommitRange(since="v0.1.0"),
+        CommitRange(until="HEAD~1", max_count=2),
+    ):
+        assert commit_fields(indexed.iter_commits(commit_range)) == commit_fields(
+            cli.iter_commits(commit_range)
+        )
+
+
+def test_commit_index_updates_incrementally_and_persists(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    for index in range(3):
+        create_commit(repo, tmp_path, "a.txt", str(index), f"fix: change {index}")
+    index_path = tmp_path / ".helixcommit-cache" / "commits.sqlite3"
+
+    git_repo = GitRepository(tmp_path, commit_index=CommitIndex(index_path))
+    calls = record_log_calls(git_repo, monkeypatch)
+    assert len(list(git_repo.iter_commits(CommitRange()))) == 3
+    assert len(calls) == 1
+    assert index_path.exists()
+
+    head = create_commit(repo, tmp_path, "b.txt", "b", "feat(api)!: new endpoint")
+    warm = GitRepository(tmp_path, commit_index=CommitIndex(index_path))
+    calls = record_log_calls(warm, monkeypatch)
+    commits = list(warm.iter_commits(CommitRange()))
+    assert commits[0].sha == head.hexsha
+    # Only the new commit is walked; the old head is excluded.
+    assert calls == [[head.hexsha, "--not", head.parents[0].hexsha]]
+
+    list(warm.iter_commits(CommitRange()))
+    assert len(calls) == 1
+    entry = warm.commit_index.get(head.hexsha)
+    assert (entry.change_type, entry.scope, entry.breaking) == ("feat", "api", True)
+    assert warm.commit_index.classify(commits[0]) == ("feat", "api")
+
+
+def test_commit_index_records_file_lists_on_demand(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    create_commit(repo, tmp_path, "src/app.py", "print('hi')\n", "feat: add app")
+    index_path = tmp_path / "commits.sqlite3"
+
+    git_repo = GitRepository(tmp_path, commit_index=CommitIndex(index_path))
+    (commit,) = git_repo.iter_commits(CommitRange())
+    assert commit.files == []
+    commits = list(git_repo.iter_commits(CommitRange(), include_files=True))
+    assert commits[0].files == ["src/app.py"]
+    assert commits[0].insertions == 1
+
+    warm = GitRepository(tmp_path, commit_index=CommitIndex(index_path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("file lists should come from the index")
+
+    monkeypatch.setattr(warm, "_get_commit_file_changes", fail)
+    monkeypatch.setattr(warm, "_git_process", fail)
+    commits = list(warm.iter_commits(CommitRange(), include_files=True))
+    assert commits[0].files == ["src/app.py"]
+
+
+def test_commit_index_is_shared_between_instances_and_cleared_on_new_types(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    for index in range(3):
+        create_commit(repo, tmp_path, "a.txt", str(index), f"fix: change {index}")
+    index_path = tmp_path / "commits.sqlite3"
+
+    first = GitRepository(tmp_path, commit_index=CommitIndex(index_path))
+    list(first.iter_commits(CommitRange()))
+    # A second run reads committed rows without rewriting the file.
+    second = CommitIndex(index_path)
+    assert len(second) == 3
+    assert second.heads() == [repo.head.commit.hexsha]
+
+    custom = ChangeTypeClassifier.extended(types=["deps"], patterns={"deps": r"\bbump\b"})
+    assert len(CommitIndex(index_path, custom)) == 0
+
+
+def test_commit_index_falls_back_to_git_for_missing_commits(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    commits = [
+        create_commit(repo, tmp_path, "a.txt", str(index), f"fix: change {index}")
+        for index in range(4)
+    ]
+    index_path = tmp_path / "commits.sqlite3"
+    list(GitRepository(tmp_path, commit_index=CommitIndex(index_path)).iter_commits(CommitRange()))
+    with sqlite3.connect(index_path) as connection:
+        connection.execute("DELETE FROM commits WHERE sha = ?", (commits[1].hexsha,))
+
+    cli = GitRepository(tmp_path, prefer_gitpython=False)
+    indexed = GitRepository(tmp_path, commit_index=CommitIndex(index_path))
+    assert commit_fields(indexed.iter_commits(CommitRange())) == commit_fields(
+        cli.iter_commits(CommitRange())
+    )
@@ -10,6 +10,8 @@ from helixcommit.config import (
     GenerateConfig,
     GeneratorConfig,
     TemplateConfig,
+    TiersConfig,
+    TypesConfig,
     expand_env_vars,
     load_config,
 )
@@ -802,3 +804,80 @@ def test_load_config_explicit_file_not_found(tmp_path):
 
     assert config.source_path is None
     assert config.generate.format == "markdown"
+
+
+def test_config_loader_loads_custom_types_toml(tmp_path):
+    """ConfigLoader parses [types] into a classifier with custom types."""
+    config_file = tmp_path / ".helixcommit.toml"
+    config_file.write_text("""
+[types]
+custom = ["i18n"]
+aliases = { translation = "i18n", deps = "build" }
+patterns = { i18n = "\\\\b(i18n|translat\\\\w*)\\\\b" }
+keywords = { i18n = ["i18n", "translat"] }
+""")
+
+    config = load_config(tmp_path)
+    classifier = config.types.build_classifier()
+
+    assert config.types.custom == ["i18n"]
+    assert classifier.classify("translation(de): update strings") == "i18n"
+    assert classifier.classify("deps: bump requests") == "build"
+    assert classifier.classify("Update German translations and fix typo") == "i18n"
+    assert classifier.classify("Fix crash") == "fix"
+
+
+def test_types_config_rejects_alias_to_unknown_type():
+    """Aliases must point at a built-in or custom type."""
+    with pytest.raises(ValueError, match="Unknown change type"):
+        TypesConfig(aliases={"sec": "security"}).build_classifier()
+
+
+def test_config_loader_loads_ai_max_workers(tmp_path):
+    """ConfigLoader reads the summarizer concurrency from [ai]."""
+    (tmp_path / ".helixcommit.toml").write_text("[ai]\nmax_workers = 8\n")
+
+    assert load_config(tmp_path).ai.max_workers == 8
+    assert AIConfig().max_workers == 4
+
+
+def test_config_loader_loads_ai_max_batch_size(tmp_path):
+    """ConfigLoader reads the batched pipeline chunk size from [ai]."""
+    (tmp_path / ".helixcommit.toml").write_text("[ai]\nmax_batch_size = 10\n")
+
+    assert load_config(tmp_path).ai.max_batch_size == 10
+    assert AIConfig().max_batch_size == 1
+
+
+def test_config_loader_loads_tiers(tmp_path):
+    """ConfigLoader reads summarization tier budgets from [tiers]."""
+    (tmp_path / ".helixcommit.toml").write_text(
+        "[tiers]\nenabled = true\n"
+        'trivial_types = ["Docs", "deps"]\ntitle_max_lines = 0\nlight_max_lines = 50\n'
+    )
+
+    policy = load_config(tmp_path).tiers.build_policy()
+    assert policy.trivial_types == frozenset({"docs", "deps"})
+    assert (policy.title_max_lines, policy.light_max_lines) == (0, 50)
+    # Routing is opt-in, so existing configs keep summarizing every entry.
+    assert TiersConfig().build_policy() is None
+    assert "ci" in TiersConfig(enabled=True).build_policy().trivial_types
+
+
+def test_config_loader_loads_ai_fused(tmp_path):
+    """ConfigLoader reads the fused single-call pipeline switch from [ai]."""
+    (tmp_path / ".helixcommit.toml").write_text("[ai]\nfused = true\n")
+
+    assert load_config(tmp_path).ai.fused is True
+    assert AIConfig().fused is False
+
+
+def test_config_loader_loads_ai_early_exit(tmp_path):
+    """ConfigLoader reads the early-exit settings from [ai]."""
+    (tmp_path / ".helixcommit.toml").write_text(
+        "[ai]\nearly_exit = true\nearly_exit_threshold = 0.6\nstop_on_agreement = true\n"
+    )
+
+    ai = load_config(tmp_path).ai
+    assert (ai.early_exit, ai.early_exit_threshold, ai.stop_on_agreement) == (True, 0.6, True)
+    assert (AIConfig().early_exit, AIConfig().stop_on_agreement) == (False, False)
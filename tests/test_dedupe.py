@@ -0,0 +1,53 @@
+from helixcommit.dedupe import template_clusters
+
+BUMPS = [
+    "bump lodash from 4.17.20 to 4.17.21",
+    "bump @types/node from 18.1.0 to 20.0.1",
+    "bump react-dom from 17.0.2 to 18.2.0",
+]
+
+
+def test_dependency_bumps_share_a_template():
+    titles = [*BUMPS, "update dependency pytest to v7.4.2", "update dependency ruff to v0.1.0"]
+    clusters = template_clusters(titles)
+
+    assert [(cluster.members, cluster.values[0]) for cluster in clusters] == [
+        ([0, 1, 2], ("lodash", "4.17.20", "4.17.21")),
+        ([3, 4], ("pytest", "v7.4.2")),
+    ]
+
+
+def test_titles_without_versions_are_not_templated():
+    assert template_clusters(["fix crash in parser", "fix crash in lexer"]) == []
+    assert template_clusters(["bump lodash from 1.0.0 to 1.1.0", "drop lodash"]) == []
+
+
+def test_words_only_vary_in_dependency_templates():
+    titles = ["fix crash in parser on 2.1.0", "fix hang in parser on 2.1.0"]
+    assert template_clusters(titles) == []
+    assert template_clusters(["fix crash on 2.1.0", "fix hang on 2.2.0"]) == []
+
+
+def test_fill_swaps_values_the_summary_mentions():
+    (cluster,) = template_clusters(BUMPS)
+
+    summary = "Upgrade lodash from 4.17.20 to 4.17.21 for security fixes."
+    assert cluster.fill(summary, 0, 1) == (
+        "Upgrade @types/node from 18.1.0 to 20.0.1 for security fixes."
+    )
+    assert cluster.fill("Upgrade lodash to 4.17.21.", 0, 2) == "Upgrade react-dom to 18.2.0."
+    # Without the package name the summary cannot be attributed to another bump.
+    assert cluster.fill("Upgrade dependencies to 4.17.21.", 0, 2) is None
+
+
+def test_bare_numbers_are_not_versions():
+    assert template_clusters(["feat: change 1", "feat: change 2"]) == []
+
+
+def test_same_context_compares_details_with_values_swapped():
+    (cluster,) = template_clusters(BUMPS[:2])
+
+    assert cluster.same_context(None, "", 0, 1)
+    assert cluster.same_context("Bumps lodash to 4.17.21.", "Bumps @types/node to 20.0.1.", 0, 1)
+    assert not cluster.same_context("Bumps lodash.", "Fixes a crash on null bytes.", 0, 1)
+    assert not cluster.same_context("Bumps lodash.", None, 0, 1)
@@ -1,6 +1,8 @@
+import subprocess
 from pathlib import Path
 
 import git
+import pytest
 
 from helixcommit.git_client import CommitRange, GitRepository
 
@@ -166,3 +168,259 @@ def test_get_github_slug_returns_none_for_gitlab(tmp_path):
     slug = git_repo.get_github_slug()
 
     assert slug is None
+
+
+def test_git_repository_collects_file_churn_in_one_pass(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    create_commit(repo, Path(tmp_path), "README.md", "one\ntwo\n", "chore: initial commit")
+    (Path(tmp_path) / "logo.bin").write_bytes(b"\x00\x01\x02")
+    repo.index.add(["logo.bin"])
+    create_commit(repo, Path(tmp_path), "README.md", "one\nthree\nfour\n", "docs: update readme")
+
+    for prefer_gitpython in (True, False):
+        git_repo = GitRepository(tmp_path, prefer_gitpython=prefer_gitpython)
+        monkeypatch.setattr(
+            git_repo,
+            "_get_commit_file_changes",
+            lambda sha: pytest.fail("per-commit fallback should not run"),
+        )
+        commits = list(git_repo.iter_commits(CommitRange(), include_files=True))
+
+        assert [commit.subject for commit in commits] == [
+            "docs: update readme",
+            "chore: initial commit",
+        ]
+        latest = commits[0]
+        assert latest.files == ["README.md", "logo.bin"]
+        readme, logo = latest.file_changes
+        assert (readme.insertions, readme.deletions, readme.binary) == (2, 1, False)
+        assert logo.binary is True
+        assert (latest.insertions, latest.deletions) == (2, 1)
+        assert commits[1].files == ["README.md"]
+        assert commits[1].insertions == 2
+
+
+def test_git_repository_streams_diffs_for_whole_range(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    create_commit(repo, Path(tmp_path), "README.md", "Initial\n", "chore: initial commit")
+    (Path(tmp_path) / "logo.bin").write_bytes(b"\x00\x01\x02")
+    repo.index.add(["logo.bin"])
+    create_commit(repo, Path(tmp_path), "README.md", "Initial\nUpdated\n", "feat: update readme")
+
+    for prefer_gitpython in (True, False):
+        git_repo = GitRepository(tmp_path, prefer_gitpython=prefer_gitpython)
+        monkeypatch.setattr(
+            git_repo,
+            "get_commit_diff",
+            lambda sha, max_chars=0: pytest.fail("per-commit diff should not run"),
+        )
+        latest, initial = git_repo.iter_commits(CommitRange(), include_diffs=True)
+
+        assert "+Updated" in latest.diff
+        assert "logo.bin" not in latest.diff
+        assert latest.diff.startswith("diff --git a/README.md b/README.md")
+        assert "+Initial" in initial.diff
+
+
+def test_get_commit_diff_respects_character_budget(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    content = "".join(f"line {index}\n" for index in range(500))
+    commit = create_commit(repo, Path(tmp_path), "big.txt", content, "feat: big file")
+
+    git_repo = GitRepository(tmp_path)
+    diff = git_repo.get_commit_diff(commit.hexsha, max_chars=120)
+
+    assert len(diff) == 120
+    assert diff.startswith("diff --git a/big.txt b/big.txt")
+
+
+def test_cli_iter_commits_stops_git_when_consumer_stops(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    for index in range(3):
+        create_commit(repo, Path(tmp_path), "notes.txt", f"{index}\n", f"chore: note {index}")
+
+    git_repo = GitRepository(tmp_path, prefer_gitpython=False)
+    processes = []
+    real_popen = subprocess.Popen
+
+    def tracking_popen(*args, **kwargs):
+        process = real_popen(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr(subprocess, "Popen", tracking_popen)
+    stream = git_repo.iter_commits(CommitRange(), include_files=True)
+    first = next(stream)
+    assert first.subject == "chore: note 2"
+    assert first.files == ["notes.txt"]
+
+    stream.close()
+
+    assert len(processes) == 2
+    assert all(process.returncode is not None for process in processes)
+    assert all(process.stdout.closed for process in processes)
+
+
+def test_cli_iter_commits_handles_unit_separator_in_body(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    create_commit(
+        repo, Path(tmp_path), "a.txt", "a", "fix: odd body\n\nfield\x1fseparator inside"
+    )
+
+    git_repo = GitRepository(tmp_path, prefer_gitpython=False)
+    (commit,) = git_repo.iter_commits(CommitRange())
+
+    assert commit.subject == "fix: odd body"
+    assert commit.body == "field\x1fseparator inside"
+
+
+def test_list_tags_peels_annotated_tags_for_both_backends(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    first = create_commit(repo, Path(tmp_path), "a.txt", "a", "chore: initial commit")
+    repo.create_tag("v0.1.0", ref=first)
+    second = create_commit(repo, Path(tmp_path), "b.txt", "b", "feat: second")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test User")
+        config.set_value("user", "email", "test@example.com")
+    repo.create_tag("v0.2.0", ref=second, message="Release 0.2.0\n\nWith notes.")
+
+    for prefer_gitpython in (True, False):
+        with GitRepository(tmp_path, prefer_gitpython=prefer_gitpython) as git_repo:
+            tags = {tag.name: tag for tag in git_repo.list_tags()}
+
+        assert tags["v0.1.0"].sha == first.hexsha
+        assert tags["v0.1.0"].is_annotated is False
+        assert tags["v0.2.0"].sha == second.hexsha
+        assert tags["v0.2.0"].is_annotated is True
+        assert tags["v0.2.0"].message == "Release 0.2.0\n\nWith notes."
+
+
+def test_cat_file_batch_pipelines_requests(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    commits = [
+        create_commit(repo, Path(tmp_path), "a.txt", str(index), f"chore: commit {index}")
+        for index in range(5)
+    ]
+    monkeypatch.setattr("helixcommit.git_client.PIPELINE_WINDOW", 2)
+
+    with GitRepository(tmp_path) as git_repo:
+        names = [commit.hexsha for commit in commits] + ["does-not-exist"]
+        objects = git_repo.objects.read(names)
+        headers = git_repo.objects.info(names)
+
+    assert [obj.sha for obj in objects[:-1]] == [commit.hexsha for commit in commits]
+    assert all(obj.type == "commit" for obj in objects[:-1])
+    assert objects[2].data.rstrip().endswith(b"chore: commit 2")
+    assert objects[-1] is None
+    assert [obj.size for obj in headers[:-1]] == [obj.size for obj in objects[:-1]]
+    assert all(obj.data == b"" for obj in headers[:-1])
+
+
+def test_get_commit_diff_reuses_one_coprocess(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    first = create_commit(repo, Path(tmp_path), "a.txt", "one\n", "chore: one")
+    second = create_commit(repo, Path(tmp_path), "a.txt", "two\n", "chore: two")
+    git_repo = GitRepository(tmp_path)
+    started = []
+    real_popen = subprocess.Popen
+
+    def tracking_popen(args, *rest, **kwargs):
+        started.append(args[1])
+        return real_popen(args, *rest, **kwargs)
+
+    monkeypatch.setattr(subprocess, "Popen", tracking_popen)
+    try:
+        for _ in range(3):
+            assert "+two" in git_repo.get_commit_diff(second.hexsha)
+            assert "+one" in git_repo.get_commit_diff(first.hexsha)
+        assert git_repo.get_commit_diff("0" * 40) == ""
+    finally:
+        git_repo.close()
+
+    assert started.count("diff-tree") == 1
+    assert started.count("cat-file") == 1
+    assert "show" not in started
+
+
+def test_commit_graph_detection_and_path_routing(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    create_commit(repo, Path(tmp_path), "docs/guide.md", "Guide", "docs: add guide")
+    create_commit(repo, Path(tmp_path), "src/app.py", "print('hi')\n", "feat: add app")
+
+    git_repo = GitRepository(tmp_path)
+    assert not git_repo.commit_graph().exists
+    assert not git_repo._prefers_git_walk(CommitRange(paths=["src"]))
+
+    graph = git_repo.write_commit_graph()
+    assert graph.exists
+    assert graph.changed_paths
+    assert graph.commits == 2
+
+    def fail(*args, **kwargs):
+        raise AssertionError("path-limited walk should go through git log")
+
+    monkeypatch.setattr(git_repo, "_iter_commits_gitpython", fail)
+    commits = list(git_repo.iter_commits(CommitRange(paths=["src"])))
+    assert [commit.subject for commit in commits] == ["feat: add app"]
+    assert git_repo.commit_graph().changed_paths
+
+
+def test_tag_index_is_cached_until_tag_refs_change(tmp_path, monkeypatch):
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test User")
+        config.set_value("user", "email", "test@example.com")
+    first = create_commit(repo, Path(tmp_path), "a.txt", "a", "chore: initial commit")
+    repo.create_tag("v0.1.0", ref=first, message="First")
+    repo.git.tag("-a", "-m", "Tag of a tag", "v0.1.0-alias", "v0.1.0")
+    repo.create_tag("nightly", ref=first)
+
+    git_repo = GitRepository(tmp_path, prefer_gitpython=False)
+    builds = []
+    original = git_repo._list_tags_batch
+
+    def counting(glob=None):
+        builds.append(glob)
+        return original(glob)
+
+    monkeypatch.setattr(git_repo, "_list_tags_batch", counting)
+
+    assert git_repo.get_tag("v0.1.0-alias").sha == first.hexsha
+    assert git_repo.get_tag("missing") is None
+    assert [tag.name for tag in git_repo.tag_index("v*")] == ["v0.1.0-alias", "v0.1.0"]
+    assert builds == [None, "v*"]
+
+    second = create_commit(repo, Path(tmp_path), "b.txt", "b", "feat: second")
+    repo.create_tag("v0.2.0", ref=second)
+    assert git_repo.tag_index().latest().name == "v0.2.0"
+    assert builds == [None, "v*", None]
+
+    repo.git.pack_refs("--all")
+    assert git_repo.get_tag("v0.2.0").sha == second.hexsha
+    assert len(builds) == 4
+    assert "nightly" in git_repo.tag_index()
+    assert len(builds) == 4
+
+
+def test_patch_ids_match_across_cherry_picks(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    base = create_commit(repo, Path(tmp_path), "app.py", "a\nb\nc\n", "chore: initial")
+    main_branch = repo.active_branch.name
+    fix = create_commit(repo, Path(tmp_path), "app.py", "a\nB\nc\n", "fix: uppercase b")
+    other = create_commit(repo, Path(tmp_path), "app.py", "a\nB\nC\n", "fix: uppercase c")
+    repo.git.checkout("-b", "release", base.hexsha)
+    create_commit(repo, Path(tmp_path), "notes.txt", "release\n", "chore: release notes")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test User")
+        config.set_value("user", "email", "test@example.com")
+    repo.git.cherry_pick("-x", fix.hexsha)
+    picked = repo.head.commit.hexsha
+    repo.git.checkout(main_branch)
+
+    git_repo = GitRepository(tmp_path)
+    ids = git_repo.patch_ids([fix.hexsha, picked, other.hexsha])
+
+    assert picked != fix.hexsha
+    assert ids[picked] == ids[fix.hexsha]
+    assert ids[other.hexsha] != ids[fix.hexsha]
+    assert git_repo.patch_ids([]) == {}
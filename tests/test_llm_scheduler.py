@@ -0,0 +1,244 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from helixcommit import llm_scheduler
+from helixcommit.llm_scheduler import (
+    RequestScheduler,
+    SingleFlight,
+    TokenBucket,
+    estimate_tokens,
+    get_scheduler,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ApiError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def make_scheduler(clock, **kwargs):
+    kwargs.setdefault("backoff_base", 1.0)
+    kwargs.setdefault("backoff_cap", 30.0)
+    return RequestScheduler(clock=clock, sleep_func=clock.sleep, **kwargs)
+
+
+def failing(*errors, result="ok"):
+    remaining = list(errors)
+
+    def call():
+        if remaining:
+            raise remaining.pop(0)
+        return result
+
+    return call
+
+
+def test_token_bucket_spaces_reservations():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    assert [bucket.reserve(1) for _ in range(60)] == [0.0] * 60
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    clock.now += 10
+    assert bucket.reserve(1) == pytest.approx(0.0)
+    # Oversized requests are clamped to the capacity instead of waiting forever.
+    assert bucket.reserve(10_000) == pytest.approx(53.0)
+
+
+def test_scheduler_paces_requests_per_minute():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, requests_per_minute=30)
+    for _ in range(32):
+        scheduler.call(lambda: None)
+    assert clock.sleeps == pytest.approx([2.0, 2.0])
+
+
+def test_scheduler_paces_tokens_per_minute():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, tokens_per_minute=6000)
+    scheduler.call(lambda: None, tokens=6000)
+    scheduler.call(lambda: None, tokens=1000)
+    assert clock.sleeps == pytest.approx([10.0])
+
+
+def test_scheduler_honors_retry_after_and_halves_concurrency():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_concurrency=8)
+    retries = []
+    call = failing(ApiError(429, {"retry-after": "3"}), ApiError(429, {"retry-after-ms": "1500"}))
+
+    result = scheduler.call(call, on_retry=lambda *args: retries.append(args[:2]))
+
+    assert result == "ok"
+    assert clock.sleeps == pytest.approx([3.0, 1.5])
+    assert retries == [(1, 3.0), (2, 1.5)]
+    assert scheduler.concurrency == 2
+
+
+def test_scheduler_recovers_concurrency_additively():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_concurrency=4)
+    scheduler.call(failing(ApiError(429, {"retry-after": "0"})))
+    assert scheduler.concurrency == 2
+    scheduler.call(lambda: None)
+    assert scheduler.concurrency == 2
+    for _ in range(10):
+        scheduler.call(lambda: None)
+    assert scheduler.concurrency == 4
+
+
+def test_scheduler_backs_off_on_server_errors_without_shrinking():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_concurrency=4)
+    assert scheduler.call(failing(ApiError(503), ApiError(502))) == "ok"
+    assert len(clock.sleeps) == 2
+    assert 1.0 <= clock.sleeps[0] <= 2.0
+    assert 2.0 <= clock.sleeps[1] <= 4.0
+    assert scheduler.concurrency == 4
+
+
+def test_scheduler_raises_other_errors_and_exhausted_retries():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_retries=1)
+    with pytest.raises(ApiError, match="400"):
+        scheduler.call(failing(ApiError(400)))
+    assert clock.sleeps == []
+
+    with pytest.raises(ApiError, match="429"):
+        scheduler.call(failing(ApiError(429), ApiError(429)))
+    assert len(clock.sleeps) == 1
+
+    # A quota that resets far beyond the backoff cap is not waited out.
+    with pytest.raises(ApiError, match="429"):
+        scheduler.call(failing(ApiError(429, {"retry-after": "3600"})))
+
+
+def test_scheduler_limits_requests_in_flight():
+    scheduler = RequestScheduler(max_concurrency=3)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def call():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+
+    threads = [threading.Thread(target=scheduler.call, args=(call,)) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 3
+
+
+def test_estimate_tokens_counts_messages_and_completion_budget():
+    messages = [{"role": "system", "content": "x" * 400}, {"role": "user", "content": "y" * 40}]
+    assert estimate_tokens(messages, max_tokens=300) == 410
+
+
+def test_get_scheduler_is_shared_per_provider_and_model(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "_SCHEDULERS", {})
+    monkeypatch.delenv(llm_scheduler.RPM_ENV, raising=False)
+    monkeypatch.delenv(llm_scheduler.TPM_ENV, raising=False)
+
+    openai = get_scheduler(None, "gpt-4o-mini")
+    assert get_scheduler("https://api.openai.com/v1", "gpt-4o-mini") is openai
+    assert openai.requests_per_minute is None
+
+    free = get_scheduler("https://openrouter.ai/api/v1", "meta-llama/llama-3.3-70b-instruct:free")
+    assert free is not openai
+    assert free.requests_per_minute == 20
+
+    configured = get_scheduler(
+        "https://openrouter.ai/api/v1",
+        "meta-llama/llama-3.3-70b-instruct:free",
+        tokens_per_minute=10_000,
+    )
+    assert configured is free
+    assert (free.requests_per_minute, free.tokens_per_minute) == (20, 10_000)
+
+    monkeypatch.setenv(llm_scheduler.RPM_ENV, "500")
+    assert get_scheduler(None, "gpt-4o").requests_per_minute == 500
+
+
+def test_single_flight_shares_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "shared"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(3)
+    ]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert results == ["shared"] * 4
+    assert len(calls) == 1
+    # Finished calls are not remembered.
+    assert flight.do("k", lambda: "again") == "again"
+
+
+def test_single_flight_shares_errors_with_waiters():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    errors = []
+
+    def failing_call():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    def run():
+        try:
+            flight.do("k", failing_call)
+        except ValueError as exc:
+            errors.append(str(exc))
+
+    threads = [threading.Thread(target=run)]
+    threads[0].start()
+    started.wait(5)
+    threads.append(threading.Thread(target=run))
+    threads[1].start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert errors == ["boom", "boom"]
@@ -0,0 +1,169 @@
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import git
+import pytest
+
+from helixcommit.git_client import CommitRange, GitRepository
+from helixcommit.packfile import ObjectStore, PackRepository, find_git_dir
+
+
+def run_git(path: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", *args], cwd=path, check=True, stdout=subprocess.PIPE, text=True
+    ).stdout
+
+
+def create_commit(
+    repo: git.Repo, base_path: Path, relative: str, content: str, message: str, when: int
+) -> git.Commit:
+    file_path = base_path / relative
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content, encoding="utf-8")
+    repo.index.add([relative])
+    actor = git.Actor("Test User", "test@example.com")
+    date = f"{when} +0000"
+    return repo.index.commit(
+        message, author=actor, committer=actor, author_date=date, commit_date=date
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test User")
+        config.set_value("user", "email", "test@example.com")
+    base = 1_700_000_000
+    create_commit(repo, tmp_path, "README.md", "one\n", "chore: initial commit", base)
+    repo.create_tag("v0.1.0", message="First release")
+    main = repo.active_branch
+    feature = repo.create_head("feature")
+    feature.checkout()
+    create_commit(repo, tmp_path, "feature.py", "x = 1\n", "feat: add feature\n\nBody.", base + 10)
+    main.checkout()
+    create_commit(repo, tmp_path, "README.md", "two\n", "docs: update readme", base + 20)
+    run_git(tmp_path, "merge", "--no-ff", "-m", "Merge branch 'feature'", "feature")
+    for index in range(5):
+        create_commit(
+            repo, tmp_path, "app.py", f"v = {index}\n", f"fix: bump {index}", base + 100 + index
+        )
+    return tmp_path
+
+
+def commit_fields(commits):
+    return [
+        (
+            commit.sha,
+            commit.subject,
+            commit.body,
+            commit.author_email,
+            commit.authored_date,
+            commit.committed_date,
+            commit.is_merge,
+        )
+        for commit in commits
+    ]
+
+
+RANGES = [
+    CommitRange(),
+    CommitRange(since="v0.1.0"),
+    CommitRange(since="v0.1.0", until="HEAD~2"),
+    CommitRange(until="feature"),
+    CommitRange(include_merges=False, max_count=4),
+    CommitRange(since_date=datetime.fromtimestamp(1_700_000_015, tz=timezone.utc)),
+    CommitRange(until_date=datetime.fromtimestamp(1_700_000_101, tz=timezone.utc)),
+]
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize("commit_range", RANGES)
+def test_pack_backend_matches_cli_backend(history, packed, commit_range):
+    if packed:
+        run_git(history, "gc", "--quiet")
+    cli = GitRepository(history, prefer_gitpython=False)
+    with GitRepository(history, backend="pack") as pack:
+        assert pack.backend == "pack"
+        expected = commit_fields(cli.iter_commits(commit_range))
+        assert expected
+        assert commit_fields(pack.iter_commits(commit_range)) == expected
+
+
+@pytest.mark.parametrize("commit_range", [CommitRange(), CommitRange(max_count=2)])
+def test_pack_backend_walks_shallow_clones(history, tmp_path_factory, commit_range):
+    clone = tmp_path_factory.mktemp("shallow") / "clone"
+    run_git(history, "clone", "-q", "--depth", "3", history.as_uri(), str(clone))
+    cli = GitRepository(clone, prefer_gitpython=False)
+    with GitRepository(clone, backend="pack") as pack:
+        expected = commit_fields(cli.iter_commits(commit_range))
+        assert len(expected) == min(3, commit_range.max_count or 3)
+        assert commit_fields(pack.iter_commits(commit_range)) == expected
+
+
+def test_pack_backend_falls_back_to_git_on_missing_objects(history, monkeypatch):
+    cli = GitRepository(history, prefer_gitpython=False)
+    expected = commit_fields(cli.iter_commits(CommitRange()))
+    read = PackRepository.commit
+
+    def flaky(self, sha):
+        if sha == expected[2][0]:
+            raise KeyError(f"Commit {sha} not found")
+        return read(self, sha)
+
+    monkeypatch.setattr(PackRepository, "commit", flaky)
+    with GitRepository(history, backend="pack") as pack:
+        assert commit_fields(pack.iter_commits(CommitRange())) == expected
+
+
+def test_pack_backend_attaches_files_and_paths_fall_back(history):
+    run_git(history, "gc", "--quiet")
+    with GitRepository(history, backend="pack") as pack:
+        commits = list(pack.iter_commits(CommitRange(max_count=1), include_files=True))
+        assert commits[0].files == ["app.py"]
+        filtered = list(pack.iter_commits(CommitRange(paths=["feature.py"])))
+    assert [commit.subject for commit in filtered] == ["feat: add feature"]
+
+
+def test_object_store_reads_deltified_objects_like_git(history):
+    for index in range(20):
+        (history / "app.py").write_text("line\n" * 200 + f"tail {index}\n", encoding="utf-8")
+        run_git(history, "commit", "-qam", f"chore: grow {index}")
+    run_git(history, "repack", "-adfq", "--depth=50", "--window=250")
+    shas = run_git(history, "rev-list", "--objects", "--all").split()
+    shas = [sha for sha in shas if len(sha) == 40]
+
+    store = ObjectStore(find_git_dir(history) / "objects")
+    try:
+        for sha in shas:
+            object_type, data = store.read(sha)
+            assert object_type == run_git(history, "cat-file", "-t", sha).strip()
+            expected = subprocess.run(
+                ["git", "cat-file", object_type, sha],
+                cwd=history,
+                check=True,
+                stdout=subprocess.PIPE,
+            ).stdout
+            assert data == expected
+    finally:
+        store.close()
+
+
+def test_pack_repository_resolves_refs_and_leaves_expressions_to_git(history):
+    run_git(history, "pack-refs", "--all")
+    pack = PackRepository(find_git_dir(history))
+    try:
+        assert pack.resolve("v0.1.0") == run_git(history, "rev-parse", "v0.1.0^{commit}").strip()
+        assert pack.resolve("feature") == run_git(history, "rev-parse", "feature").strip()
+        assert pack.resolve("HEAD") == run_git(history, "rev-parse", "HEAD").strip()
+        assert pack.resolve("HEAD~2") is None
+    finally:
+        pack.close()
+
+
+def test_pack_backend_requires_a_repository(tmp_path):
+    with pytest.raises(RuntimeError):
+        GitRepository(tmp_path, backend="pack")
+    with pytest.raises(ValueError):
+        GitRepository(tmp_path, backend="svn")
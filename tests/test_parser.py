@@ -1,4 +1,17 @@
-from helixcommit.parser import classify_change_type, parse_commit_message
+import random
+
+import pytest
+
+from helixcommit.parser import (
+    DEFAULT_CLASSIFIER,
+    FALLBACK_PATTERNS,
+    FOOTER_PATTERN,
+    ChangeTypeClassifier,
+    _split_body_and_footers,
+    classify_change_type,
+    parse_commit_message,
+    parse_many,
+)
 
 
 def test_parse_conventional_commit_with_breaking_footer():
@@ -173,3 +186,140 @@ def test_parse_breaking_with_empty_scope():
     assert parsed.scope is None
     assert parsed.breaking is True
     assert parsed.subject == "breaking change"
+
+
+def test_parse_many_shares_results_for_identical_messages():
+    messages = ["chore(deps): bump x", "feat: add y", "chore(deps): bump x"]
+    parsed = parse_many(messages)
+    assert [item.type for item in parsed] == ["chore", "feat", "chore"]
+    assert parsed[0] is parsed[2]
+    assert parsed[1] == parse_commit_message("feat: add y")
+
+
+def test_classify_change_type_reuses_parsed_message():
+    parsed = parse_commit_message("Improve performance of data loader")
+    assert classify_change_type("Improve performance of data loader", parsed=parsed) == "perf"
+    assert classify_change_type("ignored", parsed=parse_commit_message("fix: x")) == "fix"
+
+
+def _reference_split_body_and_footers(lines):
+    """The original quadratic footer detection, kept as a test oracle."""
+
+    def is_footer_line(line):
+        return (
+            not line.strip()
+            or bool(FOOTER_PATTERN.match(line.strip()))
+            or line.startswith((" ", "\t"))
+        )
+
+    if not lines:
+        return [], []
+    for idx, line in enumerate(lines):
+        if FOOTER_PATTERN.match(line.strip()):
+            if idx > 0 and lines[idx - 1].strip():
+                continue
+            candidate = lines[idx:]
+            if all(is_footer_line(item) for item in candidate):
+                body, footers = lines[:idx], candidate
+                break
+    else:
+        body, footers = lines, []
+    while body and not body[-1].strip():
+        body = body[:-1]
+    return body, footers
+
+
+FOOTER_CORPUS_LINES = [
+    "",
+    "   ",
+    "Plain body text.",
+    "Signed-off-by: Dev <dev@example.com>",
+    "Co-authored-by: Bot <bot@example.com>",
+    "Fixes #123",
+    "BREAKING CHANGE: drops py38",
+    "Refs:",
+    "  continued value",
+    "\tindented detail",
+    "Note: see the design doc",
+    "Reviewed by #team",
+    "- bullet point",
+    "1. numbered",
+]
+
+
+def test_footer_split_matches_reference_on_generated_corpus():
+    rng = random.Random(1234)
+    for _ in range(3000):
+        lines = [rng.choice(FOOTER_CORPUS_LINES) for _ in range(rng.randint(0, 12))]
+        assert _split_body_and_footers(lines) == _reference_split_body_and_footers(lines), lines
+
+
+def test_footer_split_handles_many_trailers():
+    trailers = [f"Co-authored-by: Dev {index} <dev{index}@example.com>" for index in range(2000)]
+    message = "feat: squash merge\n\nBody line.\n\n" + "\n".join(trailers)
+    parsed = parse_commit_message(message)
+    assert parsed.body == "Body line."
+    assert len(parsed.footers["Co-authored-by"]) == 2000
+
+
+def _reference_classify(message):
+    """The original pattern-by-pattern classifier, kept as a test oracle."""
+    parsed = parse_commit_message(message)
+    if parsed.type:
+        return parsed.type
+    lowered = message.lower()
+    for pattern, change_type in FALLBACK_PATTERNS:
+        if pattern.search(lowered):
+            return change_type
+    return "chore"
+
+
+CLASSIFIER_CORPUS_WORDS = [
+    "update", "loader", "Fix", "fixes", "tests", "testing", "docker", "Docs", "optimise",
+    "performance", "build", "rebuild", "feature", "bug", "refactor", "bugfix:", "feat(api):",
+    "perf!:", "test_utils", "re-test", "CHANGELOG", "(docs)", "prefix", "featured",
+]
+
+
+def test_classifier_matches_reference_on_generated_corpus():
+    rng = random.Random(4321)
+    classifier = ChangeTypeClassifier(cache_size=0)
+    for _ in range(3000):
+        words = [rng.choice(CLASSIFIER_CORPUS_WORDS) for _ in range(rng.randint(1, 8))]
+        message = " ".join(words)
+        if rng.random() < 0.3:
+            message += "\n\n" + " ".join(rng.choice(CLASSIFIER_CORPUS_WORDS) for _ in range(5))
+        assert classifier.classify(message) == _reference_classify(message), message
+
+
+def test_classifier_cache_is_bounded_and_skips_conventional_headers():
+    classifier = ChangeTypeClassifier(cache_size=2)
+    body = "\n\n" + "details " * 10_000
+    assert classifier.classify("feat(api): add endpoint" + body) == "feat"
+    assert classifier._cache == {}
+    for index in range(5):
+        assert classifier.classify(f"Fix bug {index}" + body) == "fix"
+        assert len(classifier._cache) <= 2
+    assert all(len(key) == 16 for key in classifier._cache)
+    # The body still takes part in fallback matching.
+    assert classifier.classify("Tidy things\n\nAdd tests") == "test"
+
+
+def test_classifier_honors_pattern_precedence_and_custom_taxonomy():
+    # "test" is listed before "fix" even though "Fix" comes first in the text.
+    assert DEFAULT_CLASSIFIER.classify("Fix flaky tests in pipeline") == "test"
+    assert DEFAULT_CLASSIFIER.classify("Tidy things", default="other") == "other"
+
+    classifier = ChangeTypeClassifier.extended(
+        types=["security"],
+        aliases={"sec": "security"},
+        patterns={"security": r"\bcve-\d+"},
+    )
+    assert classifier.classify("sec: rotate keys") == "security"
+    assert classifier.classify("Patch CVE-2024-1234 in tests") == "security"
+    assert classifier.keywords("security") is None
+    assert classifier.keywords("fix") == DEFAULT_CLASSIFIER.keywords("fix")
+    assert classifier.fingerprint != DEFAULT_CLASSIFIER.fingerprint
+
+    with pytest.raises(ValueError, match="Invalid change type pattern"):
+        ChangeTypeClassifier.extended(types=["x"], patterns={"x": "("})
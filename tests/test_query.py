@@ -0,0 +1,153 @@
+import subprocess
+
+import git
+import pytest
+
+from helixcommit.changelog import filter_commits
+from helixcommit.commit_index import CommitIndex
+from helixcommit.git_client import CommitRange, GitRepository
+from helixcommit.parser import ChangeTypeClassifier
+from helixcommit.query import _literal_alternatives, _type_keywords, plan_commit_query
+
+
+def create_commit(repo, base_path, relative, content, message, author="Alice <alice@x.io>"):
+    file_path = base_path / relative
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(content, encoding="utf-8")
+    repo.index.add([relative])
+    name, _, email = author.partition(" <")
+    actor = git.Actor(name, email.rstrip(">"))
+    return repo.index.commit(message, author=actor, committer=actor)
+
+
+@pytest.fixture
+def history(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Alice")
+        config.set_value("user", "email", "alice@x.io")
+    create_commit(repo, tmp_path, "src/app.py", "1", "feat(core): add app")
+    create_commit(repo, tmp_path, "docs/guide.md", "1", "docs: write guide", "Bob <bob@y.io>")
+    main = repo.active_branch
+    repo.create_head("side").checkout()
+    create_commit(repo, tmp_path, "src/app.py", "2", "Fix crash on start", "Bob <bob@y.io>")
+    create_commit(repo, tmp_path, "docs/guide.md", "2", "hotfix: typo in docs")
+    main.checkout()
+    create_commit(repo, tmp_path, "src/util.py", "1", "refactor: split util")
+    subprocess.run(
+        ["git", "merge", "--no-ff", "-q", "-m", "Merge branch 'side'", "side"],
+        cwd=tmp_path,
+        check=True,
+    )
+    create_commit(repo, tmp_path, "README.md", "1", "Improve performance of startup")
+    subprocess.run(
+        ["git", "commit", "--allow-empty", "-q", "-m", "fix: retrigger release build"],
+        cwd=tmp_path,
+        check=True,
+    )
+    return tmp_path
+
+
+FILTERS = [
+    {"author_filter": "bob"},
+    {"author_filter": "ALICE|bob@y.io"},
+    {"author_filter": "^Bob"},
+    {"include_types": ["fix"]},
+    {"include_types": ["feat", "perf"]},
+    {"include_types": ["chore"]},
+    {"exclude_paths": ["docs"]},
+    {"exclude_paths": ["docs/*.md"], "author_filter": "alice"},
+    {"include_types": ["fix", "docs"], "exclude_paths": ["src"]},
+    # Commits without changed files are kept by the Python filter.
+    {"include_types": ["fix"], "exclude_paths": ["README.md"]},
+]
+
+
+def repositories(path):
+    yield GitRepository(path)
+    yield GitRepository(path, prefer_gitpython=False)
+    yield GitRepository(path, backend="pack")
+    yield GitRepository(path, commit_index=CommitIndex(path / "commits.sqlite3"))
+
+
+@pytest.mark.parametrize("include_merges", [True, False])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_planned_query_matches_python_filtering(history, filters, include_merges):
+    commit_range = CommitRange(include_merges=include_merges)
+    reference = GitRepository(history, prefer_gitpython=False)
+    expected = [
+        commit.sha
+        for commit in filter_commits(
+            list(reference.iter_commits(commit_range, include_files=True)), **filters
+        )
+    ]
+
+    plan = plan_commit_query(commit_range, **filters)
+    for git_repo in repositories(history):
+        commits = list(git_repo.iter_commits(plan.commit_range, include_files=True))
+        assert [commit.sha for commit in plan.filter(commits)] == expected, git_repo.backend
+
+
+def test_plan_pushes_filters_into_git_arguments(history):
+    plan = plan_commit_query(
+        CommitRange(include_merges=False),
+        include_types=["fix"],
+        author_filter="bob",
+        exclude_paths=["./docs/"],
+    )
+    args = GitRepository(history, prefer_gitpython=False)._range_args(plan.commit_range)
+
+    assert "--no-merges" in args
+    assert "--author=bob" in args
+    assert ["--grep=bug", "--grep=fix", "--grep=security"] == [
+        arg for arg in args if arg.startswith("--grep")
+    ]
+    assert "--" not in args
+    # The literal author check is exact in git, the type and path checks are not.
+    assert plan.author_filter is None
+    assert plan.include_types == ["fix"]
+    assert plan.exclude_paths == ["./docs/"]
+
+
+def test_plan_keeps_filters_in_python_with_a_commit_limit():
+    commit_range = CommitRange(max_count=10, include_merges=False)
+    plan = plan_commit_query(commit_range, author_filter="bob", include_types=["fix"])
+    assert plan.commit_range == commit_range
+    assert plan.author_filter == "bob"
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("bob", ["bob"]),
+        ("alice|bob@y\\.io", ["alice", "bob@y.io"]),
+        ("^bob", None),
+        ("bob|", None),
+        ("\\w+", None),
+        ("jörg", None),
+    ],
+)
+def test_literal_alternatives(pattern, expected):
+    assert _literal_alternatives(pattern) == expected
+
+
+def test_type_keywords_cover_aliases_and_fallbacks():
+    assert _type_keywords(["perf"]) == ["optimi", "perf"]
+    assert _type_keywords(["docs"]) == ["doc"]
+    assert _type_keywords(["feat", "chore"]) is None
+    assert _type_keywords(["unknown"]) is None
+
+
+def test_type_keywords_follow_custom_taxonomy():
+    classifier = ChangeTypeClassifier.extended(
+        types=["i18n"],
+        aliases={"l10n": "i18n"},
+        patterns={"i18n": r"\btranslat\w*"},
+        keywords={"i18n": ["translat"]},
+    )
+    assert _type_keywords(["i18n"], classifier) == ["i18n", "l10n", "translat"]
+    plan = plan_commit_query(CommitRange(), include_types=["i18n"], classifier=classifier)
+    assert plan.commit_range.grep == ("i18n", "l10n", "translat")
+
+    undeclared = ChangeTypeClassifier.extended(types=["i18n"], patterns={"i18n": r"\bl10n"})
+    assert _type_keywords(["i18n"], undeclared) is None
@@ -0,0 +1,120 @@
+from helixcommit import retrieval
+from helixcommit.retrieval import RetrievalIndex, similarity, tokenize
+from helixcommit.summarizer import SummaryRequest
+
+
+def make_index(**kwargs):
+    requests = [
+        SummaryRequest(
+            identifier="cache",
+            title="Speed up summary cache lookups",
+            body=(
+                "The summary cache rewrote a JSON file on every write.\n\n"
+                "Lookups now go through sqlite with an index on the key.\n\n"
+                "Unrelated: bump the copyright year."
+            ),
+            diff="diff --git a/cache.py b/cache.py\n+++ b/cache.py\n+    sqlite3.connect(path)\n",
+        ),
+        SummaryRequest(identifier="docs", title="Document summary options", body="Explain the summary flags."),
+        SummaryRequest(identifier="bare", title="Fix typo"),
+    ]
+    return RetrievalIndex(requests, **kwargs)
+
+
+def test_tokenize_drops_stopwords_numbers_and_short_words():
+    assert tokenize("Fix the API for v2 in 2024: add rate-limit_handling") == [
+        "fix",
+        "api",
+        "add",
+        "rate-limit_handling",
+    ]
+
+
+def test_keywords_prefer_terms_rare_across_the_run():
+    index = make_index()
+    # "lookups" and "summary" occur equally often in the entry, but "summary"
+    # also appears in another entry, so it ranks lower.
+    assert index.keywords("cache") == ["cache", "lookups", "summary", "speed"]
+    assert index.keywords("bare") == ["fix", "typo"]
+    assert index.keywords("missing") == []
+
+
+def test_search_ranks_paragraphs_with_bm25():
+    index = make_index()
+    assert index.search("cache", ["sqlite", "index"]) == [
+        "Lookups now go through sqlite with an index on the key."
+    ]
+    # Without a match the first paragraph still serves as evidence.
+    assert index.search("docs", ["nothing"]) == ["Explain the summary flags."]
+    assert index.search("bare", ["typo"]) == []
+    assert "copyright" not in index.evidence("cache")
+
+
+class FakeCollection:
+    name = "run"
+
+    def __init__(self):
+        self.added = {}
+        self.queries = []
+
+    def add(self, documents, metadatas, ids):
+        self.added = {"documents": documents, "metadatas": metadatas, "ids": ids}
+
+    def query(self, query_texts, n_results, where):
+        self.queries.append((query_texts, where))
+        docs = [
+            doc
+            for doc, meta in zip(self.added["documents"], self.added["metadatas"])
+            if meta == where and query_texts[0] in doc
+        ]
+        return {"documents": [docs[:n_results]]}
+
+
+class FakeChroma:
+    def __init__(self):
+        self.collection = FakeCollection()
+        self.created = 0
+        self.deleted = []
+
+    def Client(self):
+        return self
+
+    def create_collection(self, name):
+        self.created += 1
+        return self.collection
+
+    def delete_collection(self, name):
+        self.deleted.append(name)
+
+
+def test_chroma_backend_builds_one_collection_per_run(monkeypatch):
+    fake = FakeChroma()
+    monkeypatch.setattr(retrieval, "chromadb", fake)
+    index = make_index(backend="chroma")
+
+    assert index.search("cache", ["sqlite"]) == [
+        "Lookups now go through sqlite with an index on the key."
+    ]
+    assert index.search("docs", ["flags"]) == ["Explain the summary flags."]
+    assert fake.created == 1
+    assert len(fake.collection.added["documents"]) == 4
+    assert fake.collection.queries[-1][1] == {"entry": "docs"}
+
+    index.close()
+    assert fake.deleted == ["run"]
+
+
+def test_chroma_backend_falls_back_without_chromadb(monkeypatch):
+    monkeypatch.setattr(retrieval, "chromadb", None)
+    index = make_index(backend="chroma")
+    assert index.search("cache", ["sqlite"]) == [
+        "Lookups now go through sqlite with an index on the key."
+    ]
+    index.close()
+
+
+def test_similarity_is_token_overlap():
+    assert similarity("Adds CSV export", "adds csv export.") == 1.0
+    assert similarity("Adds CSV export", "Adds PDF export") == 0.5
+    assert similarity("Fix typo", "Improve caching") == 0.0
+    assert similarity("", "") == 1.0
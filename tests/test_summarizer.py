@@ -1,13 +1,18 @@
 import json
+import re
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+from helixcommit.llm_scheduler import RequestScheduler
 from helixcommit.summarizer import (
     OpenAISummarizer,
     PromptEngineeredSummarizer,
     SummaryCache,
     SummaryRequest,
+    _validate_fused,
 )
 
 
@@ -22,6 +27,7 @@ def test_summary_cache(tmp_path):
     
     cache.set("key1", "value1")
     assert cache.get("key1") == "value1"
+    cache.flush()
     
     # Verify persistence
     cache2 = SummaryCache(cache_file)
@@ -67,3 +73,513 @@ def test_prompt_engineered_summarizer(mock_openai):
     
     assert len(results) == 1
     assert results[0].summary == "Polished summary"
+
+
+def completion(content):
+    result = MagicMock()
+    result.choices[0].message.content = content
+    return result
+
+
+class ConcurrentChat:
+    """Fake chat endpoint that echoes the entry id and tracks concurrency."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def __call__(self, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            user = kwargs["messages"][-1]["content"]
+            match = re.search(r'"id": "([^"]+)"', user)
+            if match:
+                return completion(f"Summary {match.group(1)}")
+            return completion(user.rsplit("Sentence: ", 1)[-1])
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_prompt_engineered_summarizer_runs_entries_concurrently(mock_openai, tmp_path):
+    chat = ConcurrentChat()
+    mock_openai.return_value.chat.completions.create.side_effect = chat
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test",
+        expert_roles=["PM", "Tech Lead", "QA"],
+        cache_path=tmp_path / "cache.json",
+        max_workers=4,
+    )
+    requests = [SummaryRequest(identifier=f"e{index}", title=f"Title {index}") for index in range(8)]
+
+    results = list(summarizer.summarize(requests))
+
+    assert [result.identifier for result in results] == [req.identifier for req in requests]
+    assert [result.summary for result in results] == [f"Summary e{index}" for index in range(8)]
+    # Four entries, each with three expert calls in flight.
+    assert chat.peak > 4
+    cache = SummaryCache(tmp_path / "cache.json")
+    assert sorted(cache.get(summarizer._cache_key(req)) for req in requests) == sorted(
+        result.summary for result in results
+    )
+
+
+def test_prompt_engineered_summarizer_single_worker_is_sequential(mock_openai):
+    chat = ConcurrentChat(delay=0)
+    mock_openai.return_value.chat.completions.create.side_effect = chat
+    summarizer = PromptEngineeredSummarizer(api_key="test", max_workers=1)
+
+    results = list(summarizer.summarize([SummaryRequest(identifier="a", title="A")]))
+
+    assert results[0].summary == "Summary a"
+    assert chat.peak == 1
+
+
+def test_summary_cache_concurrent_writes(tmp_path):
+    cache_file = tmp_path / "cache.json"
+    cache = SummaryCache(cache_file)
+
+    def write(index):
+        cache.set(f"key{index}", f"value{index}")
+
+    threads = [threading.Thread(target=write, args=(index,)) for index in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache.flush()
+
+    reloaded = SummaryCache(cache_file)
+    assert all(reloaded.get(f"key{index}") == f"value{index}" for index in range(20))
+
+
+def test_summary_cache_ignores_legacy_json_entries(tmp_path):
+    legacy = tmp_path / "summaries.json"
+    legacy.write_text(json.dumps({"old": "Old summary"}), encoding="utf-8")
+
+    # A JSON path opens the database next to it; old-format keys are not imported.
+    cache = SummaryCache(legacy)
+    cache.set("new", "New summary")
+    cache.close()
+
+    assert cache.path == tmp_path / "summaries.sqlite3"
+    reloaded = SummaryCache(tmp_path / "summaries.sqlite3")
+    assert reloaded.get("new") == "New summary"
+    assert reloaded.get("old") is None
+    assert len(reloaded) == 1
+
+
+def test_summary_cache_commits_in_batches(tmp_path):
+    cache = SummaryCache(tmp_path / "cache.sqlite3", commit_interval=3)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert len(SummaryCache(tmp_path / "cache.sqlite3")) == 0
+    cache.set("c", "3")
+    assert len(SummaryCache(tmp_path / "cache.sqlite3")) == 3
+
+
+def test_summary_cache_evicts_by_age_and_size(tmp_path):
+    now = [1000.0]
+    path = tmp_path / "cache.sqlite3"
+    cache = SummaryCache(path, clock=lambda: now[0])
+    for index in range(5):
+        cache.set(f"key{index}", f"value{index}")
+        now[0] += 10
+    cache.get("key0")
+    cache.close()
+
+    aged = SummaryCache(path, max_entries=None, max_age_seconds=25, clock=lambda: now[0])
+    assert len(aged) == 3
+    assert aged.get("key1") is None and aged.get("key2") is None
+    aged.close()
+
+    sized = SummaryCache(path, max_entries=2, max_age_seconds=None, clock=lambda: now[0])
+    assert len(sized) == 2
+    # key0 and key4 were used most recently.
+    assert sized.get("key0") == "value0"
+    assert sized.get("key4") == "value4"
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__("rate limited")
+        self.response = MagicMock(headers={"retry-after": retry_after})
+
+
+def test_prompt_engineered_summarizer_retries_rate_limits(mock_openai, tmp_path):
+    sleeps = []
+    responses = [RateLimited("2"), completion("Polished summary")]
+
+    def create(**kwargs):
+        response = responses.pop(0) if responses else completion("Polished summary")
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    mock_openai.return_value.chat.completions.create.side_effect = create
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["Expert"], cache_path=tmp_path / "cache.json"
+    )
+    summarizer.scheduler = RequestScheduler(sleep_func=sleeps.append)
+
+    results = list(summarizer.summarize([SummaryRequest(identifier="1", title="Title")]))
+
+    assert results[0].summary == "Polished summary"
+    assert sleeps and sleeps[0] == pytest.approx(2.0, abs=0.1)
+    assert mock_openai.call_args.kwargs["max_retries"] == 0
+
+
+def test_failed_summaries_are_not_cached(mock_openai, tmp_path):
+    mock_openai.return_value.chat.completions.create.side_effect = RateLimited("3600")
+    cache_path = tmp_path / "cache.json"
+    summarizer = PromptEngineeredSummarizer(api_key="test", cache_path=cache_path)
+    summarizer.scheduler = RequestScheduler(sleep_func=lambda seconds: None)
+
+    results = list(summarizer.summarize([SummaryRequest(identifier="1", title="Title")]))
+
+    assert results[0].summary == "Title"
+    assert len(SummaryCache(cache_path)) == 0
+
+
+class BatchChat:
+    """Fake chat endpoint that answers batched pipeline steps."""
+
+    def __init__(self, drop_from_synthesis=()):
+        self.drop_from_synthesis = set(drop_from_synthesis)
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        system = kwargs["messages"][0]["content"]
+        user = kwargs["messages"][-1]["content"]
+        with self.lock:
+            self.calls.append(system)
+        if kwargs.get("response_format") is None:
+            # Per-entry pipeline: plain text replies.
+            match = re.search(r'"id": "([^"]+)"', user)
+            return completion(f"Single {match.group(1)}" if match else user.rsplit("Sentence: ", 1)[-1])
+        entries = json.loads(user.split("Input:", 1)[1])["entries"]
+        if "synthesizer" in system:
+            entries = [e for e in entries if e["id"] not in self.drop_from_synthesis]
+            return completion(json.dumps({"entries": [
+                {"id": e["id"], "summary": f"Merged {e['id']}"} for e in entries
+            ]}))
+        if "final editor" in system:
+            return completion(json.dumps({"entries": [
+                {"id": e["id"], "summary": e["sentence"] + "."} for e in entries
+            ]}))
+        return completion(json.dumps({"entries": [
+            {"id": e["id"], "summary": f"Expert {e['id']}"} for e in entries
+        ]}))
+
+
+def test_prompt_engineered_summarizer_batches_pipeline_steps(mock_openai, tmp_path):
+    chat = BatchChat()
+    mock_openai.return_value.chat.completions.create.side_effect = chat
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test",
+        expert_roles=["PM", "Tech Lead", "QA"],
+        cache_path=tmp_path / "cache.json",
+        max_batch_size=10,
+    )
+    requests = [SummaryRequest(identifier=f"e{index}", title=f"Title {index}") for index in range(25)]
+
+    results = list(summarizer.summarize(requests))
+
+    assert [result.summary for result in results] == [f"Merged e{index}." for index in range(25)]
+    # Three chunks, each with three expert calls, one synthesis and one critique.
+    assert len(chat.calls) == 3 * 5
+    cache = SummaryCache(tmp_path / "cache.json")
+    assert all(cache.get(summarizer._cache_key(req)) for req in requests)
+
+
+def test_batched_pipeline_splits_chunk_on_partial_failure(mock_openai):
+    chat = BatchChat(drop_from_synthesis={"e3"})
+    mock_openai.return_value.chat.completions.create.side_effect = chat
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM"], max_batch_size=8, max_workers=1
+    )
+    requests = [SummaryRequest(identifier=f"e{index}", title=f"Title {index}") for index in range(8)]
+
+    results = {result.identifier: result.summary for result in summarizer.summarize(requests)}
+
+    assert results["e3"] == "Single e3"
+    assert all(results[f"e{index}"] == f"Merged e{index}." for index in range(8) if index != 3)
+
+
+def test_batch_summarizer_packs_large_diffs_into_budget(mock_openai):
+    mock_openai.return_value.chat.completions.create.return_value = completion(
+        json.dumps({"entries": [{"id": "1", "summary": "Packed"}]})
+    )
+    hunks = "".join(f"@@ -{i},1 +{i},1 @@\n-old\n+new {'x' * 400}\n" for i in range(200))
+    summarizer = OpenAISummarizer(api_key="test", max_input_tokens=3_000)
+    request = SummaryRequest(identifier="1", title="Big change", body="Why.", diff=hunks)
+
+    results = list(summarizer.summarize([request]))
+
+    assert results[0].summary == "Packed"
+    messages = mock_openai.return_value.chat.completions.create.call_args.kwargs["messages"]
+    assert sum(summarizer.context_budget.count(m["content"]) for m in messages) <= 3_100
+    entry = json.loads(messages[-1]["content"].split("\n\n", 1)[1])["entries"][0]
+    assert entry["body"] == "Why."
+    assert entry["diff"].startswith("@@ -0,1 +0,1 @@")
+    assert "more hunks omitted]" in entry["diff"]
+
+
+def test_prompt_engineered_summarizer_plans_queries_locally(mock_openai):
+    chat = BatchChat()
+    mock_openai.return_value.chat.completions.create.side_effect = chat
+    summarizer = PromptEngineeredSummarizer(api_key="test", expert_roles=["PM"], max_workers=1)
+    body = "Intro paragraph.\n\nThe retry loop now honors retry-after headers.\n\nUnrelated cleanup."
+    request = SummaryRequest(identifier="r1", title="Honor retry-after headers", body=body)
+
+    results = list(summarizer.summarize([request]))
+
+    assert results[0].summary == "Single r1"
+    # Expert, synthesis and critique only; no query-planning round-trip.
+    assert len(chat.calls) == 3
+    assert not any("planning evidence retrieval" in call for call in chat.calls)
+    user = mock_openai.return_value.chat.completions.create.call_args_list[0].kwargs["messages"][-1]
+    assert "Relevant context from body:\nThe retry loop now honors retry-after headers." in user["content"]
+
+
+def fused_reply(roles, final="Final sentence."):
+    return json.dumps({
+        "candidates": [{"role": role, "summary": f"{role} view"} for role in roles],
+        "merged": "Merged sentence.",
+        "final": final,
+    })
+
+
+def test_fused_mode_summarizes_entry_in_one_call(mock_openai):
+    create = mock_openai.return_value.chat.completions.create
+    create.return_value = completion(fused_reply(["PM", "QA"]))
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM", "QA"], fused=True, max_tokens=100
+    )
+
+    results = list(summarizer.summarize([SummaryRequest(identifier="1", title="Add export")]))
+
+    assert results[0].summary == "Final sentence."
+    assert create.call_count == 1
+    kwargs = create.call_args.kwargs
+    assert kwargs["response_format"] == {"type": "json_object"}
+    assert kwargs["max_tokens"] == 200
+    assert "As each of these roles, write one candidate sentence: PM, QA." in kwargs["messages"][-1]["content"]
+
+
+def test_fused_mode_falls_back_to_separate_calls_on_invalid_reply(mock_openai):
+    replies = iter([
+        # The QA candidate is missing, so the fused reply is rejected.
+        completion(fused_reply(["PM"])),
+        completion("Adds CSV export for reports"),
+        completion("Reports gain a download button"),
+        completion("Merged"),
+        completion("Edited"),
+    ])
+    create = mock_openai.return_value.chat.completions.create
+    create.side_effect = lambda **kwargs: next(replies)
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM", "QA"], fused=True, max_workers=1
+    )
+
+    results = list(summarizer.summarize([SummaryRequest(identifier="1", title="Add export")]))
+
+    assert results[0].summary == "Edited"
+    assert create.call_count == 5
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "not json",
+        "[]",
+        json.dumps({"candidates": [{"role": "PM", "summary": ""}], "merged": "m", "final": "f"}),
+        json.dumps({"candidates": [{"role": "PM", "summary": "s"}], "merged": "", "final": "f"}),
+        json.dumps({"candidates": [{"role": "PM", "summary": "s"}], "merged": "m", "final": 3}),
+        fused_reply(["PM"], final="two\nlines"),
+        fused_reply(["PM"], final="word " * 61),
+    ],
+)
+def test_validate_fused_rejects_schema_violations(content):
+    assert _validate_fused(content, ["PM"]) is None
+
+
+def test_validate_fused_matches_roles_case_insensitively():
+    assert _validate_fused(fused_reply(["product manager"], final=" Done. "), ["Product Manager"]) == "Done."
+
+
+def role_replies(replies):
+    """Answer expert calls by role and count every call."""
+    calls = []
+
+    def create(**kwargs):
+        system = kwargs["messages"][0]["content"]
+        calls.append(system)
+        for role, reply in replies.items():
+            if f"Act as a {role} " in system:
+                return completion(reply)
+        return completion("Edited sentence.")
+
+    return calls, create
+
+
+def test_early_exit_skips_synthesis_and_critique_when_candidates_agree(mock_openai):
+    calls, create = role_replies({
+        "PM": "Adds CSV export to the reports page.",
+        "Tech Lead": "Adds CSV export to the reports page.",
+        "QA": "Adds CSV export to reports page.",
+    })
+    mock_openai.return_value.chat.completions.create.side_effect = create
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM", "Tech Lead", "QA"], early_exit=True, max_workers=1
+    )
+
+    [result] = summarizer.summarize([SummaryRequest(identifier="1", title="Add CSV export")])
+
+    assert result.summary == "Adds CSV export to reports page."
+    assert result.skipped_steps == ["synthesis", "critique"]
+    assert len(calls) == 3
+
+
+def test_early_exit_runs_synthesis_when_candidates_disagree(mock_openai):
+    calls, create = role_replies({
+        "PM": "Adds CSV export to the reports page.",
+        "QA": "reports can now be downloaded as spreadsheets",
+    })
+    mock_openai.return_value.chat.completions.create.side_effect = create
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM", "QA"], early_exit=True, max_workers=1
+    )
+
+    [result] = summarizer.summarize([SummaryRequest(identifier="1", title="Add CSV export")])
+
+    # The synthesizer runs; its reply already meets the style rules.
+    assert result.summary == "Edited sentence."
+    assert result.skipped_steps == ["critique"]
+    assert len(calls) == 3
+
+
+def test_stop_on_agreement_skips_remaining_roles(mock_openai):
+    calls, create = role_replies({
+        "PM": "Adds CSV export to the reports page.",
+        "Tech Lead": "Adds CSV export to the reports page.",
+        "QA": "Unused.",
+    })
+    mock_openai.return_value.chat.completions.create.side_effect = create
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test",
+        expert_roles=["PM", "Tech Lead", "QA"],
+        early_exit=True,
+        stop_on_agreement=True,
+    )
+
+    [result] = summarizer.summarize([SummaryRequest(identifier="1", title="Add CSV export")])
+
+    assert result.summary == "Adds CSV export to the reports page."
+    assert result.skipped_steps == ["expert:QA", "synthesis", "critique"]
+    assert len(calls) == 2
+
+
+def test_early_exit_can_be_disabled(mock_openai):
+    calls, create = role_replies({"PM": "Adds CSV export.", "QA": "Adds CSV export."})
+    mock_openai.return_value.chat.completions.create.side_effect = create
+    summarizer = PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM", "QA"], early_exit=False, max_workers=1
+    )
+
+    [result] = summarizer.summarize([SummaryRequest(identifier="1", title="Add CSV export")])
+
+    assert result.skipped_steps == []
+    assert len(calls) == 4
+
+
+def test_chat_steps_are_memoized_across_pipeline_changes(mock_openai, tmp_path):
+    calls, create = role_replies({
+        "PM": "Adds CSV export to the reports page.",
+        "QA": "Reports can be downloaded as spreadsheets now.",
+    })
+    mock_openai.return_value.chat.completions.create.side_effect = create
+    request = SummaryRequest(identifier="1", title="Add CSV export")
+    cache_path = tmp_path / "cache.sqlite3"
+
+    PromptEngineeredSummarizer(
+        api_key="test", expert_roles=["PM"], cache_path=cache_path, early_exit=True
+    ).summarize([request])
+    assert len(calls) == 1
+
+    # Adding a role re-runs only the new expert and the synthesis it changes.
+    calls.clear()
+    [result] = PromptEngineeredSummarizer(
+        api_key="test",
+        expert_roles=["PM", "QA"],
+        cache_path=cache_path,
+        early_exit=True,
+        max_workers=1,
+    ).summarize([request])
+    assert result.summary == "Edited sentence."
+    assert len(calls) == 2
+    assert "Act as a QA " in calls[0]
+    assert "synthesizer" in calls[1]
+
+
+def test_identical_chat_calls_in_flight_share_one_request(mock_openai):
+    started = threading.Event()
+    release = threading.Event()
+    create = mock_openai.return_value.chat.completions.create
+
+    def slow(**kwargs):
+        started.set()
+        release.wait(5)
+        return completion("Shared.")
+
+    create.side_effect = slow
+    summarizer = PromptEngineeredSummarizer(api_key="test")
+    messages = [{"role": "user", "content": "same"}]
+    replies = []
+    threads = [
+        threading.Thread(target=lambda: replies.append(summarizer._chat(messages, None)))
+        for _ in range(3)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert replies == ["Shared."] * 3
+    assert create.call_count == 1
+
+
+def test_cache_key_prefers_content_key(mock_openai):
+    summarizer = OpenAISummarizer(api_key="test")
+    main = SummaryRequest(identifier="aaa", title="Fix parser", content_key="k1")
+    backport = SummaryRequest(identifier="bbb", title="[1.x] Fix parser", content_key="k1")
+    plain = SummaryRequest(identifier="aaa", title="Fix parser")
+
+    assert summarizer._cache_key(main) == summarizer._cache_key(backport)
+    assert summarizer._cache_key(plain) != summarizer._cache_key(main)
+
+
+def test_cache_key_tracks_early_exit_settings(mock_openai):
+    request = SummaryRequest(identifier="1", title="Add CSV export")
+    keys = {
+        PromptEngineeredSummarizer(api_key="test", **options)._cache_key(request)
+        for options in (
+            {},
+            {"early_exit": True},
+            {"early_exit": True, "early_exit_threshold": 0.9},
+            {"stop_on_agreement": True},
+        )
+    }
+    assert len(keys) == 4
@@ -0,0 +1,28 @@
+import pytest
+
+from helixcommit.tiers import TIER_FULL, TIER_LIGHT, TIER_TITLE, TierPolicy
+
+
+@pytest.mark.parametrize(
+    "types,kwargs,expected",
+    [
+        (["ci"], {"changed_lines": 2}, TIER_TITLE),
+        (["docs", "chore"], {"changed_lines": 50}, TIER_LIGHT),
+        (["docs"], {}, TIER_FULL),
+        (["chore"], {"changed_lines": 500}, TIER_FULL),
+        (["docs"], {"changed_lines": 2, "has_body": True}, TIER_FULL),
+        (["chore"], {"changed_lines": 2, "breaking": True}, TIER_FULL),
+        (["fix"], {"changed_lines": 1}, TIER_FULL),
+        (["docs", "feat"], {"changed_lines": 1}, TIER_FULL),
+    ],
+)
+def test_default_policy(types, kwargs, expected):
+    assert TierPolicy().choose(types, **kwargs) == expected
+
+
+def test_budgets_are_configurable():
+    policy = TierPolicy(trivial_types=frozenset({"deps"}), title_max_lines=0, light_max_lines=20)
+    assert policy.choose(["deps"], changed_lines=0) == TIER_TITLE
+    assert policy.choose(["deps"], changed_lines=5) == TIER_LIGHT
+    assert policy.choose(["deps"], changed_lines=21) == TIER_FULL
+    assert policy.choose(["ci"], changed_lines=0) == TIER_FULL
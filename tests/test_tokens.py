@@ -0,0 +1,94 @@
+from helixcommit import tokens
+from helixcommit.tokens import (
+    HEURISTIC_TOKENIZER,
+    ContextBudget,
+    ContextSection,
+    TiktokenTokenizer,
+    context_window,
+    get_tokenizer,
+)
+
+
+class WordEncoding:
+    """Stand-in for a tiktoken encoding: one token per word."""
+
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def test_heuristic_tokenizer_counts_and_truncates():
+    assert HEURISTIC_TOKENIZER.count("") == 0
+    assert HEURISTIC_TOKENIZER.count("abcde") == 2
+    assert HEURISTIC_TOKENIZER.truncate("abcdefghij", 2) == "abcdefgh"
+
+
+def test_tiktoken_tokenizer_uses_encoding():
+    tokenizer = TiktokenTokenizer(WordEncoding())
+    assert tokenizer.count("one two three") == 3
+    assert tokenizer.truncate("one two three", 2) == "one two"
+    assert tokenizer.truncate("one two", 5) == "one two"
+
+
+def test_get_tokenizer_falls_back_to_heuristic(monkeypatch):
+    monkeypatch.setattr(tokens, "tiktoken", None)
+    get_tokenizer.cache_clear()
+    try:
+        assert get_tokenizer("gpt-4o-mini") is HEURISTIC_TOKENIZER
+    finally:
+        get_tokenizer.cache_clear()
+
+
+def test_context_window_matches_longest_known_prefix():
+    assert context_window("gpt-4") == 8_192
+    assert context_window("gpt-4o-mini-2024-07-18") == 128_000
+    assert context_window("meta-llama/llama-3.3-70b-instruct:free") == 131_072
+    assert context_window("some/unknown-model") == tokens.DEFAULT_CONTEXT_WINDOW
+    assert context_window(None) == tokens.DEFAULT_CONTEXT_WINDOW
+
+
+def test_budget_caps_input_by_window_and_output():
+    assert ContextBudget("gpt-4o", max_output_tokens=300).input_tokens == 6_000
+    assert ContextBudget("gpt-4", max_output_tokens=4_000, max_input_tokens=10_000).input_tokens == 4_192
+    budget = ContextBudget(window=1_000, max_input_tokens=800, tokenizer=HEURISTIC_TOKENIZER)
+    assert budget.available(["x" * 400]) == 700
+
+
+def test_allocate_gives_unused_share_to_other_sections():
+    budget = ContextBudget(tokenizer=HEURISTIC_TOKENIZER)
+    sections = [
+        ContextSection("body", "b" * 40),
+        ContextSection("evidence", ""),
+        ContextSection("diff", "d" * 4_000, weight=2.0),
+    ]
+    # The body only needs 10 of its 100; the diff takes the other 290.
+    assert budget.allocate(sections, 300) == {"body": 10, "evidence": 0, "diff": 290}
+    # Both oversized: split by weight.
+    sections[0].text = "b" * 4_000
+    assert budget.allocate(sections, 300) == {"body": 100, "evidence": 0, "diff": 200}
+
+
+def test_fit_keeps_whole_hunks_and_notes_omissions():
+    budget = ContextBudget(tokenizer=HEURISTIC_TOKENIZER)
+    hunks = [f"@@ -{i},1 +{i},1 @@\n-old {i}\n+new {i}\n" + "x" * 200 + "\n" for i in range(10)]
+    diff = "diff --git a/f.py b/f.py\n" + "".join(hunks)
+
+    fitted = budget.fit(diff, 200, kind="diff")
+
+    assert budget.count(fitted) <= 200
+    assert fitted.startswith("diff --git a/f.py b/f.py\n@@ -0,1 +0,1 @@")
+    # Header (7 tokens) plus three 59-token hunks fit beside the marker.
+    assert "@@ -2,1" in fitted
+    assert "@@ -3,1" not in fitted
+    assert fitted.endswith("[... 7 more hunks omitted]")
+
+
+def test_fit_trims_paragraphs_and_oversized_units():
+    budget = ContextBudget(tokenizer=HEURISTIC_TOKENIZER)
+    text = "first paragraph\n\n" + "second " * 100 + "\n\nthird"
+    fitted = budget.fit(text, 20)
+    assert fitted == "first paragraph\n\nthird\n[... 1 more paragraphs omitted]"
+    assert budget.fit("y" * 100, 5) == "y" * 20
+    assert budget.fit("short", 0) == ""